@@ -0,0 +1,72 @@
+"""Compare the Aho-Corasick engine with the re alternation of the same words.
+
+The time of re grows with the number of words, so it searches a prefix of
+the text, short enough to finish, and both are reported in characters per
+second. Run with ``python benchmarks/bench_ahocorasick.py``.
+"""
+from __future__ import annotations
+
+import random
+import re
+import string
+import time
+
+from ezr import any_of
+from ezr.ahocorasick import LiteralPattern
+
+SIZES = [64, 256, 1_000, 10_000, 100_000]
+TEXT_LENGTH = 200_000
+# Characters times words searched by re at every size
+RE_BUDGET = 20_000_000
+
+
+def _seconds(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(0)
+    letters = string.ascii_lowercase
+    # Words over the whole alphabet share few prefixes, as in a keyword list
+    vocabulary = list(
+        {"".join(rng.choices(letters, k=rng.randint(5, 12))) for _ in range(110_000)},
+    )
+    text = " ".join(
+        "".join(rng.choices(letters, k=rng.randint(3, 10)))
+        for _ in range(TEXT_LENGTH // 7)
+    )
+    print(
+        f"{'words':>8} {'re compile':>11} {'re chars/s':>12} "
+        f"{'ac compile':>11} {'ac chars/s':>12} {'speedup':>8}",
+    )
+    for size in SIZES:
+        words = vocabulary[:size]
+        pattern = str(any_of(*words))
+        prefix = text[: max(1_000, min(len(text), RE_BUDGET // size))]
+
+        compiled = None
+        literals = None
+
+        def compile_re():
+            nonlocal compiled
+            compiled = re.compile(pattern)
+
+        def compile_ac():
+            nonlocal literals
+            literals = LiteralPattern(pattern, words, {}, 1)
+
+        re_compile = _seconds(compile_re)
+        ac_compile = _seconds(compile_ac)
+        assert literals.findall(prefix) == compiled.findall(prefix)
+        re_rate = len(prefix) / _seconds(lambda: compiled.findall(prefix))
+        ac_rate = len(text) / _seconds(lambda: literals.findall(text))
+        print(
+            f"{size:>8,} {re_compile:>10.3f}s {re_rate:>12,.0f} "
+            f"{ac_compile:>10.3f}s {ac_rate:>12,.0f} {ac_rate / re_rate:>7.1f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
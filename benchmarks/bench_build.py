@@ -0,0 +1,80 @@
+"""Compare building 100k-node trees with and without validation.
+
+Run with ``python benchmarks/bench_build.py``.
+"""
+from __future__ import annotations
+
+import timeit
+
+from ezr import CharacterSet
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr import Quantifier
+
+NODES = 100_000
+# Nodes of one rule: a group, a set and their nine leaves
+RULE_NODES = 11
+
+
+def build_checked():
+    rules = []
+    for i in range(NODES // RULE_NODES):
+        word = CharacterSet(Pattern("a-z"), Pattern("_"), lower=1, upper=None)
+        rules.append(
+            Group(
+                Pattern("k"),
+                Pattern("e"),
+                Pattern("y"),
+                Pattern("="),
+                word,
+                Pattern("|"),
+                Pattern(r"\d", lower=1, upper=None),
+                name=f"rule{i}",
+            ),
+        )
+    return EzRegex(*rules)
+
+
+def build_unchecked():
+    leaf = Pattern.build_unchecked
+    rules = []
+    for i in range(NODES // RULE_NODES):
+        word = CharacterSet.build_unchecked(
+            leaf("a-z"),
+            leaf("_"),
+            quantifier=Quantifier(1, None),
+        )
+        rules.append(
+            Group.build_unchecked(
+                leaf("k"),
+                leaf("e"),
+                leaf("y"),
+                leaf("="),
+                word,
+                leaf("|"),
+                leaf(r"\d", Quantifier(1, None)),
+                name=f"rule{i}",
+            ),
+        )
+    return EzRegex.build_unchecked(*rules)
+
+
+def _time(function) -> float:
+    return min(timeit.repeat(function, number=1, repeat=5))
+
+
+def main():
+    assert str(build_checked()) == str(build_unchecked())
+    checked = _time(build_checked)
+    unchecked = _time(build_unchecked)
+    tree = build_unchecked()
+    validate = _time(tree.validate)
+    print(f"checked            {checked * 1e3:>8.1f}ms")
+    print(f"unchecked          {unchecked * 1e3:>8.1f}ms  ({checked / unchecked:.2f}x)")
+    total = unchecked + validate
+    print(f"unchecked+validate {total * 1e3:>8.1f}ms  ({checked / total:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare a cold start with a warm start from a ``RuleCache``.
+
+Run with ``python benchmarks/bench_cache.py``.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.cache import RuleCache
+
+N_RULES = 5_000
+
+
+def build_rules() -> list[EzRegex]:
+    return [
+        Group(Pattern(r"\d").exactly(4), "|", Pattern(r"\w"), "|", any_of("_.+-"))
+        .one_or_more()
+        .as_group()
+        + "@"
+        + Group(EzRegex(f"host{i}"), "|", EzRegex("mail"), name=f"host{i}")
+        + Group(EzRegex("com"), "|", EzRegex("net"))
+        for i in range(N_RULES)
+    ]
+
+
+def prepare(rules: list[EzRegex]):
+    for rule in rules:
+        str(rule)
+        rule.group_index()
+        rule.length_bounds()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rules.cache")
+
+        rules = build_rules()
+        start = time.perf_counter()
+        prepare(rules)
+        cold = time.perf_counter() - start
+
+        with RuleCache(path) as cache:
+            rules = build_rules()
+            start = time.perf_counter()
+            cache.load(rules)
+            fill = time.perf_counter() - start
+
+        with RuleCache(path) as cache:
+            rules = build_rules()
+            start = time.perf_counter()
+            hits = cache.load(rules)
+            warm = time.perf_counter() - start
+
+    print(f"{N_RULES} rules")
+    print(f"cold start          {cold * 1e3:8.1f} ms")
+    print(f"cold + cache fill   {fill * 1e3:8.1f} ms")
+    print(
+        f"warm start          {warm * 1e3:8.1f} ms  "
+        f"({hits} hits, {cold / warm:.2f}x)",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare searches through a trigram index with full scans of a corpus.
+
+Run with ``python benchmarks/bench_corpus.py``.
+"""
+from __future__ import annotations
+
+import os
+import random
+import string
+import tempfile
+import time
+
+from ezr import any_of
+from ezr import CorpusIndex
+from ezr import EzRegex
+from ezr import Pattern
+
+DOCUMENTS = 20_000
+WORDS = 40
+
+
+def rules():
+    digits = Pattern(r"\d").one_or_more()
+    return {
+        "literal": EzRegex("segfault"),
+        "alternation": any_of("kernel panic", "out of memory") + ":",
+        "sequence": EzRegex("port ") + digits + " refused",
+        "prefix": EzRegex("user=") + Pattern(r"\w").one_or_more() + "@corp",
+    }
+
+
+def _seconds(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(0)
+    vocabulary = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+        for _ in range(5_000)
+    ]
+    needles = [
+        "segfault",
+        "kernel panic: cpu 3",
+        "out of memory: kill",
+        "port 8080 refused",
+        "user=alice@corp",
+    ]
+    documents = []
+    for _ in range(DOCUMENTS):
+        words = rng.choices(vocabulary, k=WORDS)
+        if rng.random() < 0.01:
+            words.insert(rng.randrange(WORDS), rng.choice(needles))
+        documents.append(" ".join(words))
+
+    index = None
+
+    def build():
+        nonlocal index
+        index = CorpusIndex(documents)
+
+    print(f"build {_seconds(build):.2f}s for {DOCUMENTS:,} documents")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.idx")
+        print(f"save  {_seconds(lambda: index.save(path)):.2f}s, ", end="")
+        print(f"{os.path.getsize(path) / 2**20:.1f} MiB")
+        with CorpusIndex.open(path) as mapped:
+            print(
+                f"{'rule':>12} {'scan':>9} {'memory':>9} {'mmap':>9} "
+                f"{'candidates':>11}",
+            )
+            for name, regex in rules().items():
+                search = regex.compile().search
+                expected = [i for i, d in enumerate(documents) if search(d)]
+                scan = _seconds(lambda: [d for d in documents if search(d)])
+                memory = _seconds(lambda: list(index.search(regex)))
+                disk = _seconds(lambda: list(mapped.search(regex)))
+                assert [i for i, _ in mapped.search(regex)] == expected
+                print(
+                    f"{name:>12} {scan * 1e3:>7.1f}ms {memory * 1e3:>7.1f}ms "
+                    f"{disk * 1e3:>7.1f}ms {len(index.candidates(regex)):>11,}",
+                )
+
+
+if __name__ == "__main__":
+    main()
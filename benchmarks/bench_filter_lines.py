@@ -0,0 +1,54 @@
+"""Compare ``EzRegex.filter_lines`` with searching a buffer line by line.
+
+Run with ``python benchmarks/bench_filter_lines.py``.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+
+from ezr import EzRegex
+from ezr import Pattern
+
+N_LINES = 200_000
+
+
+def make_buffer(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    levels = ["INFO"] * 97 + ["WARN"] * 2 + ["ERROR"]
+    return "".join(
+        f"2024-01-01 12:00:{i % 60:02d} {rng.choice(levels)} "
+        f"request {i} took {rng.randrange(1000)}ms\n"
+        for i in range(N_LINES)
+    )
+
+
+CASES = {
+    "rare": EzRegex("ERROR"),
+    "common": EzRegex("INFO"),
+    "digits": Pattern(r"\d").exactly(3) + "ms",
+    "anchored": Pattern("^") + EzRegex("2024-01-01 12:00:00"),
+}
+
+
+def per_line(compiled, buffer):
+    return [line for line in buffer.split("\n") if compiled.search(line)]
+
+
+def main():
+    buffer = make_buffer()
+    for name, regex in CASES.items():
+        compiled = regex.compile()
+        n = len(regex.filter_lines(buffer))
+        t_loop = min(timeit.repeat(lambda: per_line(compiled, buffer), number=1))
+        t_filter = min(timeit.repeat(lambda: regex.filter_lines(buffer), number=1))
+        print(
+            f"{name:<9} {n:>7} lines  "
+            f"per-line {t_loop * 1e3:7.1f} ms  "
+            f"filter_lines {t_filter * 1e3:7.1f} ms  "
+            f"({t_loop / t_filter:.2f}x)",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Measure the throughput of ``EzRegex.generate``.
+
+Run with ``python benchmarks/bench_generate.py``.
+"""
+from __future__ import annotations
+
+import timeit
+
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+
+N = 100_000
+
+CASES = {
+    "card": Pattern(r"\d").exactly(4)
+    + any_of("- ").optional()
+    + Pattern(r"\d").exactly(4),
+    "email": Group(Pattern(r"\w"), "|", any_of("_.+-")).one_or_more()
+    + "@"
+    + Group(EzRegex("gmail"), "|", EzRegex("yahoo"))
+    + "-"
+    + Group(EzRegex("com"), "|", "net"),
+    "words": Group(Pattern(r"\w").between(1, 10), " ").one_or_more(),
+}
+
+
+def main():
+    for name, regex in CASES.items():
+        for matching in (True, False):
+            elapsed = min(
+                timeit.repeat(
+                    lambda: regex.generate(N, seed=0, matching=matching),
+                    number=1,
+                    repeat=3,
+                ),
+            )
+            kind = "matching" if matching else "non-matching"
+            print(
+                f"{name:<8} {kind:<13} {N / elapsed:>12,.0f} samples/s  "
+                f"{N / elapsed * 60 / 1e6:6.1f}M samples/min",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare ``EzRegex.isub`` and ``isplit`` against ``re.sub`` and ``re.split``.
+
+Run with ``python benchmarks/bench_isub.py``. Reports the throughput and the
+peak memory allocated while rewriting a file.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ezr import Group
+from ezr import Pattern
+
+LINES = 100_000
+LINE = "2024-01-02 12:34:56 user=alice id=12345 action=login ok\n"
+
+
+def measure(run) -> tuple[float, int]:
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    # Tracing slows down allocations, the time is measured without it
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    regex = Group(Pattern(r"\d").one_or_more(), name="num")
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = os.path.join(tmp, "in.log"), os.path.join(tmp, "out.log")
+        with open(source, "w") as f:
+            f.writelines([LINE] * LINES)
+        size = os.path.getsize(source) / 1e6
+
+        def re_sub():
+            with open(source) as f, open(target, "w") as out:
+                out.write(regex.compile().sub("#", f.read()))
+
+        def isub():
+            with open(source) as f, open(target, "w") as out:
+                regex.isub(f, "#", out)
+
+        def re_split():
+            with open(source) as f:
+                for _ in regex.compile().split(f.read()):
+                    pass
+
+        def isplit():
+            with open(source) as f:
+                for _ in regex.isplit(f):
+                    pass
+
+        for name, run in [
+            ("re.sub", re_sub),
+            ("isub", isub),
+            ("re.split", re_split),
+            ("isplit", isplit),
+        ]:
+            elapsed, peak = measure(run)
+            print(
+                f"{name:<9} {size / elapsed:8.1f} MB/s  "
+                f"peak {peak / 1e6:8.1f} MB for {size:.0f} MB",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare ``Lexer`` against trying every rule at every position.
+
+Run with ``python benchmarks/bench_lexer.py``.
+"""
+from __future__ import annotations
+
+import timeit
+
+from ezr import any_of
+from ezr import CharacterSet
+from ezr import EzRegex
+from ezr import Group
+from ezr import Lexer
+from ezr import Pattern
+
+SOURCE = 'let total = price * 42 + tax(7, "net") - discount\n' * 2_000
+
+RULES = {
+    "KEYWORD": Group(any_of("let", "if", "else")) + Pattern(r"\b"),
+    "NUMBER": Pattern(r"\d").one_or_more(),
+    "NAME": Pattern(r"\w").one_or_more(),
+    "STRING": EzRegex('"') + (~EzRegex('"')).zero_or_more() + '"',
+    "OP": any_of("=", r"\*", r"\+", "-", r"\(", r"\)", ","),
+    "SPACE": CharacterSet(Pattern(r"\s")).one_or_more(),
+}
+
+
+def per_rule(text: str) -> list:
+    rules = [(name, rule.compile().match) for name, rule in RULES.items()]
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        for name, match in rules:
+            m = match(text, pos)
+            if m is not None:
+                if name != "SPACE":
+                    tokens.append((name, m.group(), m.span()))
+                pos = m.end()
+                break
+        else:
+            raise ValueError(f"Unexpected {text[pos]!r} at position {pos}")
+    return tokens
+
+
+def main():
+    lexer = Lexer(RULES, skip=["SPACE"])
+    assert list(lexer.tokenize(SOURCE)) == per_rule(SOURCE)
+    n = len(per_rule(SOURCE))
+    cases = {
+        "per rule": lambda: per_rule(SOURCE),
+        "lexer": lambda: list(lexer.tokenize(SOURCE)),
+        "lexer stream": lambda: list(lexer.tokenize_stream([SOURCE])),
+    }
+    for name, run in cases.items():
+        elapsed = min(timeit.repeat(run, number=1, repeat=3))
+        print(f"{name:<13} {n / elapsed:>12,.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure the result cache on repetitive traffic, such as user agents.
+
+Run with ``python benchmarks/bench_memo.py``.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+
+from ezr import any_of
+from ezr import Group
+from ezr import Pattern
+
+N = 100_000
+DISTINCT = 2_000
+
+
+def build():
+    browsers = any_of("Firefox", "Chrome", "Safari", "Edge", "Opera", "curl")
+    version = Pattern(r"\d").one_or_more() + r"\." + Pattern(r"\d").one_or_more()
+    bot = Group(any_of("bot", "crawler", "spider"), name="bot").optional()
+    return (
+        Group(browsers, name="name")
+        + "/"
+        + Group(version, name="version")
+        + Pattern(".").zero_or_more()
+        + bot
+    )
+
+
+def main():
+    rng = random.Random(0)
+    names = ["Firefox", "Chrome", "Safari", "Edge", "Opera", "curl"]
+    agents = [
+        f"Mozilla/5.0 (X11; Linux x86_64; rv:{rng.randrange(100)}) "
+        f"{rng.choice(names)}/{rng.randrange(130)}.{rng.randrange(10)} "
+        f"{'crawler' if rng.random() < 0.1 else 'like Gecko'}"
+        for _ in range(DISTINCT)
+    ]
+    # Zipf-like traffic, a few agents make up most of the requests
+    weights = [1 / (i + 1) for i in range(DISTINCT)]
+    traffic = rng.choices(agents, weights=weights, k=N)
+
+    regex = build()
+    search = regex.search
+    plain = min(timeit.repeat(lambda: [search(t) for t in traffic], number=1))
+    for maxsize in (DISTINCT // 20, DISTINCT // 4, DISTINCT):
+        cached = regex.cached(maxsize=maxsize)
+        lookup = cached.search
+        timed = min(timeit.repeat(lambda: [lookup(t) for t in traffic], number=1))
+        print(
+            f"maxsize {maxsize:>6,}  {N / timed:>12,.0f} searches/s  "
+            f"hit rate {cached.hit_rate:.2f}  ({plain / timed:.2f}x)",
+        )
+    print(f"uncached        {N / plain:>12,.0f} searches/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Measure searches before and after profile-guided alternation reordering.
+
+Run with ``python benchmarks/bench_profiling.py``.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+
+from ezr import any_of
+from ezr import Group
+from ezr import Pattern
+
+N = 20_000
+KEYWORDS = [f"keyword{i:02}" for i in range(40)]
+
+
+def build():
+    return Group(any_of(*KEYWORDS), name="kw") + "=" + Pattern(r"\d").one_or_more()
+
+
+def _time(regex, traffic) -> float:
+    search = regex.compile().search
+    return min(timeit.repeat(lambda: [search(t) for t in traffic], number=1))
+
+
+def main():
+    rng = random.Random(0)
+    # Skewed traffic, the last keywords are the most frequent
+    weights = [2**i for i in range(len(KEYWORDS))]
+    traffic = [
+        f"x {k}={rng.randrange(100)}"
+        for k in rng.choices(KEYWORDS, weights=weights, k=N)
+    ]
+
+    regex = build()
+    before = _time(regex, traffic)
+    regex.optimize(regex.profile(traffic[: N // 10]))
+    after = _time(regex, traffic)
+    print(f"original  {N / before:>12,.0f} searches/s")
+    print(f"reordered {N / after:>12,.0f} searches/s  ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
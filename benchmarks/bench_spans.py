@@ -0,0 +1,40 @@
+"""Compare ``EzRegex.spans`` with collecting spans from ``finditer``.
+
+Run with ``python benchmarks/bench_spans.py``.
+"""
+from __future__ import annotations
+
+import timeit
+
+from ezr import any_of
+from ezr import Pattern
+
+CASES = {
+    "digits": (Pattern(r"\d").one_or_more(), "12 345 6 7890 " * 100_000),
+    "words": (Pattern(r"\w").one_or_more(), "lorem ipsum dolor sit " * 100_000),
+    "chars": (any_of("abc"), "abcabcxyz" * 100_000),
+}
+
+
+def finditer_spans(compiled, text):
+    return [i for m in compiled.finditer(text) for i in m.span()]
+
+
+def main():
+    for name, (regex, text) in CASES.items():
+        compiled = regex.compile()
+        n = len(regex.spans(text)) // 2
+        t_finditer = min(
+            timeit.repeat(lambda: finditer_spans(compiled, text), number=1),
+        )
+        t_spans = min(timeit.repeat(lambda: regex.spans(text), number=1))
+        print(
+            f"{name:<8} {n:>9} matches  "
+            f"finditer {t_finditer * 1e3:8.1f} ms  "
+            f"spans {t_spans * 1e3:8.1f} ms  "
+            f"({t_finditer / t_spans:.2f}x)",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare binding a ``Template`` against building the whole tree per value.
+
+Run with ``python benchmarks/bench_template.py``.
+"""
+from __future__ import annotations
+
+import timeit
+
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr import Placeholder
+from ezr import Template
+
+N = 5_000
+FIELDS = 50
+
+
+def build(tenant) -> EzRegex:
+    # Large fixed part, with the tenant in a single field
+    fields = [
+        Group(EzRegex(f"field{i}="), Pattern(r"\w").one_or_more(), " ")
+        for i in range(FIELDS)
+    ]
+    return EzRegex(*fields, EzRegex("tenant="), tenant)
+
+
+def main():
+    tenants = [f"tenant{i}" for i in range(N)]
+    template = Template(build(Placeholder("tenant")), maxsize=N)
+
+    def full():
+        for tenant in tenants:
+            str(build(EzRegex(tenant)))
+
+    def bound():
+        for tenant in tenants:
+            template.render(tenant=tenant)
+
+    for name, run in (("full build", full), ("template (cold)", bound)):
+        elapsed = timeit.timeit(run, number=1)
+        print(f"{name:<16} {N / elapsed:>10,.0f} renders/s")
+    elapsed = timeit.timeit(bound, number=1)
+    print(f"{'template (warm)':<16} {N / elapsed:>10,.0f} renders/s")
+
+
+if __name__ == "__main__":
+    main()
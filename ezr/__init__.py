@@ -1,12 +1,16 @@
 # flake8: noqa
 from __future__ import annotations
 
+from ezr.corpus import CorpusIndex
 from ezr.ezregex import CharacterSet
 from ezr.ezregex import EzRegex
 from ezr.ezregex import Group
 from ezr.ezregex import Pattern
 from ezr.ezregex import Quantifier
 from ezr.helper import *
+from ezr.lexer import Lexer
+from ezr.template import Placeholder
+from ezr.template import Template
 
 digit = Pattern(r"\d")
 whitespace = Pattern(r"\s")
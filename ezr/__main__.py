@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Sequence
+
+from ezr.freeze import check_frozen
+from ezr.freeze import freeze
+from ezr.grep import grep
+from ezr.grep import GrepStats
+from ezr.rules import collect_patterns
+from ezr.rules import load_module
+from ezr.rules import load_rules
+
+
+def _freeze(args: argparse.Namespace) -> int:
+    module = load_module(args.source)
+    if args.check:
+        if args.output is None:
+            print("--check requires --output", file=sys.stderr)
+            return 2
+        try:
+            check_frozen(load_module(args.output), collect_patterns(module))
+        except (ImportError, OSError, ValueError) as e:
+            print(f"{args.output}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    code = freeze(module)
+    if args.output is None:
+        sys.stdout.write(code)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(code)
+    return 0
+
+
+def _grep(args: argparse.Namespace) -> int:
+    rules = load_rules(args.rules)
+    show_rule = len(rules) > 1 or args.rules.endswith(".py")
+    stats = GrepStats()
+    results = grep(
+        args.paths,
+        rules,
+        jobs=args.jobs,
+        ordered=not args.unordered,
+        encoding=args.encoding,
+    )
+    for result in results:
+        stats.add(result)
+        if result.error is not None:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+            continue
+        for lineno, name, line in result.lines:
+            prefix = f"{result.path}:{lineno}:"
+            if show_rule:
+                prefix += f"{name}:"
+            print(f"{prefix}{line}")
+    stats.stop()
+    if args.stats:
+        print(stats, file=sys.stderr)
+    return 0 if stats.lines else 1
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="ezr")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    freeze_parser = subparsers.add_parser(
+        "freeze",
+        help="Render a module of ezr rules into a plain Python module.",
+    )
+    freeze_parser.add_argument("source", help="Module name or path to a .py file.")
+    freeze_parser.add_argument("-o", "--output", help="Output file (default: stdout).")
+    freeze_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Check that the output file is up to date instead of writing it.",
+    )
+    freeze_parser.set_defaults(func=_freeze)
+
+    grep_parser = subparsers.add_parser(
+        "grep",
+        help="Search files for lines matching ezr rules.",
+    )
+    grep_parser.add_argument(
+        "rules",
+        help="An ezr expression, e.g. 'digit * 3', or a .py file of rules.",
+    )
+    grep_parser.add_argument("paths", nargs="+", help="Files or directories.")
+    grep_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    grep_parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Print results as soon as a file is done.",
+    )
+    grep_parser.add_argument("--encoding", default="utf-8")
+    grep_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print throughput statistics to stderr.",
+    )
+    grep_parser.set_defaults(func=_grep)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
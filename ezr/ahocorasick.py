@@ -0,0 +1,277 @@
+"""Aho-Corasick matching for alternations of literal strings.
+
+The ``re`` engine tries the alternatives of an alternation one after the
+other at every position, so searching for thousands of words costs time
+proportional to their number. An Aho-Corasick automaton reads every character
+once, whatever the number of words.
+
+The trie and the transitions derived from its failure links share one dict,
+keyed by ``state * n_classes + char_class``. Transitions are added to it as
+they are first used, up to ``MAX_TRANSITIONS``, so the automaton becomes a
+DFA over the part of the input alphabet that actually occurs. The data of
+every state is kept in ``array`` tables.
+
+Matches follow the semantics of the regex alternation: the leftmost start
+wins, and among the words starting there, the first one in the alternation.
+"""
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from ezr.analysis import _alternatives
+from ezr.analysis import _units
+from ezr.analysis import literal_prefix
+from ezr.deadline import MatchResult
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+
+# Alternations with fewer words are faster in the re engine
+MIN_WORDS = 1 << 8
+# Derived transitions cached in the transition table, beyond the trie edges
+MAX_TRANSITIONS = 1 << 20
+
+Span = Tuple[int, int]
+
+
+class Automaton:
+    """Aho-Corasick automaton with leftmost-first matching.
+
+    Args:
+        words (Sequence[str]): Non-empty words, in priority order.
+    """
+
+    def __init__(self, words: Sequence[str]):
+        if not words or not all(words):
+            raise ValueError("Words must be non-empty strings")
+        self.words = list(words)
+        self._classes: dict[str, int] = {}
+        for word in self.words:
+            for c in word:
+                if c not in self._classes:
+                    self._classes[c] = len(self._classes) + 1
+        self._k = k = len(self._classes) + 1
+
+        delta: dict[int, int] = {}
+        depth = array("l", [0])
+        word_of = array("l", [-1])
+        self._index: dict[str, int] = {}
+        for index, word in enumerate(self.words):
+            self._index.setdefault(word, index)
+            state = 0
+            for c in word:
+                key = state * k + self._classes[c]
+                child = delta.get(key)
+                if child is None:
+                    child = delta[key] = len(depth)
+                    depth.append(depth[state] + 1)
+                    word_of.append(-1)
+                state = child
+            if word_of[state] == -1:
+                word_of[state] = index
+        self._delta = delta
+        self._depth = depth
+        self._edges = len(delta)
+
+        # Breadth-first, the failure link of a state is known before its
+        # children need it
+        n = len(depth)
+        children: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+        for key, child in delta.items():
+            children[key // k].append((key % k, child))
+        self._fail = fail = array("l", [0]) * n
+        # Length and index of the longest word ending at a state
+        self._out_len = out_len = array("l", [0]) * n
+        self._out_word = out_word = array("l", [0]) * n
+        queue = [0]
+        for state in queue:
+            for cls, child in children[state]:
+                if state:
+                    fail[child] = self._transition(fail[state], cls)
+                if word_of[child] != -1:
+                    out_len[child] = depth[child]
+                    out_word[child] = word_of[child]
+                else:
+                    out_len[child] = out_len[fail[child]]
+                    out_word[child] = out_word[fail[child]]
+                queue.append(child)
+
+        first = "".join(sorted({word[0] for word in self.words}))
+        # Jumps to the next character that can start a word
+        self._skip = re.compile(f"[{re.escape(first)}]").search
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _transition(self, state: int, cls: int) -> int:
+        """Follow failure links until the state has an edge for the class."""
+        key = state * self._k + cls
+        delta = self._delta
+        target = state
+        while True:
+            nxt = delta.get(target * self._k + cls)
+            if nxt is not None:
+                break
+            if target == 0:
+                nxt = 0
+                break
+            target = self._fail[target]
+        if len(delta) - self._edges < MAX_TRANSITIONS:
+            delta[key] = nxt
+        return nxt
+
+    def search(self, string: str, pos: int = 0) -> Optional[Span]:
+        """Find the leftmost-first match starting at or after ``pos``."""
+        delta, k, get = self._delta, self._k, self._classes.get
+        transition, skip = self._transition, self._skip
+        depth, out_len, out_word = self._depth, self._out_len, self._out_word
+        n = len(string)
+        best = best_word = best_end = -1
+        state = 0
+        i = pos
+        while i < n:
+            if state == 0:
+                m = skip(string, i)
+                if m is None:
+                    break
+                i = m.start()
+            cls = get(string[i], 0)
+            nxt = delta.get(state * k + cls)
+            state = transition(state, cls) if nxt is None else nxt
+            i += 1
+            length = out_len[state]
+            if length:
+                start = i - length
+                word = out_word[state]
+                if best < 0 or start < best or (start == best and word < best_word):
+                    best, best_word, best_end = start, word, i
+            # Words still being read started at i - depth[state] or later
+            if best >= 0 and i - depth[state] > best:
+                break
+        return None if best < 0 else (best, best_end)
+
+    def match(self, string: str, pos: int = 0) -> Optional[Span]:
+        """Find the first word in priority order that ``string`` starts with."""
+        delta, k, get = self._delta, self._k, self._classes.get
+        depth, out_len, out_word = self._depth, self._out_len, self._out_word
+        best = best_word = -1
+        state = 0
+        for i in range(pos, len(string)):
+            nxt = delta.get(state * k + get(string[i], 0))
+            # Derived transitions skip to a shorter suffix, not along the trie
+            if nxt is None or depth[nxt] != depth[state] + 1:
+                break
+            state = nxt
+            # The longest word ending at a state is its own, if it has one
+            if out_len[state] == depth[state]:
+                word = out_word[state]
+                if best < 0 or word < best_word:
+                    best, best_word = i + 1, word
+        return None if best < 0 else (pos, best)
+
+    def fullmatch(self, string: str) -> Optional[Span]:
+        return (0, len(string)) if string in self._index else None
+
+    def finditer(self, string: str) -> Iterator[Span]:
+        """Find all non-overlapping matches, as ``re.finditer`` does."""
+        pos = 0
+        while True:
+            span = self.search(string, pos)
+            if span is None:
+                return
+            yield span
+            pos = span[1]
+
+
+class LiteralPattern:
+    """Alternation of literal strings, with the ``re.Pattern`` methods it needs.
+
+    Args:
+        pattern (str): The rendered pattern.
+        words (Sequence[str]): The alternatives.
+        groupindex (dict[str, int]): Named groups, at most one.
+        groups (int): Number of capturing groups, zero or one around the
+            whole alternation.
+    """
+
+    flags = 0
+
+    def __init__(
+        self,
+        pattern: str,
+        words: Sequence[str],
+        groupindex: dict[str, int],
+        groups: int,
+    ):
+        self.pattern = pattern
+        self.groupindex = groupindex
+        self.groups = groups
+        self.automaton = Automaton(words)
+
+    def _result(self, string: str, span: Optional[Span]) -> Optional[MatchResult]:
+        if span is None:
+            return None
+        return MatchResult(self, string, (span,) * (self.groups + 1))
+
+    def search(self, string: str, pos: int = 0) -> Optional[MatchResult]:
+        return self._result(string, self.automaton.search(string, pos))
+
+    def match(self, string: str, pos: int = 0) -> Optional[MatchResult]:
+        return self._result(string, self.automaton.match(string, pos))
+
+    def fullmatch(self, string: str) -> Optional[MatchResult]:
+        return self._result(string, self.automaton.fullmatch(string))
+
+    def findall(self, string: str) -> list[str]:
+        return [string[s:e] for s, e in self.automaton.finditer(string)]
+
+    def finditer(self, string: str) -> Iterator[MatchResult]:
+        for span in self.automaton.finditer(string):
+            yield MatchResult(self, string, (span,) * (self.groups + 1))
+
+
+def literal_words(node: Pattern) -> Optional[list[str]]:
+    """List the alternatives of a pure-literal alternation.
+
+    Such an alternation is what ``any_of`` builds from plain strings: a group
+    without quantifier or flags, or an expression, whose alternatives are all
+    non-empty literal text.
+
+    Example:
+        >>> from ezr.helper import any_of
+        >>> literal_words(any_of("foo", "bar", "baz"))
+        ['foo', 'bar', 'baz']
+        >>> literal_words(any_of("foo", "ba.")) is None
+        True
+    """
+    if node.quantifier is not None:
+        return None
+    if isinstance(node, Group):
+        if node.flags:
+            return None
+        units = _units(node._patterns)
+    elif type(node) is EzRegex:
+        units = _units([node])
+    else:
+        return None
+    words = []
+    for alternative in _alternatives(units):
+        text, complete = literal_prefix([unit for unit, _ in alternative])
+        if not complete or not text or any(q for _, q in alternative):
+            return None
+        words.append(text)
+    return words
+
+
+def compile_literals(node: Pattern) -> Optional[LiteralPattern]:
+    """Compile a pure-literal alternation of at least ``MIN_WORDS`` words."""
+    words = literal_words(node)
+    if words is None or len(words) < MIN_WORDS:
+        return None
+    capture = isinstance(node, Group) and node.capture
+    return LiteralPattern(str(node), words, node.group_index(), int(capture))
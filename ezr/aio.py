@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import functools
+import re
+from typing import AsyncIterator
+
+from ezr.stream import ChunkScanner
+from ezr.stream import DEFAULT_CHUNK_SIZE
+from ezr.stream import StreamMatch
+
+OFFLOAD_SIZE = 1 << 15
+
+
+async def _scan(scanner: ChunkScanner, chunk: str, eof: bool) -> list[StreamMatch]:
+    """Scan a chunk, moving large chunks off the event loop."""
+    scan = scanner.close if eof else functools.partial(scanner.feed, chunk)
+    if len(chunk) < OFFLOAD_SIZE:
+        return list(scan())
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: list(scan()))
+
+
+async def afinditer(
+    compiled: re.Pattern,
+    reader: asyncio.StreamReader,
+    window: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> AsyncIterator[StreamMatch]:
+    """Find all matches in the text read from an ``asyncio.StreamReader``.
+
+    Data is only read from the stream when the consumer asks for the next
+    match, so a slow consumer applies backpressure to the connection.
+
+    Args:
+        compiled (re.Pattern): Compiled pattern to search for.
+        reader (asyncio.StreamReader): Source of the encoded text.
+        window (int): Maximum match length, used as the overlap between chunks.
+        chunk_size (int): Number of bytes to read at once.
+        encoding (str): Encoding of the stream.
+
+    Returns:
+        AsyncIterator[StreamMatch]: Matches with character offsets relative
+            to the start of the stream.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    scanner = ChunkScanner(compiled, window)
+    while data := await reader.read(chunk_size):
+        for match in await _scan(scanner, decoder.decode(data), eof=False):
+            yield match
+    tail = decoder.decode(b"", final=True)
+    for match in await _scan(scanner, tail, eof=False):
+        yield match
+    for match in await _scan(scanner, "", eof=True):
+        yield match
+
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    """Read a line of any length, empty at the end of the stream.
+
+    ``StreamReader.readline`` raises on lines longer than the limit of the
+    reader, so the bytes scanned for a line ending are kept and read again.
+    """
+    parts = []
+    while True:
+        try:
+            parts.append(await reader.readuntil(b"\n"))
+        except asyncio.LimitOverrunError as e:
+            parts.append(await reader.read(e.consumed))
+            continue
+        except asyncio.IncompleteReadError as e:
+            parts.append(e.partial)
+        return b"".join(parts)
+
+
+async def afilter_lines(
+    compiled: re.Pattern,
+    reader: asyncio.StreamReader,
+    encoding: str = "utf-8",
+) -> AsyncIterator[str]:
+    """Yield the lines of an ``asyncio.StreamReader`` that contain a match.
+
+    Lines are not limited by the buffer limit of the reader, and long lines
+    are searched off the event loop.
+
+    Args:
+        compiled (re.Pattern): Compiled pattern to search for.
+        reader (asyncio.StreamReader): Source of the encoded text.
+        encoding (str): Encoding of the stream.
+
+    Returns:
+        AsyncIterator[str]: Matching lines, including their line ending.
+    """
+    search = compiled.search
+    loop = asyncio.get_running_loop()
+    while line := await _readline(reader):
+        text = line.decode(encoding)
+        body = text.rstrip("\r\n")
+        if len(body) < OFFLOAD_SIZE:
+            found = search(body)
+        else:
+            found = await loop.run_in_executor(None, search, body)
+        if found is not None:
+            yield text
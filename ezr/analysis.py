@@ -0,0 +1,785 @@
+from __future__ import annotations
+
+import math
+import re
+import string
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from ezr.ezregex import CharacterSet
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.ezregex import Quantifier
+from ezr.walk import children
+from ezr.walk import ENTER
+from ezr.walk import fold
+from ezr.walk import iter_events
+from ezr.walk import walk
+
+Bounds = Tuple[int, Optional[int]]
+Unit = Tuple[Pattern, Optional[Quantifier]]
+# A unit with the value computed for it, and a token read from such units
+Item = Tuple[Pattern, Optional[Quantifier], Any]
+Token = Tuple[Optional[str], Any, Optional[Bounds]]
+
+ZERO_WIDTH = {"^", "$", r"\b", r"\B", r"\A", r"\Z"}
+# Characters that do not match themselves, and those re.VERBOSE ignores
+SPECIAL = frozenset(".^$*+?{}[]|()\\")
+VERBOSE_SPECIAL = frozenset("#" + string.whitespace)
+# Raw repeat leaves, and the escaped characters that do not stand for exactly
+# one character: back references, numeric escapes and named characters
+RAW_REPEATS = {"?": (0, 1), "*": (0, None), "+": (1, None)}
+RAW_BRACES = re.compile(r"(\d*)(?:(,)(\d*))?")
+RAW_UNKNOWN = frozenset("0123456789xuUN")
+# Extensions of raw groups after their ``(``: lookarounds, inline flags that
+# match nothing, and the named, non-capturing and scoped-flag groups. The
+# verbose flag changes how the rest of the pattern reads, so it is left out
+RAW_LOOKAROUNDS = {"?=", "?!", "?<=", "?<!"}
+RAW_FLAGS = re.compile(r"\?[aiLmsu]+\)")
+RAW_EXTENSIONS = re.compile(r"\?(?:P<\w+>|[aiLmsu]*(?:-[imsx]+)?:)")
+# Input length the backtracking factor of metrics is estimated for
+DEFAULT_INPUT_LENGTH = 1000
+# Sample alphabet for the characters an atom can match
+CHARACTERS = string.ascii_letters + string.digits + string.punctuation + " \t\n\x00é"
+
+
+def _units(patterns: Iterable[Pattern]) -> list[Unit]:
+    """List the tokens of a sequence in the order they are rendered.
+
+    Plain ``EzRegex`` nodes render without enclosing characters, so their
+    children are spliced into the surrounding sequence. A quantifier on such a
+    node only applies to its last token. If that token has a quantifier
+    already, the two stack, and the node itself is listed after the token
+    with its quantifier.
+    """
+    units: list[Unit] = []
+    stack: list[Pattern | tuple[EzRegex, int]] = list(reversed(list(patterns)))
+    while stack:
+        item = stack.pop()
+        if isinstance(item, tuple):
+            node, n_units = item
+            if len(units) > n_units and units[-1][1] is None:
+                units[-1] = (units[-1][0], node.quantifier)
+            else:
+                units.append((node, node.quantifier))
+        elif type(item) is EzRegex:
+            if item.quantifier is not None:
+                stack.append((item, len(units)))
+            stack.extend(reversed(item._patterns))
+        else:
+            units.append((item, item.quantifier))
+    return units
+
+
+def _alternatives(units: Sequence[Unit]) -> Iterator[list[Unit]]:
+    """Split a sequence of units at its alternation separators."""
+    alternative: list[Unit] = []
+    for unit in units:
+        if not isinstance(unit[0], EzRegex) and unit[0].pattern == "|":
+            yield alternative
+            alternative = []
+        else:
+            alternative.append(unit)
+    yield alternative
+
+
+def _body(node: Pattern) -> str:
+    """Render a node without its quantifier."""
+    rendered, quantifier = str(node), node.quantifier_as_str
+    return rendered[: len(rendered) - len(quantifier)] if quantifier else rendered
+
+
+def _chars(node: Pattern) -> str:
+    """Characters of ``CHARACTERS`` matched by an atom."""
+    return _matched(_body(node))
+
+
+def _matched(body: str) -> str:
+    """Characters of ``CHARACTERS`` matched by the rendered body of an atom."""
+    try:
+        fullmatch = re.compile(body).fullmatch
+    except re.error:
+        return ""
+    return "".join(c for c in CHARACTERS if fullmatch(c))
+
+
+def literal_prefix(
+    patterns: Iterable[Pattern],
+    verbose: bool = False,
+) -> tuple[str, bool]:
+    """Find the literal text every match of a sequence starts with.
+
+    The prefix stops before the first token with a quantifier, including the
+    raw ``?``, ``*`` and ``{m,n}`` leaves of split strings.
+
+    Args:
+        patterns (Iterable[Pattern]): Nodes of the sequence.
+        verbose (bool): Stop at the characters ``re.VERBOSE`` ignores.
+
+    Example:
+        >>> literal_prefix([EzRegex(r"a\\.b")])
+        ('a.b', True)
+        >>> literal_prefix([EzRegex("ab"), Pattern(r"\\d")])
+        ('ab', False)
+        >>> literal_prefix([EzRegex("ab?c")])
+        ('a', False)
+
+    Returns:
+        tuple[str, bool]: The literal prefix, and whether it is the whole
+            sequence.
+    """
+    special = SPECIAL | VERBOSE_SPECIAL if verbose else SPECIAL
+    alternatives = _tokens([(u, q, u) for u, q in _units(patterns)])
+    if alternatives is None or len(alternatives) > 1:
+        return "", False
+    chars = []
+    for kind, unit, repeat in alternatives[0]:
+        if repeat is not None:
+            break
+        if kind is not None:
+            # A raw escape of a literal character, or a raw class
+            if kind[0] != "\\" or kind[1] not in string.punctuation:
+                break
+            chars.append(kind[1])
+        elif isinstance(unit, EzRegex) or unit.pattern in special:
+            break
+        elif len(unit.pattern) == 1:
+            chars.append(unit.pattern)
+        else:
+            break
+    else:
+        return "".join(chars), True
+    return "".join(chars), False
+
+
+def _repeated(bounds: Bounds, q_low: int, q_upp: int | None) -> Bounds:
+    low, upp = bounds
+    if upp == 0 or q_upp == 0:
+        return low * q_low, 0
+    if upp is None or q_upp is None:
+        return low * q_low, None
+    return low * q_low, upp * q_upp
+
+
+def _quantified(bounds: Bounds, quantifier: Quantifier | None) -> Bounds:
+    if quantifier is None:
+        return bounds
+    return _repeated(bounds, quantifier.lower or 0, quantifier.upper)
+
+
+def _raw(node: Pattern) -> str | None:
+    """Pattern of a leaf, ``None`` for the other nodes."""
+    return None if isinstance(node, EzRegex) else node.pattern
+
+
+def _braces(items: Sequence[Item], start: int) -> tuple[int, int | None, int] | None:
+    """Read the raw ``{m,n}`` repeat whose ``{`` is the leaf before ``start``.
+
+    Returns:
+        tuple[int, int | None, int] | None: The bounds of the repeat and the
+            index after its ``}``, or ``None`` if the ``{`` is a literal.
+    """
+    body = []
+    for i in range(start, len(items)):
+        node, quantifier, _ = items[i]
+        char = _raw(node)
+        if char == "}":
+            break
+        if char is None or len(char) != 1 or quantifier is not None:
+            return None
+        body.append(char)
+    else:
+        return None
+    match = RAW_BRACES.fullmatch("".join(body))
+    if not body or match is None:
+        return None
+    low, comma, upp = match.groups()
+    if not comma:
+        return int(low), int(low), i + 1
+    return int(low or 0), int(upp) if upp else None, i + 1
+
+
+def _class_end(items: Sequence[Item], start: int) -> int | None:
+    """Index after the ``]`` of the raw class whose ``[`` is before ``start``."""
+    i = start
+    if i < len(items) and _raw(items[i][0]) == "^":
+        i += 1
+    # A ``]`` right after the opening bracket is a member of the class
+    first = i
+    while i < len(items):
+        node, quantifier, _ = items[i]
+        char = _raw(node)
+        if char == "]" and i > first:
+            return i + 1
+        if char is None or quantifier is not None:
+            return None
+        i += 2 if char == "\\" else 1
+    return None
+
+
+def _group_kind(items: Sequence[Item], start: int) -> tuple[str | None, int] | None:
+    """Read the extension of the raw group whose ``(`` is before ``start``.
+
+    Returns:
+        tuple[str | None, int] | None: The kind of the group and the index of
+            its first unit, ``None`` if the group is unknown. The kind is
+            ``"("`` for a group and the opening text of a lookaround, such as
+            ``"(?<!"``. It is ``None`` for inline flags and comments, which
+            match nothing and have no units.
+    """
+    if start == len(items) or _raw(items[start][0]) != "?":
+        return "(", start
+    text = ""
+    for i in range(start, len(items)):
+        node, quantifier, _ = items[i]
+        char = _raw(node)
+        if char is None or len(char) != 1 or quantifier is not None:
+            return None
+        text += char
+        if text in RAW_LOOKAROUNDS:
+            return "(" + text, i + 1
+        if text.startswith("?#"):
+            if char == ")":
+                return None, i + 1
+        elif char in ":>)":
+            break
+    else:
+        return None
+    if RAW_FLAGS.fullmatch(text):
+        return None, i + 1
+    if RAW_EXTENSIONS.fullmatch(text):
+        return "(", i + 1
+    return None
+
+
+def _tokens(
+    items: Sequence[Item], groups: bool = False
+) -> Optional[list[list[Token]]]:
+    """Read the units of a sequence into the tokens of its alternatives.
+
+    Strings are split into one leaf per character, so ``EzRegex(r"\\d+")``
+    is the leaves ``\\``, ``d`` and ``+``. Raw escapes, repeats and character
+    classes are read the way ``re`` reads them. A token is ``(None, value,
+    repeat)`` for a unit and the value of its item, and ``(text, None,
+    repeat)`` for a raw escape such as ``\\d`` or a raw character class such
+    as ``[^a-z]``.
+
+    Args:
+        items (Sequence[Item]): Units of the sequence and their values.
+        groups (bool): Read the raw groups opened and closed in the sequence.
+            A raw group is the token ``(kind, alternatives, repeat)``, with
+            the kind of ``_group_kind`` and the tokens of its alternatives.
+
+    Returns:
+        list[list[Token]] | None: The tokens of every alternative, ``None`` if
+            they are unknown. A raw parenthesis can open a group anywhere in
+            the tree, so the tokens of a sequence containing one are unknown
+            unless its raw groups are read and all of them are closed in it.
+    """
+    read = _read_tokens(items, 0, groups)
+    if read is None or read[1] != len(items):
+        return None
+    return read[0]
+
+
+def _read_tokens(
+    items: Sequence[Item], start: int, groups: bool
+) -> tuple[list[list[Token]], int] | None:
+    """Read tokens from ``start`` up to the end or a raw ``)`` of a group."""
+    alternatives: list[list[Token]] = [[]]
+    quantified = False
+    i = start
+    while i < len(items):
+        node, quantifier, value = items[i]
+        char = _raw(node)
+        if char == ")" and groups:
+            return alternatives, i
+        i += 1
+        tokens = alternatives[-1]
+        if char == "|":
+            alternatives.append([])
+            continue
+        # Raw parentheses, and a quantifier stacked on a quantified unit
+        if (char == "(" and not groups) or char == ")" or type(node) is EzRegex:
+            return None
+        repeat = RAW_REPEATS.get(char) if char is not None else None
+        if char == "{":
+            braces = _braces(items, i)
+            if braces is not None:
+                repeat, i = braces[:2], braces[2]
+                quantifier = items[i - 1][1]
+        if repeat is not None:
+            if quantifier is not None or not tokens:
+                return None
+            if quantified:
+                # A ``?`` or ``+`` after a repeat makes it lazy or possessive
+                if char in ("?", "+"):
+                    continue
+                return None
+            tokens[-1] = (tokens[-1][0], tokens[-1][1], repeat)
+            quantified = True
+            continue
+        kind = None
+        if char == "\\":
+            if quantifier is not None or i == len(items):
+                return None
+            node, quantifier, _ = items[i]
+            i += 1
+            escaped = _raw(node)
+            if escaped is None or len(escaped) != 1 or escaped in RAW_UNKNOWN:
+                return None
+            kind, value = "\\" + escaped, None
+        elif char == "[":
+            end = _class_end(items, i)
+            if end is None:
+                return None
+            kind = "".join(_raw(n) or "" for n, _, _ in items[i - 1 : end])
+            i, quantifier, value = end, items[end - 1][1], None
+        elif char == "(":
+            opened = _group_kind(items, i) if quantifier is None else None
+            if opened is None:
+                return None
+            kind, i = opened
+            if kind is None:
+                continue
+            read = _read_tokens(items, i, groups)
+            if read is None or read[1] == len(items):
+                return None
+            value, i = read
+            quantifier = items[i][1]
+            i += 1
+        if quantifier is not None:
+            repeat = (quantifier.lower or 0, quantifier.upper)
+        tokens.append((kind, value, repeat))
+        quantified = quantifier is not None
+    return alternatives, i
+
+
+def _tokens_or_units(items: Sequence[Item]) -> list[list[Token]]:
+    """Read the tokens of a sequence and its raw groups, if they are known.
+
+    Returns:
+        list[list[Token]]: The tokens of every alternative. If they are
+            unknown, every unit is a token, quantified by its quantifier.
+    """
+    alternatives = _tokens(items, groups=True)
+    if alternatives is not None:
+        return alternatives
+    alternatives = [[]]
+    for node, quantifier, value in items:
+        if _raw(node) == "|":
+            alternatives.append([])
+        elif quantifier is None:
+            alternatives[-1].append((None, value, None))
+        else:
+            repeat = (quantifier.lower or 0, quantifier.upper)
+            alternatives[-1].append((None, value, repeat))
+    return alternatives
+
+
+def _sequence_bounds(items: Sequence[Item]) -> Optional[Bounds]:
+    """Combine the bounds of the units of a sequence and its alternatives.
+
+    Returns:
+        tuple[int, int | None] | None: The bounds, ``None`` if unknown.
+    """
+    if any(bounds is None for _, _, bounds in items):
+        return None
+    alternatives = _tokens(items)
+    if alternatives is None:
+        return None
+    sums: list[Bounds] = []
+    for tokens in alternatives:
+        low: int = 0
+        upp: int | None = 0
+        for kind, bounds, repeat in tokens:
+            if kind is not None:
+                bounds = (0, 0) if kind in ZERO_WIDTH else (1, 1)
+            if repeat is not None:
+                bounds = _repeated(bounds, *repeat)
+            low += bounds[0]
+            upp = None if upp is None or bounds[1] is None else upp + bounds[1]
+        sums.append((low, upp))
+    lowers = [a[0] for a in sums]
+    uppers = [a[1] for a in sums]
+    if any(u is None for u in uppers):
+        return min(lowers), None
+    return min(lowers), max(u for u in uppers if u is not None)
+
+
+def _atom_bounds(node: Pattern) -> Bounds:
+    if isinstance(node, CharacterSet):
+        return 1, 1
+    if node.pattern in ZERO_WIDTH:
+        return 0, 0
+    return 1, 1
+
+
+def length_bounds(node: Pattern) -> Bounds:
+    """Compute the shortest and longest string a pattern can match.
+
+    Args:
+        node (Pattern): Root of the tree to analyse.
+
+    Example:
+        >>> length_bounds(EzRegex("foo"))
+        (3, 3)
+        >>> length_bounds(Group("ab") | "c")
+        (1, 2)
+        >>> length_bounds(Pattern("a").one_or_more())
+        (1, None)
+        >>> length_bounds(EzRegex(r"\\d{2,4}"))
+        (2, 4)
+
+    Returns:
+        tuple[int, int | None]: Minimum and maximum match length. The maximum
+            is ``None`` if the match length is unbounded, and the bounds are
+            ``(0, None)`` if they are unknown.
+    """
+    bounds = _known_bounds(node)
+    return (0, None) if bounds is None else bounds
+
+
+def _known_bounds(node: Pattern) -> Optional[Bounds]:
+    """Compute the bounds of ``length_bounds``, ``None`` if they are unknown."""
+    units_of: dict[int, list[tuple[Pattern, Quantifier | None]]] = {}
+
+    def group_units(n: Pattern) -> list[Pattern]:
+        if not isinstance(n, Group):
+            return []
+        if id(n) not in units_of:
+            units_of[id(n)] = _units(n._patterns)
+        return [u for u, _ in units_of[id(n)]]
+
+    def visit(n: Pattern, results: list[Optional[Bounds]]) -> Optional[Bounds]:
+        if type(n) is EzRegex:
+            return None
+        if not isinstance(n, Group):
+            return _atom_bounds(n)
+        if n.flags & re.VERBOSE:
+            # Whitespace and comments inside the group match nothing
+            return None
+        units = units_of[id(n)]
+        return _sequence_bounds([(u, q, b) for (u, q), b in zip(units, results)])
+
+    memo: dict[int, Optional[Bounds]] = {}
+    units = _units([node])
+    results = [fold(u, visit, group_units, memo) for u, _ in units]
+    return _sequence_bounds([(u, q, b) for (u, q), b in zip(units, results)])
+
+
+def group_index(node: Pattern) -> dict[str, int]:
+    """Map the names of the named groups of a tree to their group numbers.
+
+    Groups are numbered by the position of their opening parenthesis, which
+    is the pre-order of the capturing groups in the tree. The raw parentheses
+    of string patterns can open groups too, so the numbers of a tree holding
+    one are read from the compiled pattern.
+
+    Example:
+        >>> group_index(Group("a", Group("b", name="b")) + Group("c", name="c"))
+        {'b': 2, 'c': 3}
+        >>> group_index(EzRegex("(a)") + Group("b", name="b"))
+        {'b': 2}
+    """
+    index = {}
+    number = 0
+    for n in walk(node):
+        if isinstance(n, Group) and n.capture:
+            number += 1
+            if n.name is not None:
+                index[n.name] = number
+        elif not isinstance(n, EzRegex) and n.pattern == "(":
+            return dict(node.compile().groupindex)
+    return index
+
+
+class Metrics:
+    """Size and cost metrics of a pattern, see ``metrics``.
+
+    Attributes:
+        node_counts (dict[str, int]): Number of nodes by class name, including
+            quantifiers and the members of character sets.
+        depth (int): Number of nested nodes on the longest path from the root.
+        rendered_length (int): Length of the rendered pattern.
+        capture_groups (int): Number of capturing groups.
+        max_fanout (int): Largest number of alternatives of an alternation.
+        quantifier_product (float): Product of the upper bounds of all
+            quantifiers, ``math.inf`` if one of them is unbounded.
+        backtracking (float): Estimated worst-case number of attempts to
+            match at a single position of an input of ``input_length``
+            characters, ``math.inf`` for exponential backtracking.
+        input_length (int): Input length ``backtracking`` is estimated for.
+    """
+
+    def __init__(
+        self,
+        node_counts: dict[str, int],
+        depth: int,
+        rendered_length: int,
+        capture_groups: int,
+        max_fanout: int,
+        quantifier_product: float,
+        backtracking: float,
+        input_length: int,
+    ):
+        self.node_counts = node_counts
+        self.depth = depth
+        self.rendered_length = rendered_length
+        self.capture_groups = capture_groups
+        self.max_fanout = max_fanout
+        self.quantifier_product = quantifier_product
+        self.backtracking = backtracking
+        self.input_length = input_length
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{self.__class__.__name__}({fields})"
+
+
+class _Summary:
+    """Lengths, first and last characters and backtracking of a sub-pattern."""
+
+    __slots__ = ("low", "upp", "first", "last", "factor", "overlap")
+
+    def __init__(
+        self,
+        low: int,
+        upp: int | None,
+        first: frozenset[str],
+        last: frozenset[str],
+        factor: float,
+        overlap: bool,
+    ):
+        self.low = low
+        self.upp = upp
+        self.first = first
+        self.last = last
+        self.factor = factor
+        # Whether some alternation can match the same text in several ways
+        self.overlap = overlap
+
+
+_EMPTY = _Summary(0, 0, frozenset(), frozenset(), 1.0, False)
+
+
+def _atom_summary(body: str, chars: dict[str, frozenset[str]]) -> _Summary:
+    if body in ZERO_WIDTH:
+        return _EMPTY
+    if body not in chars:
+        chars[body] = frozenset(_matched(body))
+    return _Summary(1, 1, chars[body], chars[body], 1.0, False)
+
+
+def _sequence_summary(units: list[_Summary]) -> _Summary:
+    low = sum(u.low for u in units)
+    uppers = [u.upp for u in units]
+    upp = None if None in uppers else sum(u for u in uppers if u is not None)
+    first: frozenset[str] = frozenset()
+    for u in units:
+        first |= u.first
+        if u.low:
+            break
+    last: frozenset[str] = frozenset()
+    for u in reversed(units):
+        last |= u.last
+        if u.low:
+            break
+    factor = math.prod(u.factor for u in units)
+    return _Summary(low, upp, first, last, factor, any(u.overlap for u in units))
+
+
+def _frame_summary(frame: list[_Summary | None]) -> tuple[_Summary, int]:
+    """Combine the units of a group, ``None`` separating the alternatives."""
+    alternatives: list[list[_Summary]] = [[]]
+    for unit in frame:
+        if unit is None:
+            alternatives.append([])
+        else:
+            alternatives[-1].append(unit)
+    summaries = [_sequence_summary(a) for a in alternatives]
+    if len(summaries) == 1:
+        return summaries[0], 1
+
+    overlap = False
+    seen: frozenset[str] = frozenset()
+    for summary in summaries:
+        overlap = overlap or summary.overlap or bool(seen & summary.first)
+        seen |= summary.first
+    lowers = [a.low for a in summaries]
+    uppers = [a.upp for a in summaries]
+    summary = _Summary(
+        min(lowers),
+        None if None in uppers else max(u for u in uppers if u is not None),
+        seen,
+        frozenset().union(*(a.last for a in summaries)),
+        sum(a.factor for a in summaries),
+        overlap,
+    )
+    return summary, len(summaries)
+
+
+def _repeat(s: _Summary, repeat: Bounds | None, length: int) -> _Summary:
+    if repeat is None:
+        return s
+    q_low, q_upp = repeat
+    if q_upp == 0:
+        return _EMPTY
+    low, upp = _repeated((s.low, s.upp), q_low, q_upp)
+    reps = length if q_upp is None else q_upp
+    if s.low:
+        reps = max(min(reps, length // s.low), 1)
+    # Repeating text that can be matched in several ways multiplies the ways
+    ambiguous = s.overlap or (s.low != s.upp and bool(s.first & s.last))
+    try:
+        factor = s.factor**reps if ambiguous else s.factor * reps
+    except OverflowError:
+        factor = math.inf
+    return _Summary(low, upp, s.first, s.last, factor, s.overlap)
+
+
+def _tokens_summary(
+    alternatives: list[list[Token]], chars: dict[str, frozenset[str]], length: int
+) -> tuple[_Summary, int]:
+    """Combine the tokens of a sequence and its largest fanout."""
+    frame: list[_Summary | None] = []
+    fanout = len(alternatives)
+    for i, tokens in enumerate(alternatives):
+        if i:
+            frame.append(None)
+        for kind, value, repeat in tokens:
+            if kind is None:
+                summary, k = value
+            elif kind.startswith("("):
+                summary, k = _tokens_summary(value, chars, length)
+                if kind != "(":
+                    # Lookarounds backtrack without consuming characters
+                    summary = _Summary(
+                        0, 0, frozenset(), frozenset(), summary.factor, False
+                    )
+            else:
+                summary, k = _atom_summary(kind, chars), 1
+            fanout = max(fanout, k)
+            frame.append(_repeat(summary, repeat, length))
+    return _frame_summary(frame)[0], fanout
+
+
+def metrics(node: Pattern, input_length: int = DEFAULT_INPUT_LENGTH) -> Metrics:
+    """Measure the size and estimate the matching cost of a tree.
+
+    The backtracking factor follows a simple cost model: a sequence multiplies
+    the attempts of its parts, an alternation adds them up and a repetition
+    multiplies them by the number of repetitions. If the repeated text can be
+    matched in more than one way, because of overlapping alternatives or a
+    variable-length part that can end with the character it starts with, the
+    attempts are raised to the power of the number of repetitions instead.
+    Raw escapes, repeats, classes and groups of string patterns are read the
+    way ``re`` reads them.
+
+    Args:
+        node (Pattern): Root of the tree.
+        input_length (int): Input length the backtracking factor is
+            estimated for.
+
+    Example:
+        >>> metrics(Pattern(r"\\d").one_or_more()).backtracking
+        1000.0
+        >>> metrics(Group(Pattern("a").one_or_more()).one_or_more()).backtracking
+        inf
+        >>> metrics(EzRegex("(a+)+b")).backtracking
+        inf
+
+    Returns:
+        Metrics: The metrics of the tree. The backtracking factor is
+            ``math.nan`` if it is unknown, as for back references.
+    """
+    counts: dict[str, int] = {}
+    depth = 0
+    captures = 0
+    product: float = 1
+    raw_groups = False
+
+    def count(name: str, n: int = 1):
+        counts[name] = counts.get(name, 0) + n
+
+    def leaves(n: Pattern) -> Sequence[Pattern]:
+        return () if isinstance(n, CharacterSet) else children(n)
+
+    for event, n, d in iter_events(node, leaves):
+        if event is not ENTER:
+            continue
+        count(type(n).__name__)
+        depth = max(depth, d + 1)
+        if n.quantifier is not None:
+            count("Quantifier")
+            upper = n.quantifier.upper
+            product *= math.inf if upper is None else upper
+        if isinstance(n, Group):
+            captures += n.capture
+        elif isinstance(n, CharacterSet):
+            count("Pattern", len(n._patterns))
+            depth = max(depth, d + 2 if n._patterns else d + 1)
+        elif type(n) is not EzRegex and n.pattern == "(":
+            raw_groups = True
+    if raw_groups:
+        # Raw parentheses can open capturing groups too
+        try:
+            captures = node.compile().groups
+        except re.error:
+            pass
+
+    chars: dict[str, frozenset[str]] = {}
+    units_of: dict[int, list[Unit]] = {}
+
+    def group_units(n: Pattern) -> list[Pattern]:
+        if not isinstance(n, Group):
+            return []
+        if id(n) not in units_of:
+            units_of[id(n)] = _units(n._patterns)
+        return [u for u, _ in units_of[id(n)]]
+
+    def sequence(units: list[Unit], results: list[Any]) -> Any:
+        if None in results:
+            return None
+        items = [(u, q, r) for (u, q), r in zip(units, results)]
+        alternatives = _tokens(items, groups=True)
+        if alternatives is None:
+            return None
+        return _tokens_summary(alternatives, chars, input_length)
+
+    def visit(n: Pattern, results: list[Any]) -> Any:
+        if type(n) is EzRegex:
+            return None
+        if not isinstance(n, Group):
+            return _atom_summary(_body(n), chars), 1
+        return sequence(units_of[id(n)], results)
+
+    memo: dict[int, Any] = {}
+    units = _units([node])
+    summary = sequence(units, [fold(u, visit, group_units, memo) for u, _ in units])
+    if summary is None:
+        # Count the alternatives of the groups of the tree instead
+        fanout = max(
+            len(list(_alternatives(u))) for u in [units, *units_of.values()]
+        )
+        backtracking = math.nan
+    else:
+        backtracking, fanout = summary[0].factor, summary[1]
+    return Metrics(
+        node_counts=counts,
+        depth=depth,
+        rendered_length=len(str(node)),
+        capture_groups=captures,
+        max_fanout=fanout,
+        quantifier_product=product,
+        backtracking=backtracking,
+        input_length=input_length,
+    )
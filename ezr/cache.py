@@ -0,0 +1,207 @@
+"""Persistent cache of the artifacts derived from pattern trees.
+
+Entries are keyed by a structural hash of the tree and the ezr version, and
+hold the rendered pattern, the group map and the length bounds. Loading an
+entry into a tree fills its caches, so a warm start never renders the tree.
+
+The cache is a SQLite database: every write is a transaction, so several
+worker processes can share one cache file safely.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from importlib import metadata
+from typing import Any
+from typing import Iterable
+
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Pattern
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 64 << 20
+# Fraction of max_bytes left after an eviction, so it does not run every write
+EVICT_RATIO = 0.9
+# Keys per query, below the SQLite limit on bound parameters
+QUERY_SIZE = 500
+
+
+def _version() -> str:
+    try:
+        return metadata.version("ezr")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+# Prefix of every hashed key, looking up the installed version is slow
+KEY_SALT = f"ezr-{_version()}-{CACHE_FORMAT}"
+
+
+def structural_key(node: Pattern) -> str:
+    """Hash the structure of a tree, without rendering it.
+
+    Two trees get the same key if they have the same node types, children,
+    quantifiers and group options, in which case they render the same.
+    """
+    parts = [KEY_SALT]
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, EzRegex):
+            parts.append(f"{type(n).__name__}{n._state()!r}{len(n._patterns)}")
+            stack.extend(reversed(n._patterns))
+        elif n._quantifier is None:
+            parts.append(n._pattern)
+        else:
+            parts.append(f"{n._pattern}{n._quantifier}")
+    # Leaves are never empty, so joining with a separator is unambiguous
+    joined = "\x00".join(parts).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(joined, digest_size=16).hexdigest()
+
+
+def _entry(node: Pattern) -> dict[str, Any]:
+    return {
+        "pattern": str(node),
+        "groups": node.group_index(),
+        "bounds": list(node.length_bounds()),
+    }
+
+
+def _apply(node: Pattern, entry: dict[str, Any]):
+    low, upp = entry["bounds"]
+    node._rendered = entry["pattern"]
+    node._groups = entry["groups"]
+    node._bounds = (low, upp)
+
+
+class RuleCache:
+    """On-disk cache of rendered patterns, group maps and length bounds.
+
+    Args:
+        path (str | os.PathLike): Database file, created if it does not exist.
+        max_bytes (int): Size of the stored entries above which the least
+            recently used ones are evicted.
+
+    Example:
+        >>> with RuleCache("rules.cache") as cache:  # doctest: +SKIP
+        ...     cache.load(rules.values())
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+            "size INTEGER NOT NULL, used REAL NOT NULL)",
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+    def _fetch(self, keys: list[str]) -> dict[str, dict[str, Any]]:
+        found: dict[str, dict[str, Any]] = {}
+        for i in range(0, len(keys), QUERY_SIZE):
+            chunk = keys[i : i + QUERY_SIZE]
+            marks = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT key, data FROM entries WHERE key IN ({marks})",
+                chunk,
+            )
+            found.update((key, json.loads(data)) for key, data in rows)
+        return found
+
+    def get(self, node: Pattern) -> dict[str, Any] | None:
+        """Return the cached entry of a tree, without loading it."""
+        key = structural_key(node)
+        return self._fetch([key]).get(key)
+
+    def load(self, patterns: Iterable[Pattern]) -> int:
+        """Fill the caches of trees from disk, storing the missing entries.
+
+        Returns:
+            int: Number of trees found in the cache.
+        """
+        nodes = list(patterns)
+        keys = [structural_key(n) for n in nodes]
+        found = self._fetch(list(set(keys)))
+        now = time.time()
+        missing: dict[str, dict[str, Any]] = {}
+        hits = 0
+        for node, key in zip(nodes, keys):
+            entry = found.get(key)
+            hits += entry is not None
+            if entry is None:
+                entry = missing.get(key)
+            if entry is None:
+                missing[key] = _entry(node)
+            else:
+                _apply(node, entry)
+        self.hits += hits
+        self.misses += len(nodes) - hits
+
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany(
+                "UPDATE entries SET used = ? WHERE key = ?",
+                ((now, key) for key in found),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (
+                    (key, data, len(data), now)
+                    for key, data in zip(missing, map(json.dumps, missing.values()))
+                ),
+            )
+            if missing:
+                self._evict()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return hits
+
+    def _evict(self):
+        """Drop the least recently used entries once the cache is too large."""
+        total = self.size
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * EVICT_RATIO)
+        stale = []
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY used")
+        for key, size in rows.fetchall():
+            if target <= 0:
+                break
+            stale.append((key,))
+            target -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    @property
+    def size(self) -> int:
+        """Total size of the stored entries, in bytes."""
+        query = "SELECT COALESCE(SUM(size), 0) FROM entries"
+        return self._db.execute(query).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self):
+        self._db.execute("DELETE FROM entries")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self) -> RuleCache:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,537 @@
+"""Trigram index of a document corpus, to search it with many patterns.
+
+Every match of a pattern contains the literal text the pattern requires, so
+a document can only match if it contains all trigrams of that text. The
+index maps every trigram to the documents containing it, and a search only
+runs the regex on the documents selected by the trigram query of the
+pattern, as code-search engines do.
+
+The query is derived bottom-up over the tree. Every sub-pattern is described
+either by the exact set of strings it matches, when it is small, or by the
+prefixes and suffixes of its matches and a query they satisfy. Sequences
+join the suffixes of a part with the prefixes of the next one, which yields
+the trigrams spanning both, and alternations combine their queries with OR.
+
+An index is built in memory and can be saved to a file, which ``open`` maps
+into memory: posting lists and documents are only read when a search needs
+them.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import BinaryIO
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from ezr.analysis import _tokens
+from ezr.analysis import _units
+from ezr.analysis import Bounds
+from ezr.analysis import Item
+from ezr.analysis import SPECIAL
+from ezr.analysis import ZERO_WIDTH
+from ezr.ezregex import CharacterSet
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.ezregex import Quantifier
+from ezr.walk import fold
+
+# Largest set of exact strings kept for a sub-pattern
+MAX_EXACT = 1 << 6
+# Largest set of prefixes or suffixes kept for a sub-pattern
+MAX_AFFIXES = 1 << 6
+
+MAGIC = b"EZRINDEX"
+FORMAT = 1
+# Magic, format, byte order, documents, trigrams, postings
+HEADER = struct.Struct("<8sI8sQQQ")
+
+# A trigram, or an AND / OR of queries
+Query = Union[str, Tuple[str, Tuple["Query", ...]]]
+ANY: Query = ("and", ())
+NONE: Query = ("or", ())
+Match = Tuple[int, re.Match]
+
+
+def _and(*queries: Query) -> Query:
+    args: list[Query] = []
+    for q in queries:
+        if q == NONE:
+            return NONE
+        for arg in q[1] if isinstance(q, tuple) and q[0] == "and" else (q,):
+            if arg not in args:
+                args.append(arg)
+    return args[0] if len(args) == 1 else ("and", tuple(args))
+
+
+def _or(*queries: Query) -> Query:
+    args: list[Query] = []
+    for q in queries:
+        if q == ANY:
+            return ANY
+        for arg in q[1] if isinstance(q, tuple) and q[0] == "or" else (q,):
+            if arg not in args:
+                args.append(arg)
+    return args[0] if len(args) == 1 else ("or", tuple(args))
+
+
+def _trigrams(text: str) -> Query:
+    return _and(*(text[i : i + 3] for i in range(len(text) - 2)))
+
+
+def _any_of(strings: Iterable[str]) -> Query:
+    """Query matched by every document containing one of the strings."""
+    return _or(*map(_trigrams, sorted(strings)))
+
+
+def _heads(strings: Iterable[str], n: int = 2) -> frozenset[str]:
+    """Shorten prefixes to the characters a trigram can span."""
+    heads = frozenset(s[:n] for s in strings)
+    return heads if len(heads) <= MAX_AFFIXES else _heads(heads, n - 1)
+
+
+def _tails(strings: Iterable[str], n: int = 2) -> frozenset[str]:
+    tails = frozenset(s[len(s) - n :] if len(s) > n else s for s in strings)
+    return tails if len(tails) <= MAX_AFFIXES else _tails(tails, n - 1)
+
+
+def _product(left: Iterable[str], right: Iterable[str]) -> frozenset[str]:
+    return frozenset(a + b for a in left for b in right)
+
+
+class _Info:
+    """Strings matched by a sub-pattern.
+
+    Either ``exact`` is the set of all strings it matches, or every match
+    starts with one of ``prefix``, ends with one of ``suffix`` and satisfies
+    ``match``.
+    """
+
+    __slots__ = ("exact", "prefix", "suffix", "match")
+
+    def __init__(
+        self,
+        exact: frozenset[str] | None = None,
+        prefix: frozenset[str] = frozenset([""]),
+        suffix: frozenset[str] = frozenset([""]),
+        match: Query = ANY,
+    ):
+        self.exact = exact
+        self.prefix = prefix
+        self.suffix = suffix
+        self.match = match
+
+    def loose(self) -> _Info:
+        """Describe the strings by affixes and query, without the exact set."""
+        if self.exact is None:
+            return self
+        return _Info(
+            prefix=_heads(self.exact),
+            suffix=_tails(self.exact),
+            match=_any_of(self.exact),
+        )
+
+    def query(self) -> Query:
+        return self.match if self.exact is None else _any_of(self.exact)
+
+
+_EMPTY = _Info(frozenset([""]))
+_UNKNOWN = _Info()
+
+
+def _literal(text: str) -> _Info:
+    return _Info(frozenset([text]))
+
+
+def _concat(x: _Info, y: _Info) -> _Info:
+    if x.exact is not None and y.exact is not None:
+        if len(x.exact) * len(y.exact) <= MAX_EXACT:
+            return _Info(_product(x.exact, y.exact))
+    left = x.suffix if x.exact is None else x.exact
+    right = y.prefix if y.exact is None else y.exact
+    join = ANY
+    if len(left) * len(right) <= MAX_EXACT:
+        join = _any_of(_product(left, right))
+    if x.exact is None:
+        prefix = x.prefix
+    elif len(x.exact) * len(right) <= MAX_EXACT:
+        prefix = _heads(_product(x.exact, right))
+    else:
+        prefix = _heads(x.exact)
+    if y.exact is None:
+        suffix = y.suffix
+    elif len(left) * len(y.exact) <= MAX_EXACT:
+        suffix = _tails(_product(left, y.exact))
+    else:
+        suffix = _tails(y.exact)
+    return _Info(None, prefix, suffix, _and(x.query(), y.query(), join))
+
+
+def _alternate(infos: list[_Info]) -> _Info:
+    exacts = [i.exact for i in infos if i.exact is not None]
+    if len(exacts) == len(infos):
+        exact = frozenset().union(*exacts)
+        if len(exact) <= MAX_EXACT:
+            return _Info(exact)
+    loose = [i.loose() for i in infos]
+    return _Info(
+        None,
+        _heads(frozenset().union(*(i.prefix for i in loose))),
+        _tails(frozenset().union(*(i.suffix for i in loose))),
+        _or(*(i.match for i in loose)),
+    )
+
+
+def _repeat(info: _Info, repeat: Bounds | None) -> _Info:
+    if repeat is None:
+        return info
+    low, upp = repeat
+    if upp == 0:
+        return _EMPTY
+    if not low:
+        return _alternate([info, _EMPTY]) if upp == 1 else _UNKNOWN
+    # At least one repetition: it starts, ends and contains what one does
+    return info.loose()
+
+
+def _set_info(node: CharacterSet) -> _Info:
+    chars = set()
+    escaped = False
+    for member in node._patterns:
+        if isinstance(member, EzRegex) or member.quantifier is not None:
+            return _UNKNOWN
+        p = member.pattern
+        if escaped:
+            if len(p) != 1 or p.isalnum():
+                return _UNKNOWN
+            chars.add(p)
+            escaped = False
+        elif p == "\\":
+            escaped = True
+        elif len(p) == 1 and p not in "^-[]":
+            chars.add(p)
+        else:
+            # Negation, ranges and classes such as \d
+            return _UNKNOWN
+    if escaped or not chars or len(chars) > MAX_EXACT:
+        return _UNKNOWN
+    return _Info(frozenset(chars))
+
+
+def _sequence_info(items: list[Item]) -> _Info | None:
+    """Combine the parts of a sequence and its alternatives.
+
+    Returns:
+        _Info | None: The strings, ``None`` if the pattern gives no query.
+    """
+    if any(info is None for _, _, info in items):
+        return None
+    alternatives = _tokens(items)
+    if alternatives is None:
+        return None
+    infos = []
+    for tokens in alternatives:
+        info = _EMPTY
+        for kind, part, repeat in tokens:
+            if kind in ZERO_WIDTH:
+                part = _EMPTY
+            elif kind is not None:
+                # A raw class, or the escape of a class or a literal character
+                literal = kind[0] == "\\" and not kind[1].isalnum()
+                part = _literal(kind[1]) if literal else _UNKNOWN
+            info = _concat(info, _repeat(part, repeat))
+        infos.append(info)
+    return infos[0] if len(infos) == 1 else _alternate(infos)
+
+
+def _info(node: Pattern) -> _Info | None:
+    units_of: dict[int, list[tuple[Pattern, Quantifier | None]]] = {}
+
+    def group_units(n: Pattern) -> list[Pattern]:
+        if not isinstance(n, Group):
+            return []
+        if id(n) not in units_of:
+            units_of[id(n)] = _units(n._patterns)
+        return [u for u, _ in units_of[id(n)]]
+
+    def visit(n: Pattern, results: list[_Info | None]) -> _Info | None:
+        if isinstance(n, Group):
+            if n.flags & (re.IGNORECASE | re.VERBOSE):
+                return _UNKNOWN if None not in results else None
+            units = units_of[id(n)]
+            return _sequence_info([(u, q, i) for (u, q), i in zip(units, results)])
+        if isinstance(n, CharacterSet):
+            return _set_info(n)
+        if isinstance(n, EzRegex):
+            # A quantifier stacked on a quantified unit, see _units
+            return None
+        p = n.pattern
+        if p in ZERO_WIDTH:
+            return _EMPTY
+        return _literal(p) if len(p) == 1 and p not in SPECIAL else _UNKNOWN
+
+    memo: dict[int, _Info | None] = {}
+    units = _units([node])
+    results = [fold(u, visit, group_units, memo) for u, _ in units]
+    return _sequence_info([(u, q, i) for (u, q), i in zip(units, results)])
+
+
+def trigram_query(node: Pattern, flags: int = 0) -> Query:
+    """Derive the trigrams a document must contain for a pattern to match.
+
+    Args:
+        node (Pattern): Root of the tree.
+        flags (int): Flags the pattern is compiled with. Case-insensitive and
+            verbose patterns match text that differs from their literals, and
+            give no query.
+
+    Example:
+        >>> trigram_query(EzRegex("hello"))
+        ('and', ('hel', 'ell', 'llo'))
+        >>> from ezr.helper import any_of
+        >>> trigram_query(any_of("foo", "bar") + Pattern(r"\\d"))
+        ('or', ('bar', 'foo'))
+
+    Returns:
+        Query: A trigram, or an ``("and" | "or", queries)`` tuple. ``ANY``,
+            the empty AND, matches every document.
+    """
+    if flags & (re.IGNORECASE | re.VERBOSE):
+        return ANY
+    info = _info(node)
+    return ANY if info is None else info.query()
+
+
+def _key(trigram: str) -> int:
+    """Pack the code points of a trigram into an integer, in string order."""
+    a, b, c = map(ord, trigram)
+    return a << 42 | b << 21 | c
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", "surrogatepass")
+
+
+def _pad(size: int) -> bytes:
+    return bytes(-size % 8)
+
+
+class CorpusIndex:
+    """Trigram index of a list of documents.
+
+    Args:
+        documents (Iterable[str]): Documents to index, numbered from zero.
+
+    Example:
+        >>> index = CorpusIndex(["error: disk full", "ok", "error: timeout"])
+        >>> [i for i, m in index.search(EzRegex("timeout"))]
+        [2]
+        >>> index.candidates(EzRegex("error"))
+        [0, 2]
+    """
+
+    def __init__(self, documents: Iterable[str] = ()):
+        self._documents: list[str] = []
+        self._postings: dict[str, array] = {}
+        self._file: BinaryIO | None = None
+        self._mmap: mmap.mmap | None = None
+        for document in documents:
+            self.add(document)
+
+    @classmethod
+    def open(cls, path: str | os.PathLike) -> CorpusIndex:
+        """Map an index saved with ``save`` into memory, read-only.
+
+        Raises:
+            ValueError: If the file is not an index of this format, or was
+                written on a machine of a different byte order.
+        """
+        index = cls()
+        index._file = open(path, "rb")
+        try:
+            index._mmap = mmap.mmap(index._file.fileno(), 0, access=mmap.ACCESS_READ)
+            index._map()
+        except (ValueError, struct.error):
+            index.close()
+            raise ValueError(f"{os.fspath(path)!r} is not a valid corpus index")
+        return index
+
+    def _map(self):
+        assert self._mmap is not None
+        magic, version, order, n_docs, n_trigrams, n_postings = HEADER.unpack_from(
+            self._mmap,
+        )
+        if magic != MAGIC or version != FORMAT:
+            raise ValueError("Unknown index format")
+        if order.rstrip(b"\x00").decode() != sys.byteorder:
+            raise ValueError("Index written with a different byte order")
+        view = memoryview(self._mmap)
+        offset = HEADER.size + len(_pad(HEADER.size))
+
+        def section(n: int, typecode: str) -> memoryview:
+            nonlocal offset
+            size = n * array(typecode).itemsize
+            data = view[offset : offset + size].cast(typecode)
+            offset += size + len(_pad(size))
+            return data
+
+        self._keys = section(n_trigrams, "Q")
+        self._starts = section(n_trigrams + 1, "Q")
+        self._ids = section(n_postings, "I")
+        self._offsets = section(n_docs + 1, "Q")
+        self._text = view[offset : offset + self._offsets[n_docs]]
+
+    def add(self, document: str) -> int:
+        """Index a document, and return its number.
+
+        Raises:
+            ValueError: If the index was opened from a file.
+        """
+        if self._mmap is not None:
+            raise ValueError("An index opened from a file is read-only")
+        number = len(self._documents)
+        self._documents.append(document)
+        postings = self._postings
+        for trigram in {document[i : i + 3] for i in range(len(document) - 2)}:
+            ids = postings.get(trigram)
+            if ids is None:
+                ids = postings[trigram] = array("I")
+            ids.append(number)
+        return number
+
+    def save(self, path: str | os.PathLike):
+        """Write the index and its documents to a file, see ``open``."""
+        if self._mmap is not None:
+            raise ValueError("The index is already stored in a file")
+        trigrams = sorted(self._postings, key=_key)
+        keys = array("Q", map(_key, trigrams))
+        starts = array("Q", [0])
+        ids = array("I")
+        for trigram in trigrams:
+            ids.extend(self._postings[trigram])
+            starts.append(len(ids))
+        texts = [_encode(d) for d in self._documents]
+        offsets = array("Q", [0])
+        for text in texts:
+            offsets.append(offsets[-1] + len(text))
+        header = HEADER.pack(
+            MAGIC,
+            FORMAT,
+            sys.byteorder.encode(),
+            len(texts),
+            len(trigrams),
+            len(ids),
+        )
+        with open(path, "wb") as f:
+            f.write(header + _pad(len(header)))
+            for table in (keys, starts, ids, offsets):
+                data = table.tobytes()
+                f.write(data + _pad(len(data)))
+            for text in texts:
+                f.write(text)
+
+    def close(self):
+        if self._mmap is not None:
+            # Release the views into the map before closing it
+            for name in ("_keys", "_starts", "_ids", "_offsets", "_text"):
+                view = self.__dict__.pop(name, None)
+                if view is not None:
+                    view.release()
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> CorpusIndex:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        if self._mmap is not None:
+            return len(self._offsets) - 1
+        return len(self._documents)
+
+    def __getitem__(self, number: int) -> str:
+        if self._mmap is None:
+            return self._documents[number]
+        if not 0 <= number < len(self):
+            raise IndexError(number)
+        start, end = self._offsets[number], self._offsets[number + 1]
+        return str(self._text[start:end], "utf-8", "surrogatepass")
+
+    def _posting(self, trigram: str) -> Sequence[int]:
+        """Numbers of the documents containing a trigram, in increasing order."""
+        if self._mmap is None:
+            return self._postings.get(trigram, ())
+        key = _key(trigram)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return ()
+        return self._ids[self._starts[i] : self._starts[i + 1]]
+
+    def _evaluate(self, query: Query) -> Optional[set[int]]:
+        """Documents satisfying a query, ``None`` for all of them."""
+        if isinstance(query, str):
+            return set(self._posting(query))
+        op, args = query
+        if op == "or":
+            result: set[int] = set()
+            for arg in args:
+                found = self._evaluate(arg)
+                if found is None:
+                    return None
+                result |= found
+            return result
+        # Intersect the shortest posting lists first
+        trigrams = sorted(
+            (a for a in args if isinstance(a, str)),
+            key=lambda t: len(self._posting(t)),
+        )
+        queries: list[Query] = [*trigrams, *(a for a in args if not isinstance(a, str))]
+        found = None
+        for arg in queries:
+            ids = self._evaluate(arg)
+            if ids is not None:
+                found = ids if found is None else found & ids
+                if not found:
+                    break
+        return found
+
+    def candidates(self, pattern: str | Pattern, flags: int = 0) -> list[int]:
+        """Numbers of the documents the trigram query of a pattern selects."""
+        found = self._evaluate(trigram_query(_as_node(pattern), flags))
+        return list(range(len(self))) if found is None else sorted(found)
+
+    def search(self, pattern: str | Pattern, flags: int = 0) -> Iterator[Match]:
+        """Yield ``(number, match)`` for the first match in every document."""
+        node = _as_node(pattern)
+        search = node.compile(flags).search
+        for number in self.candidates(node, flags):
+            m = search(self[number])
+            if m is not None:
+                yield number, m
+
+    def finditer(self, pattern: str | Pattern, flags: int = 0) -> Iterator[Match]:
+        """Yield ``(number, match)`` for every match in every document."""
+        node = _as_node(pattern)
+        finditer = node.compile(flags).finditer
+        for number in self.candidates(node, flags):
+            for m in finditer(self[number]):
+                yield number, m
+
+
+def _as_node(pattern: str | Pattern) -> Pattern:
+    if isinstance(pattern, Pattern):
+        return pattern
+    return EzRegex(pattern) if len(pattern) != 1 else Pattern(pattern)
@@ -0,0 +1,262 @@
+"""Matching with a time limit.
+
+The ``re`` engine cannot be interrupted and holds the GIL while it runs, so
+a runaway match can only be stopped by running it in another process. The
+matching happens in a pool of worker processes, and a worker that exceeds
+its deadline is killed and replaced.
+"""
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+import time
+from typing import Any
+from typing import Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ezr.ahocorasick import LiteralPattern
+
+METHODS = ("search", "match", "fullmatch", "findall", "finditer")
+TIMED = "time:"
+
+
+class MatchTimeout(TimeoutError):
+    pass
+
+
+class MatchResult:
+    """Match found by a worker process, with the interface of ``re.Match``.
+
+    Literal alternations matched without ``re`` build their matches with it
+    too, with a ``LiteralPattern`` as the pattern.
+    """
+
+    def __init__(
+        self, compiled: re.Pattern | LiteralPattern, string: str, regs: tuple
+    ):
+        self.re = compiled
+        self.string = string
+        self.regs = regs
+
+    def _index(self, group: int | str) -> int:
+        if isinstance(group, str):
+            return self.re.groupindex[group]
+        if not 0 <= group < len(self.regs):
+            raise IndexError("no such group")
+        return group
+
+    def span(self, group: int | str = 0) -> tuple[int, int]:
+        return self.regs[self._index(group)]
+
+    def start(self, group: int | str = 0) -> int:
+        return self.span(group)[0]
+
+    def end(self, group: int | str = 0) -> int:
+        return self.span(group)[1]
+
+    def group(self, *groups: int | str) -> Any:
+        if len(groups) > 1:
+            return tuple(self.group(g) for g in groups)
+        start, end = self.span(groups[0] if groups else 0)
+        return None if start == -1 else self.string[start:end]
+
+    def groups(self, default: Any = None) -> tuple[Any, ...]:
+        return tuple(
+            default if value is None else value
+            for value in (self.group(i) for i in range(1, len(self.regs)))
+        )
+
+    def groupdict(self, default: Any = None) -> dict[str, Any]:
+        return {
+            name: default if self.group(name) is None else self.group(name)
+            for name in self.re.groupindex
+        }
+
+    def __getitem__(self, group: int | str) -> Any:
+        return self.group(group)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} object; "
+            f"span={self.span()}, match={self.group()!r}>"
+        )
+
+
+def _serve(conn):
+    """Worker loop, answering ``(pattern, flags, method, string)`` requests."""
+    result: Any
+    while True:
+        try:
+            pattern, flags, method, string = conn.recv()
+        except EOFError:
+            return
+        try:
+            compiled = re.compile(pattern, flags)
+            if method.startswith(TIMED):
+                run = getattr(compiled, method[len(TIMED) :])
+                start = time.perf_counter()
+                run(string)
+                result = time.perf_counter() - start
+            elif method == "findall":
+                result = compiled.findall(string)
+            elif method == "finditer":
+                result = [m.regs for m in compiled.finditer(string)]
+            else:
+                m = getattr(compiled, method)(string)
+                result = None if m is None else m.regs
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, e))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class DeadlinePool:
+    """Pool of worker processes running matches with a time limit.
+
+    Args:
+        size (int | None): Maximum number of concurrent matches. Defaults to
+            the number of CPUs.
+        context: ``multiprocessing`` context used to start workers.
+    """
+
+    def __init__(self, size: int | None = None, context=None):
+        self._context = context or multiprocessing.get_context()
+        self._size = size or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(self._size)
+        self._idle: list[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self._context)
+
+    def _replace(self, worker: _Worker):
+        """Kill a worker and start its replacement in a background thread.
+
+        Only the signal is sent by the caller. Reaping the process and
+        starting the next one happen while the caller handles the error, so
+        the call after a timeout usually finds a running worker.
+        """
+        worker.process.kill()
+        threading.Thread(target=self._respawn, args=(worker,), daemon=True).start()
+
+    def _respawn(self, worker: _Worker):
+        worker.kill()
+        replacement = _Worker(self._context)
+        with self._lock:
+            if not self._closed and len(self._idle) < self._size:
+                self._idle.append(replacement)
+                return
+        replacement.kill()
+
+    def run(
+        self,
+        compiled: re.Pattern,
+        method: str,
+        string: str,
+        timeout: float,
+    ) -> Any:
+        """Run ``compiled.<method>(string)``, raising if it takes too long.
+
+        The timeout covers the wait for a free worker, the start of a worker
+        process if none is idle, and the match itself. A worker killed at a
+        timeout is replaced in the background, so the error is raised without
+        waiting for a new process.
+
+        Raises:
+            MatchTimeout: If no result is available after ``timeout`` seconds.
+        """
+        timed = method.startswith(TIMED)
+        if (method[len(TIMED) :] if timed else method) not in METHODS:
+            raise ValueError(f"Unknown method {method!r}")
+        deadline = time.monotonic() + timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise MatchTimeout(f"No worker available within {timeout}s")
+        try:
+            worker = self._checkout()
+            try:
+                worker.conn.send((compiled.pattern, compiled.flags, method, string))
+                ready = worker.conn.poll(max(0.0, deadline - time.monotonic()))
+                if ready:
+                    ok, result = worker.conn.recv()
+            except BaseException:
+                self._replace(worker)
+                raise
+            if not ready:
+                self._replace(worker)
+                raise MatchTimeout(f"Matching took longer than {timeout}s")
+            with self._lock:
+                self._idle.append(worker)
+        finally:
+            self._slots.release()
+
+        if not ok:
+            raise result
+        if timed or method == "findall":
+            return result
+        if method == "finditer":
+            return iter([MatchResult(compiled, string, regs) for regs in result])
+        return None if result is None else MatchResult(compiled, string, result)
+
+    def time(
+        self,
+        compiled: re.Pattern,
+        method: str,
+        string: str,
+        timeout: float,
+    ) -> float:
+        """Measure the time ``compiled.<method>(string)`` takes in a worker.
+
+        Raises:
+            MatchTimeout: If the match does not finish after ``timeout`` seconds.
+        """
+        return self.run(compiled, f"{TIMED}{method}", string, timeout)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.kill()
+
+
+_default_pool: DeadlinePool | None = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> DeadlinePool:
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = DeadlinePool()
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def run_with_deadline(
+    compiled: re.Pattern,
+    method: str,
+    string: str,
+    timeout: float,
+) -> MatchResult | list | Iterator[MatchResult] | None:
+    """Run a match in the default worker pool, see ``DeadlinePool.run``."""
+    return default_pool().run(compiled, method, string, timeout)
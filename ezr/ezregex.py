@@ -1,10 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import re
 import string
+import weakref
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import Sequence
 
+from ezr.stream import DEFAULT_CHUNK_SIZE
+from ezr.stream import DEFAULT_OVERLAP
+from ezr.stream import finditer_chunks
+from ezr.stream import iter_chunks
+from ezr.stream import split_chunks
+from ezr.stream import Stream
+from ezr.stream import StreamMatch
+from ezr.stream import sub_chunks
 from ezr.util import bold
+from ezr.walk import children
+from ezr.walk import ENTER
+from ezr.walk import equal
+from ezr.walk import iter_events
+from ezr.walk import postorder
 
 INDENT = "  "
 TREE_START = "┌─"
@@ -18,6 +38,24 @@ LCASE_RANGE = r"[a-z]-[a-z]"
 UCASE_RANGE = r"[A-Z]-[A-Z]"
 NUM_RANGE = r"[0-9]-[0-9]"
 ANY_RANGE = rf"{LCASE_RANGE}|{UCASE_RANGE}|{NUM_RANGE}"
+# Compiled once, every node construction runs them
+VALID_PATTERN = re.compile(rf"^(\\?[a-zA-Z]|{ANY_RANGE}|.)$")
+RANGE_PATTERN = re.compile(ANY_RANGE)
+GROUP_NAME = re.compile(r"^(?=[a-zA-Z])\w+$")
+
+# Renderings longer than this are only cached if they are at most half as long
+# as their parent's
+RENDER_CACHE_LIMIT = 1 << 12
+# Number of parents of a shared node above which dead references are pruned
+PARENTS_PRUNE = 1 << 3
+
+FLAG_LETTERS = {
+    re.ASCII: "a",
+    re.IGNORECASE: "i",
+    re.MULTILINE: "m",
+    re.DOTALL: "s",
+    re.VERBOSE: "x",
+}
 
 
 class ForbiddenError(Exception):
@@ -28,6 +66,12 @@ class Pattern:
     _annotation: str = "Pattern"
     _pattern: str
     _quantifier: Quantifier | None = None
+    _parents: weakref.ref | dict[int, weakref.ref] | None = None
+    _rendered: str | None = None
+    _compiled: dict[int, re.Pattern] | None = None
+    _bounds: tuple[int, int | None] | None = None
+    _groups: dict[str, int] | None = None
+    _literals: tuple[str, Any] | None = None
 
     def __init__(
         self,
@@ -36,24 +80,12 @@ class Pattern:
         upper: int | None = None,
         lazy: bool = False,
     ):
-        if not isinstance(pattern, str):
-            raise TypeError(f"Pattern must be a string, not {type(pattern)}")
-        if not self.is_valid_pattern(pattern):
-            err = "Pattern must be a single character or a valid range"
-            raise ValueError(err)
-        if re.match(ANY_RANGE, pattern):
-            left, right = pattern.split("-")
-            if left == right:
-                raise ValueError("Range must specify distinct values")
-            if left > right:
-                raise ValueError("Range must be in ascending order")
-            self._annotation = "Range: "
-            self._annotation += f"Matches a character in the range {pattern}"
         self._pattern = pattern
+        self._validate()
         self._lower = lower
         self._upper = upper
         if lower is not None or upper is not None:
-            self._quantifier = Quantifier(lower=lower, upper=upper, lazy=lazy)
+            self._set_quantifier(Quantifier(lower=lower, upper=upper, lazy=lazy))
 
     @classmethod
     def from_quantifier(cls, *pattern, quantifier: Quantifier):
@@ -66,9 +98,65 @@ class Pattern:
             lazy=quantifier.is_lazy,
         )
 
+    @classmethod
+    def build_unchecked(cls, pattern: str, quantifier: Quantifier | None = None):
+        """Build a leaf without validating it, for trusted sources.
+
+        Trees built from serialized or generated rules are valid by
+        construction, ``validate`` can still check them in a single pass.
+        """
+        node = cls.__new__(cls)
+        node._pattern = pattern
+        if quantifier is not None:
+            node._quantifier = quantifier
+            quantifier._add_parent(node)
+        return node
+
+    def _validate(self):
+        """Check the node itself, raising the errors of its constructor."""
+        pattern = self._pattern
+        if not isinstance(pattern, str):
+            raise TypeError(f"Pattern must be a string, not {type(pattern)}")
+        if len(pattern) == 1 and pattern != "\n":
+            # The common case, a single character is valid and not a range
+            return
+        if not self.is_valid_pattern(pattern):
+            err = "Pattern must be a single character or a valid range"
+            raise ValueError(err)
+        if RANGE_PATTERN.match(pattern):
+            left, right = pattern.split("-")
+            if left == right:
+                raise ValueError("Range must specify distinct values")
+            if left > right:
+                raise ValueError("Range must be in ascending order")
+            self._annotation = "Range: "
+            self._annotation += f"Matches a character in the range {pattern}"
+
+    def validate(self):
+        """Run the checks of the constructors on every node of the tree.
+
+        Nodes shared by several parents are checked once.
+
+        Raises:
+            TypeError | ValueError: The error the constructor of an invalid
+                node raises.
+
+        Returns:
+            Pattern: The node.
+        """
+        seen = set()
+        stack: list[Pattern] = [self]
+        while stack:
+            node = stack.pop()
+            if id(node) not in seen:
+                seen.add(id(node))
+                node._validate()
+                stack.extend(children(node))
+        return self
+
     @staticmethod
     def is_valid_pattern(pattern: str) -> bool:
-        return re.match(rf"^(\\?[a-zA-Z]|{ANY_RANGE}|.)$", pattern) is not None
+        return VALID_PATTERN.match(pattern) is not None
 
     @property
     def pattern(self) -> str:
@@ -113,8 +201,263 @@ class Pattern:
             )
         return f"{self.pattern_type}. Matches '{self.pattern}'"
 
-    def compile(self):
-        return re.compile(str(self))
+    def compile(self, flags: int = 0) -> re.Pattern:
+        pattern = str(self)
+        if self._compiled is None:
+            self._compiled = {}
+        compiled = self._compiled.get(flags)
+        if compiled is None or compiled.pattern != pattern:
+            compiled = self._compiled[flags] = re.compile(pattern, flags)
+        return compiled
+
+    def is_ascii(self) -> bool:
+        """Check whether the rendered pattern only contains ASCII characters.
+
+        On ASCII input such a pattern matches the same with and without
+        ``re.ASCII``, which makes ``\\w``, ``\\d``, ``\\s`` and ``\\b`` cheaper.
+        """
+        return str(self).isascii()
+
+    def _compiled_for(self, string: str) -> re.Pattern:
+        if string.isascii() and self.is_ascii():
+            return self.compile(re.ASCII)
+        return self.compile()
+
+    def length_bounds(self) -> tuple[int, int | None]:
+        if self._bounds is None:
+            from ezr.analysis import length_bounds
+
+            self._bounds = length_bounds(self)
+        return self._bounds
+
+    def search(self, string: str, timeout: float | None = None):
+        if len(string) < self.length_bounds()[0]:
+            return None
+        return self._run("search", string, timeout)
+
+    def match(self, string: str, timeout: float | None = None):
+        if len(string) < self.length_bounds()[0]:
+            return None
+        return self._run("match", string, timeout)
+
+    def fullmatch(self, string: str, timeout: float | None = None):
+        low, upp = self.length_bounds()
+        if len(string) < low or (upp is not None and len(string) > upp):
+            return None
+        return self._run("fullmatch", string, timeout)
+
+    def findall(self, string: str, timeout: float | None = None) -> list:
+        if len(string) < self.length_bounds()[0]:
+            return []
+        return self._run("findall", string, timeout)
+
+    def finditer(self, string: str, timeout: float | None = None) -> Iterator:
+        if len(string) < self.length_bounds()[0]:
+            return iter(())
+        return self._run("finditer", string, timeout)
+
+    def count(self, string: str) -> int:
+        """Count the non-overlapping matches without creating ``Match`` objects."""
+        if len(string) < self.length_bounds()[0]:
+            return 0
+        literals = self._literal_pattern()
+        if literals is not None:
+            return sum(1 for _ in literals.automaton.finditer(string))
+        compiled = self._compiled_for(string)
+        if compiled.groups:
+            # findall would build a tuple of the groups for every match
+            return compiled.subn("", string)[1]
+        return len(compiled.findall(string))
+
+    def any_match(self, strings: Iterable[str]) -> bool:
+        from ezr.vectorize import any_match
+
+        return any_match(self, strings)
+
+    def all_match(self, strings: Iterable[str]) -> bool:
+        from ezr.vectorize import all_match
+
+        return all_match(self, strings)
+
+    def first_match(self, strings: Iterable[str]) -> re.Match | None:
+        from ezr.vectorize import first_match
+
+        return first_match(self, strings)
+
+    def cached(self, maxsize: int | None = 1 << 12, max_length: int = 1 << 10):
+        """Wrap the pattern in an LRU cache of match results keyed by input."""
+        from ezr.memo import CachedPattern
+
+        return CachedPattern(self, maxsize, max_length)
+
+    def _literal_pattern(self):
+        """Aho-Corasick matcher, if the node is a large alternation of literals."""
+        pattern = str(self)
+        if self._literals is None or self._literals[0] != pattern:
+            from ezr.ahocorasick import compile_literals
+
+            self._literals = (pattern, compile_literals(self))
+        return self._literals[1]
+
+    def _run(self, method: str, string: str, timeout: float | None) -> Any:
+        """Run a method of the compiled pattern, in a worker if ``timeout`` is set.
+
+        Raises:
+            MatchTimeout: If the match does not finish within ``timeout`` seconds.
+        """
+        literals = self._literal_pattern()
+        if literals is not None:
+            # The automaton runs in linear time, there is nothing to time out
+            return getattr(literals, method)(string)
+        compiled = self._compiled_for(string)
+        if timeout is None:
+            return getattr(compiled, method)(string)
+        from ezr.deadline import run_with_deadline
+
+        return run_with_deadline(compiled, method, string, timeout)
+
+    def finditer_stream(
+        self,
+        stream: Stream,
+        overlap: int = DEFAULT_OVERLAP,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[StreamMatch]:
+        """Find all matches in a file-like object or an iterable of strings.
+
+        If the pattern has a finite maximum length, it is used as the exact
+        overlap between chunks and ``overlap`` is ignored.
+        """
+        chunks = iter_chunks(stream, chunk_size)
+        return finditer_chunks(self.compile(), chunks, self._window(overlap))
+
+    def isplit(
+        self,
+        stream: Stream,
+        maxsplit: int = 0,
+        overlap: int = DEFAULT_OVERLAP,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[str | None]:
+        """Split a string, a file-like object or an iterable of strings lazily.
+
+        Yields the same pieces as ``re.split``, including the groups of every
+        match. The overlap between chunks is chosen as in ``finditer_stream``.
+        """
+        chunks = iter_chunks(stream, chunk_size)
+        return split_chunks(self.compile(), chunks, self._window(overlap), maxsplit)
+
+    def isub(
+        self,
+        stream: Stream,
+        repl: str | Callable[[StreamMatch], str],
+        out: Any,
+        count: int = 0,
+        overlap: int = DEFAULT_OVERLAP,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Replace the matches in a stream, writing the result to ``out``.
+
+        The output is written once per chunk, so rewriting a large file only
+        keeps about ``chunk_size`` characters in memory. Returns the number of
+        replacements, as ``re.subn``.
+        """
+        chunks = iter_chunks(stream, chunk_size)
+        window = self._window(overlap)
+        return sub_chunks(self.compile(), chunks, window, repl, out, count)
+
+    def afinditer(
+        self,
+        reader: asyncio.StreamReader,
+        overlap: int = DEFAULT_OVERLAP,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        encoding: str = "utf-8",
+    ) -> AsyncIterator[StreamMatch]:
+        """Find all matches in the text read from an ``asyncio.StreamReader``."""
+        from ezr.aio import afinditer
+
+        window = self._window(overlap)
+        return afinditer(self.compile(), reader, window, chunk_size, encoding)
+
+    def afilter_lines(
+        self,
+        reader: asyncio.StreamReader,
+        encoding: str = "utf-8",
+    ) -> AsyncIterator[str]:
+        """Yield the lines of an ``asyncio.StreamReader`` that contain a match."""
+        from ezr.aio import afilter_lines
+
+        return afilter_lines(self.compile(), reader, encoding)
+
+    def _window(self, overlap: int) -> int:
+        upp = self.length_bounds()[1]
+        return overlap if upp is None else upp
+
+    def match_mask(self, array):
+        from ezr.vectorize import match_mask
+
+        return match_mask(self, array)
+
+    def count_array(self, array):
+        from ezr.vectorize import count_array
+
+        return count_array(self, array)
+
+    def extract_array(self, array, group: int | str = 0):
+        from ezr.vectorize import extract_array
+
+        return extract_array(self, array, group)
+
+    def extract_columns(self, lines, as_arrays: bool = False) -> dict:
+        from ezr.vectorize import extract_columns
+
+        return extract_columns(self, lines, as_arrays)
+
+    def filter_lines(self, buffer: str, numbers: bool = False) -> list:
+        from ezr.vectorize import filter_lines
+
+        return filter_lines(self, buffer, numbers)
+
+    def spans(self, string: str, groups: bool = False):
+        from ezr.vectorize import spans
+
+        return spans(self, string, groups)
+
+    def metrics(self, input_length: int = 1000):
+        from ezr.analysis import metrics
+
+        return metrics(self, input_length)
+
+    def profile(self, strings: Iterable[str] = (), flags: int = 0):
+        from ezr.profiling import profile
+
+        return profile(self, strings, flags)
+
+    def optimize(self, profile):
+        from ezr.profiling import optimize
+
+        return optimize(self, profile)
+
+    def group_index(self) -> dict[str, int]:
+        if self._groups is None:
+            from ezr.analysis import group_index
+
+            self._groups = group_index(self)
+        return dict(self._groups)
+
+    def generate(
+        self,
+        n: int,
+        seed: int | None = None,
+        max_repeat: int = 8,
+        matching: bool = True,
+    ) -> list[str]:
+        from ezr.generate import generate
+
+        return generate(self, n, seed, max_repeat, matching)
+
+    def fuzz(self, max_length: int = 1 << 12, timeout: float = 1.0):
+        from ezr.fuzz import fuzz
+
+        return fuzz(self, max_length, timeout)
 
     @property
     def explain(self) -> str:
@@ -155,12 +498,114 @@ class Pattern:
         return self._quantify(Quantifier(upper=n, lazy=lazy))
 
     def _quantify(self, quantifier: Quantifier):
-        self._quantifier = quantifier
+        self._set_quantifier(quantifier)
         return self
 
-    def __str__(self) -> str:
+    def _set_quantifier(self, quantifier: Quantifier | None):
+        old, self._quantifier = self._quantifier, quantifier
+        if old is not None:
+            old._remove_parent(self)
+        if quantifier is not None:
+            quantifier._add_parent(self)
+        self._invalidate()
+
+    def _children(self) -> list[Pattern]:
+        return [] if self._quantifier is None else [self._quantifier]
+
+    def _add_parent(self, parent: Pattern):
+        # Most nodes have a single parent, a weak reference is enough for it.
+        # A WeakValueDictionary per node would dominate the build time.
+        parents = self._parents
+        ref = weakref.ref(parent)
+        if parents is None:
+            self._parents = ref
+        elif isinstance(parents, dict):
+            n = len(parents)
+            if n >= PARENTS_PRUNE and not n & (n - 1):
+                # Shared nodes outlive many parents, drop the dead references
+                for key in [k for k, r in parents.items() if r() is None]:
+                    del parents[key]
+            parents[id(parent)] = ref
+        else:
+            first = parents()
+            if first is None:
+                self._parents = ref
+            elif first is not parent:
+                self._parents = {id(first): parents, id(parent): ref}
+
+    def _remove_parent(self, parent: Pattern):
+        parents = self._parents
+        if parents is None or any(c is self for c in parent._children()):
+            return
+        if isinstance(parents, dict):
+            parents.pop(id(parent), None)
+        elif parents() is parent:
+            self._parents = None
+
+    def _parent_nodes(self) -> list[Pattern]:
+        """Return the live parents of the node."""
+        parents = self._parents
+        if parents is None:
+            return []
+        if isinstance(parents, dict):
+            nodes = [r() for r in parents.values()]
+            return [n for n in nodes if n is not None]
+        parent = parents()
+        return [] if parent is None else [parent]
+
+    def _invalidate(self):
+        """Drop the cached rendering of this node and of all its ancestors.
+
+        Compiled patterns are kept, they are reused if the rendering of a node
+        turns out unchanged after an edit.
+        """
+        stack: list[Pattern] = [self]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            node._rendered = None
+            node._bounds = None
+            node._groups = None
+            if node._parents is not None:
+                stack.extend(node._parent_nodes())
+
+    def _render(self) -> str:
         return f"{self._pattern}{self.quantifier_as_str}"
 
+    def __str__(self) -> str:
+        if self._rendered is not None:
+            return self._rendered
+        # Render stale subtrees bottom-up, so _render never recurses
+        stale = postorder(
+            self,
+            lambda n: [c for c in children(n) if c._rendered is None],
+        )
+        for node in stale:
+            rendered = node._render()
+            node._rendered = rendered
+            # A chain of nodes each wrapping the next would keep
+            # O(depth ** 2) characters alive. Halving at every cached
+            # level keeps O(n log n) for a tree rendering to n characters
+            for child in children(node):
+                size = len(child._rendered or "")
+                if size > RENDER_CACHE_LIMIT and 2 * size > len(rendered):
+                    child._rendered = None
+        # The root is the last node of the post-order
+        return rendered
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_parents", None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        for child in self._children():
+            child._add_parent(self)
+
     def __repr__(self) -> str:
         quantifier = f", {self.quantifier!r}" if self.quantifier else ""
         return f"{self.__class__.__name__}({self._pattern!r}{quantifier})"
@@ -168,7 +613,11 @@ class Pattern:
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Pattern):
             return False
-        return self._pattern == other._pattern and self._quantifier == other._quantifier
+        return equal(self, other)
+
+    def _state(self) -> tuple:
+        """Attributes compared by ``__eq__``, besides the type and children."""
+        return self._pattern, self._quantifier
 
     def __add__(self, other: str | Pattern | EzRegex) -> EzRegex:
         self_patterns = self.__get_patterns(self)
@@ -256,10 +705,12 @@ class EzRegex(Pattern):
                 self._patterns += [Pattern(p) for p in list(str(pat))]
             else:
                 self._patterns += [pat]
+        for pat in self._patterns:
+            pat._add_parent(self)
         self._lower = lower
         self._upper = upper
         if lower is not None or upper is not None:
-            self._quantifier = Quantifier(lower=lower, upper=upper, lazy=lazy)
+            self._set_quantifier(Quantifier(lower=lower, upper=upper, lazy=lazy))
 
     @classmethod
     def from_quantifier(cls, *patterns, quantifier: Quantifier):
@@ -270,28 +721,83 @@ class EzRegex(Pattern):
             lazy=quantifier.is_lazy,
         )
 
+    @classmethod
+    def build_unchecked(cls, *patterns, quantifier: Quantifier | None = None):
+        """Build a node without validating its leaves, see ``Pattern``.
+
+        Strings are split into one leaf per character, as in the constructor.
+        """
+        node = cls.__new__(cls)
+        leaf = Pattern.build_unchecked
+        nodes: list[Pattern] = []
+        for pat in patterns:
+            if isinstance(pat, Pattern):
+                nodes.append(pat)
+            else:
+                nodes += [leaf(p) for p in str(pat)]
+        node._patterns = nodes
+        for child in nodes:
+            child._add_parent(node)
+        if quantifier is not None:
+            node._quantifier = quantifier
+            quantifier._add_parent(node)
+        return node
+
+    def _validate(self):
+        # Expressions have nothing to check, their leaves are walked
+        pass
+
     @property
-    def patterns_as_str(self) -> str:
-        return "".join(str(p) for p in self._patterns)
+    def patterns(self) -> tuple[Pattern, ...]:
+        return tuple(self._patterns)
 
     @property
-    def explain(self) -> str:
-        lines = []
-        for p in self._patterns:
-            indent = f"{TREE_INDENT} "
-            if not isinstance(p, EzRegex):
-                indent += "   "  # INDENT * 2
-            lines += [f"{indent}{s}" for s in p.explain.split("\n")]
-            if isinstance(p, EzRegex):
-                lines += [TREE_INDENT]
+    def patterns_as_str(self) -> str:
+        return "".join(str(p) for p in self._patterns)
 
-        patterns = "\n".join(lines)
+    def set_pattern(self, index: int, pattern: str | Pattern) -> EzRegex:
+        """Replace a child in place, re-rendering only the path to the root."""
+        if not isinstance(pattern, Pattern):
+            pattern = EzRegex(pattern) if len(pattern) > 1 else Pattern(pattern)
+        old = self._patterns[index]
+        self._patterns[index] = pattern
+        old._remove_parent(self)
+        pattern._add_parent(self)
+        self._invalidate()
+        return self
 
-        start = f"{TREE_START} {bold(self._enclosing[0])}"
-        end = f"{TREE_END} {bold(self._enclosing[1])}"
-        quant = "\n" + self.quantifier.explain if self.quantifier else ""
+    def _children(self) -> list[Pattern]:
+        return [*self._patterns, *super()._children()]
 
-        return f"{start} {self._annotation}\n{patterns}\n{end}{quant}"
+    @property
+    def explain(self) -> str:
+        lines: list[str] = []
+        prefixes: list[str] = []
+        for event, node, _ in iter_events(self):
+            is_regex = isinstance(node, EzRegex)
+            if event is ENTER:
+                prefix = ""
+                if prefixes:
+                    prefix = f"{prefixes[-1]}{TREE_INDENT} "
+                    if not is_regex:
+                        prefix += "   "  # INDENT * 2
+                if not is_regex:
+                    lines += [f"{prefix}{s}" for s in node.explain.split("\n")]
+                    continue
+                prefixes.append(prefix)
+                start = f"{TREE_START} {bold(node._enclosing[0])}"
+                lines += [f"{prefix}{start} {node._annotation}"]
+                if not node._patterns:
+                    lines += [prefix]
+            elif is_regex:
+                prefix = prefixes.pop()
+                lines += [f"{prefix}{TREE_END} {bold(node._enclosing[1])}"]
+                if node.quantifier:
+                    quant = node.quantifier.explain.split("\n")
+                    lines += [f"{prefix}{s}" for s in quant]
+                if prefixes:
+                    lines += [f"{prefixes[-1]}{TREE_INDENT}"]
+        return "\n".join(lines)
 
     def as_charset(self):
         return CharacterSet(*self._patterns)
@@ -300,20 +806,35 @@ class EzRegex(Pattern):
         return Group(*self._patterns)
 
     def _quantify(self, quantifier: Quantifier):
-        if not isinstance(self, CharacterSet) and len(self._patterns) > 1:
+        if type(self) is EzRegex and len(self._patterns) > 1:
             self = self.as_group()
         return super()._quantify(quantifier)
 
-    def __str__(self) -> str:
+    def _enclose(self, patterns: str) -> str:
+        """Render the node around its rendered children, without quantifier."""
         left, right = self._enclosing
-        pattern = f"{left}{self.patterns_as_str}{right}"
-        return f"{pattern}{self.quantifier_as_str}"
+        return f"{left}{patterns}{right}"
+
+    def _render(self) -> str:
+        return f"{self._enclose(self.patterns_as_str)}{self.quantifier_as_str}"
 
     def __repr__(self) -> str:
-        reprs = [repr(p) for p in self._patterns]
-        lines = [f"{INDENT}{s}" for r in reprs for s in r.split("\n")]
-        _str = "\n".join(lines)
-        return f"{self.__class__.__name__}(\n{_str}\n)"
+        lines = []
+        for event, node, depth in iter_events(self):
+            indent = INDENT * depth
+            if not isinstance(node, EzRegex):
+                if event is ENTER:
+                    lines += [f"{indent}{s}" for s in repr(node).split("\n")]
+            elif event is ENTER:
+                lines += [f"{indent}{node.__class__.__name__}("]
+                if not node._patterns:
+                    lines += [indent]
+            else:
+                lines += [f"{indent})"]
+        return "\n".join(lines)
+
+    def _state(self) -> tuple:
+        return (self._quantifier,)
 
     def __invert__(self):
         p = self._patterns
@@ -332,6 +853,7 @@ class Group(EzRegex):
     _enclosing: tuple[str, str] = ("(", ")")
     _capture: bool = True
     _name: str | None = None
+    _flags: re.RegexFlag = re.RegexFlag(0)
 
     def __init__(
         self,
@@ -340,12 +862,54 @@ class Group(EzRegex):
         capture: bool = True,
         lower: int | None = None,
         upper: int | None = None,
+        flags: int = 0,
     ):
         super().__init__(*patterns, lower=lower, upper=upper)
         if name and not capture:
             raise ValueError("Cannot name a non-capturing group")
         self.name = name
         self.capture = capture
+        self.flags = flags
+
+    @classmethod
+    def build_unchecked(
+        cls,
+        *patterns,
+        quantifier: Quantifier | None = None,
+        name: str | None = None,
+        capture: bool = True,
+        flags: int = 0,
+    ):
+        """Build a group without validating it, see ``Pattern``."""
+        node = super().build_unchecked(*patterns, quantifier=quantifier)
+        node._name = name
+        node._capture = capture
+        if flags:
+            node._flags = re.RegexFlag(flags)
+        return node
+
+    def _validate(self):
+        if self._name is not None:
+            self._check_name(self._name)
+            if not self._capture:
+                raise ValueError("Cannot name a non-capturing group")
+        self._check_flags(self._flags)
+
+    @staticmethod
+    def _check_name(name: str):
+        if not isinstance(name, str):
+            raise ValueError("Group name must be a string")
+        if not GROUP_NAME.match(name):
+            err = "Invalid group name. "
+            err += "Please use only alphanumeric characters"
+            err += "and underscores, starting with a letter."
+            raise ValueError(err)
+
+    @staticmethod
+    def _check_flags(flags: int):
+        unsupported = flags & ~sum(FLAG_LETTERS)
+        if unsupported:
+            raise ValueError(f"Unsupported inline flags: {re.RegexFlag(unsupported)!r}")
 
     @property
     def name(self) -> str | None:
@@ -355,15 +919,11 @@ class Group(EzRegex):
     def name(self, name: str | None):
         if name is None:
             self._name = None
+            self._invalidate()
             return
-        if not isinstance(name, str):
-            raise ValueError("Group name must be a string")
-        if not re.match(r"^(?=[a-zA-Z])\w+$", name):
-            err = "Invalid group name. "
-            err += "Please use only alphanumeric characters"
-            err += "and underscores, starting with a letter."
-            raise ValueError(err)
+        self._check_name(name)
         self._name = name
+        self._invalidate()
 
     @property
     def capture(self) -> bool:
@@ -374,17 +934,40 @@ class Group(EzRegex):
         if self.name and not capture:
             raise ValueError("Named group cannot be non-capturing")
         self._capture = capture
+        self._invalidate()
+
+    @property
+    def flags(self) -> re.RegexFlag:
+        return self._flags
+
+    @flags.setter
+    def flags(self, flags: int):
+        self._check_flags(flags)
+        self._flags = re.RegexFlag(flags)
+        self._invalidate()
+
+    @property
+    def flags_as_str(self) -> str:
+        return "".join(c for flag, c in FLAG_LETTERS.items() if self._flags & flag)
+
+    def _state(self) -> tuple:
+        return self._quantifier, self._name, self._capture, self._flags
 
     @property
     def annotation(self) -> str:
         prefix = "Capturing" if self.capture else "Non-capturing"
         return f"{prefix} {self._annotation}"
 
-    def __str__(self) -> str:
+    def _enclose(self, patterns: str) -> str:
         name = f"?P<{self.name}>" if self.name else ""
         capture = "" if self.capture else "?:"
         prefix = f"{name}{capture}"
-        return f"({prefix}{self.patterns_as_str}){self.quantifier_as_str}"
+        if self._flags:
+            # Scoped flags need a group of their own, (?i:...) does not capture
+            patterns = f"(?{self.flags_as_str}:{patterns})"
+            if not self.capture:
+                return patterns
+        return f"({prefix}{patterns})"
 
 
 class Quantifier(Pattern):
@@ -448,6 +1031,7 @@ class Quantifier(Pattern):
 
     def lazy(self):
         self._lazy = True
+        self._invalidate()
         return self
 
     def __str__(self) -> str:
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import re
+from types import ModuleType
+from typing import Any
+from typing import Mapping
+
+from ezr.ezregex import Pattern
+from ezr.rules import collect_patterns
+
+HEADER = """\
+# Generated by `python -m ezr freeze {source}`. Do not edit.
+from __future__ import annotations
+
+import re
+
+"""
+RESERVED = {"re", "annotations", "PATTERNS", "FLAGS", "GROUPS"}
+
+
+def _artifacts(patterns: Mapping[str, Pattern]) -> dict[str, dict[str, Any]]:
+    compiled = {name: p.compile() for name, p in patterns.items()}
+    return {
+        "PATTERNS": {name: c.pattern for name, c in compiled.items()},
+        "FLAGS": {name: c.flags for name, c in compiled.items()},
+        "GROUPS": {name: dict(c.groupindex) for name, c in compiled.items()},
+    }
+
+
+def _format_dict(name: str, values: dict[str, Any]) -> str:
+    items = "".join(f"    {k!r}: {v!r},\n" for k, v in values.items())
+    return f"{name} = {{\n{items}}}\n"
+
+
+def freeze_patterns(patterns: Mapping[str, Pattern], source: str = "") -> str:
+    """Render patterns into the source code of a plain Python module.
+
+    The generated module only depends on ``re``. It contains the dictionaries
+    ``PATTERNS``, ``FLAGS`` and ``GROUPS`` and one compiled pattern per name.
+
+    Args:
+        patterns (Mapping[str, Pattern]): Patterns by the name to export them.
+        source (str): Name of the module the patterns were taken from.
+
+    Returns:
+        str: Source code of the frozen module.
+    """
+    for name in patterns:
+        if not name.isidentifier() or name in RESERVED:
+            raise ValueError(f"Invalid pattern name {name!r}")
+    artifacts = _artifacts(patterns)
+    code = HEADER.format(source=source)
+    code += "\n".join(_format_dict(k, v) for k, v in artifacts.items())
+    code += "\n"
+    for name in patterns:
+        code += f"{name} = re.compile(PATTERNS[{name!r}], FLAGS[{name!r}])\n"
+
+    namespace: dict[str, Any] = {}
+    exec(compile(code, "<frozen ezr>", "exec"), namespace)
+    check_frozen(namespace, patterns)
+    return code
+
+
+def freeze(module: ModuleType) -> str:
+    """Freeze all public patterns defined in a module, see ``freeze_patterns``."""
+    return freeze_patterns(collect_patterns(module), module.__name__)
+
+
+def check_frozen(
+    frozen: ModuleType | Mapping[str, Any],
+    patterns: Mapping[str, Pattern],
+) -> None:
+    """Check that a frozen module matches the live pattern trees.
+
+    Raises:
+        ValueError: If a pattern is missing or differs from its frozen form.
+    """
+    namespace = vars(frozen) if isinstance(frozen, ModuleType) else frozen
+    live = _artifacts(patterns)
+    for name in patterns:
+        compiled = namespace.get(name)
+        if not isinstance(compiled, re.Pattern):
+            raise ValueError(f"Frozen pattern {name!r} is missing")
+        if (
+            compiled.pattern != live["PATTERNS"][name]
+            or compiled.flags != live["FLAGS"][name]
+            or dict(compiled.groupindex) != live["GROUPS"][name]
+        ):
+            raise ValueError(f"Frozen pattern {name!r} is out of date")
@@ -0,0 +1,326 @@
+"""Search for inputs that make a pattern slow to match.
+
+Inputs are built from the structure of the tree: the text leading up to a
+repetition, a string matched by the repeated part, pumped ``n`` times, and a
+character that nothing in the pattern matches, so the engine has to try every
+way of splitting the pumped part before the match fails. Every input is timed
+in a deadline worker, so catastrophic backtracking cannot hang the caller.
+"""
+from __future__ import annotations
+
+import math
+import re
+from typing import Iterator
+from typing import Sequence
+
+from ezr.analysis import _body
+from ezr.analysis import _tokens_or_units
+from ezr.analysis import _units
+from ezr.analysis import Bounds
+from ezr.analysis import CHARACTERS
+from ezr.analysis import Token
+from ezr.deadline import default_pool
+from ezr.deadline import DeadlinePool
+from ezr.deadline import MatchTimeout
+from ezr.ezregex import CharacterSet
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.walk import fold
+from ezr.walk import walk
+
+LINEAR = "linear"
+POLYNOMIAL = "polynomial"
+EXPONENTIAL = "exponential"
+
+# Times below this are dominated by the cost of calling into the engine
+NOISE_FLOOR = 2e-5
+# A local degree above this cannot be told apart from exponential growth
+EXPONENTIAL_DEGREE = 6.0
+
+
+class FuzzResult:
+    """Time taken to search a single input."""
+
+    def __init__(self, text: str, time: float, timed_out: bool = False):
+        self.text = text
+        self.time = time
+        self.timed_out = timed_out
+
+    def __repr__(self) -> str:
+        time = f">{self.time}s" if self.timed_out else f"{self.time:.6f}s"
+        return f"{self.__class__.__name__}(length={len(self.text)}, time={time})"
+
+
+class FuzzReport:
+    """Outcome of a fuzzing run.
+
+    Attributes:
+        pattern (str): The rendered pattern.
+        results (list[FuzzResult]): Every timed input.
+        curve (list[tuple[int, float]]): Input length against search time for
+            the family of inputs with the slowest search.
+        complexity (str): ``"linear"``, ``"polynomial"`` or ``"exponential"``.
+        degree (float): Estimated exponent of the time against the length.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        results: list[FuzzResult],
+        curve: list[tuple[int, float]],
+        complexity: str,
+        degree: float,
+    ):
+        self.pattern = pattern
+        self.results = results
+        self.curve = curve
+        self.complexity = complexity
+        self.degree = degree
+
+    def slowest(self, n: int = 5) -> list[FuzzResult]:
+        """Return the ``n`` inputs with the slowest search."""
+        return sorted(self.results, key=lambda r: r.time, reverse=True)[:n]
+
+    def __str__(self) -> str:
+        lines = [f"{self.pattern}: {self.complexity} (degree {self.degree:.1f})"]
+        lines += [f"  {length:>8} chars  {time:.6f}s" for length, time in self.curve]
+        return "\n".join(lines)
+
+
+def _char(body: str) -> str:
+    """Find a character matched by the rendered body of an atom, empty if none."""
+    try:
+        compiled = re.compile(body)
+    except re.error:
+        return ""
+    return next((c for c in CHARACTERS if compiled.fullmatch(c)), "")
+
+
+def _repetitions(repeat: Bounds | None) -> int:
+    """Number of repetitions in a typical match, at least one if possible."""
+    if repeat is None:
+        return 1
+    if repeat[1] == 0:
+        return 0
+    return max(repeat[0], 1)
+
+
+def _repeats(repeat: Bounds | None) -> bool:
+    return repeat is not None and (repeat[1] is None or repeat[1] > 1)
+
+
+def _nested(alternatives: list[list[Token]]) -> Iterator[Token]:
+    """Yield the tokens of a sequence and of the raw groups in it."""
+    stack = [t for tokens in reversed(alternatives) for t in reversed(tokens)]
+    while stack:
+        token = stack.pop()
+        yield token
+        kind, value, _ = token
+        if kind is not None and kind.startswith("("):
+            stack.extend(t for tokens in reversed(value) for t in reversed(tokens))
+
+
+class _Sampler:
+    """Build strings matched by the nodes of a tree, sharing work between them."""
+
+    def __init__(self):
+        self._tokens: dict[int, list[list[Token]]] = {}
+        self._memo: dict[int, str] = {}
+
+    def tokens(self, node: Pattern) -> list[list[Token]]:
+        """Tokens of the alternatives of a group, empty for the other nodes."""
+        if not isinstance(node, Group):
+            return []
+        if id(node) not in self._tokens:
+            units = _units(node._patterns)
+            self._tokens[id(node)] = _tokens_or_units([(u, q, u) for u, q in units])
+        return self._tokens[id(node)]
+
+    def _children(self, node: Pattern) -> list[Pattern]:
+        return [v for kind, v, _ in _nested(self.tokens(node)) if kind is None]
+
+    def _visit(self, node: Pattern, results: list[str]) -> str:
+        if not isinstance(node, Group):
+            return _char(_body(node))
+        # The samples of the children are already in the memo
+        return self.sequence(self.tokens(node)[0])
+
+    def body(self, node: Pattern) -> str:
+        """Sample matched by a node, ignoring its own quantifier."""
+        if id(node) in self._memo:
+            return self._memo[id(node)]
+        return fold(node, self._visit, self._children, self._memo)
+
+    def _token(self, token: Token) -> str:
+        kind, value, repeat = token
+        if kind is None:
+            text = self.body(value)
+        elif kind == "(":
+            text = self.sequence(value[0])
+        elif kind.startswith("("):
+            # Lookarounds match no text
+            text = ""
+        else:
+            text = _char(kind)
+        return text * _repetitions(repeat)
+
+    def sequence(self, tokens: Sequence[Token]) -> str:
+        return "".join(self._token(t) for t in tokens)
+
+    def pumps(self, token: Token) -> list[str]:
+        """Samples matched by one repetition of a token and its alternatives."""
+        kind, value, _ = token
+        alternatives = self.tokens(value) if kind is None else []
+        if kind == "(":
+            alternatives = value
+        body = self._token((kind, value, None))
+        return [body, *(self.sequence(a) for a in alternatives)]
+
+    def inside(self, token: Token) -> Iterator[Token]:
+        """Yield a token and the tokens nested in it."""
+        for t in _nested([[token]]):
+            yield t
+            if t[0] is None:
+                for g in walk(t[1]):
+                    yield from _nested(self.tokens(g))
+
+
+def inputs(node: Pattern) -> list[tuple[str, str, str]]:
+    """Build the families of adversarial inputs for a tree.
+
+    Raw escapes, repeats, classes and groups of string patterns are read the
+    way ``re`` reads them, so ``EzRegex("(a+)+b")`` is pumped like the tree
+    ``Group(Pattern("a").one_or_more()).one_or_more() + "b"``.
+
+    Returns:
+        list[tuple[str, str, str]]: ``(prefix, pump, suffix)`` triples, the
+            input of size ``n`` is ``prefix + pump * n + suffix``.
+    """
+    sampler = _Sampler()
+    alternatives = _tokens_or_units([(u, q, u) for u, q in _units([node])])
+    atoms = [n for n in walk(node) if not isinstance(n, (Group, EzRegex))]
+    atoms += [n for n in walk(node) if isinstance(n, CharacterSet)]
+    bodies = [_body(a) for a in atoms]
+    for sequence in [alternatives, *(sampler.tokens(g) for g in walk(node))]:
+        bodies += [k for k, _, _ in _nested(sequence) if k and not k.startswith("(")]
+    matched = [re.compile(b) for b in bodies if _char(b)]
+    suffix = next(
+        (c for c in CHARACTERS if not any(m.fullmatch(c) for m in matched)),
+        "",
+    )
+
+    families = {("", sampler.sequence(alternatives[0]) or CHARACTERS[0], suffix)}
+    for tokens in alternatives:
+        for i, token in enumerate(tokens):
+            prefix = sampler.sequence(tokens[:i])
+            for t in sampler.inside(token):
+                if _repeats(t[2]):
+                    pumps = sampler.pumps(t)
+                    families.update((prefix, p, suffix) for p in pumps if p)
+    return sorted(families)
+
+
+def classify(curve: Sequence[tuple[int, float]], timed_out: bool = False):
+    """Classify the growth of the search time against the input length.
+
+    The local degree between two points is the exponent ``k`` for which the
+    time grows like ``length ** k``. It is constant for polynomial growth and
+    keeps increasing for exponential growth.
+
+    Args:
+        curve (Sequence[tuple[int, float]]): Increasing lengths and times.
+        timed_out (bool): Whether the search for the last length timed out,
+            its time is then a lower bound.
+
+    Example:
+        >>> classify([(100, 0.001), (200, 0.002), (400, 0.004)])
+        ('linear', 1.0)
+        >>> classify([(100, 0.001), (200, 0.004), (400, 0.016)])
+        ('polynomial', 2.0)
+
+    Returns:
+        tuple[str, float]: Complexity class and estimated degree.
+    """
+    points = [(n, t) for n, t in curve if t >= NOISE_FLOOR and n > 0]
+    degrees = [
+        math.log(t2 / t1) / math.log(n2 / n1)
+        for (n1, t1), (n2, t2) in zip(points, points[1:])
+        if n2 > n1
+    ]
+    if not degrees:
+        return LINEAR, 1.0
+    # The time of a search that timed out is only a lower bound
+    degree = max(degrees[-2:]) if timed_out else degrees[-1]
+    accelerating = len(degrees) > 1 and degree > 2 * max(degrees[0], 1.0)
+    if degree > EXPONENTIAL_DEGREE or (timed_out and accelerating):
+        return EXPONENTIAL, degree
+    if degree >= 1.5:
+        return POLYNOMIAL, round(degree, 1)
+    return LINEAR, round(max(degree, 1.0), 1)
+
+
+def _time(
+    pool: DeadlinePool,
+    compiled: re.Pattern,
+    text: str,
+    timeout: float,
+    repeat: int,
+) -> FuzzResult:
+    best = math.inf
+    for _ in range(repeat):
+        try:
+            best = min(best, pool.time(compiled, "search", text, timeout))
+        except MatchTimeout:
+            return FuzzResult(text, timeout, timed_out=True)
+        if best > 100 * NOISE_FLOOR:
+            # Slow searches are not worth repeating to remove noise
+            break
+    return FuzzResult(text, best)
+
+
+def fuzz(
+    node: Pattern,
+    max_length: int = 1 << 12,
+    timeout: float = 1.0,
+    repeat: int = 3,
+    pool: DeadlinePool | None = None,
+) -> FuzzReport:
+    """Time the search of a pattern on adversarial inputs of growing length.
+
+    Args:
+        node (Pattern): Root of the tree to fuzz.
+        max_length (int): Longest input to try.
+        timeout (float): Time limit of a single search, in seconds. A family
+            of inputs is not grown further after a search times out.
+        repeat (int): Number of times fast searches are repeated, the best
+            time is kept.
+        pool (DeadlinePool | None): Worker pool timing the searches. Defaults
+            to the shared pool.
+
+    Returns:
+        FuzzReport: Timings and complexity of the slowest family of inputs.
+    """
+    pool = pool or default_pool()
+    compiled = node.compile()
+    results: list[FuzzResult] = []
+    worst: tuple[float, list[tuple[int, float]], bool] = (-1.0, [], False)
+    for prefix, pump, suffix in inputs(node):
+        curve: list[tuple[int, float]] = []
+        timed_out = False
+        n = 1
+        while len(prefix) + n * len(pump) + len(suffix) <= max_length:
+            result = _time(pool, compiled, prefix + pump * n + suffix, timeout, repeat)
+            results.append(result)
+            curve.append((len(result.text), result.time))
+            if result.timed_out:
+                timed_out = True
+                break
+            n *= 2
+        slowest = max((t for _, t in curve), default=0.0)
+        if slowest > worst[0]:
+            worst = (slowest, curve, timed_out)
+
+    _, curve, timed_out = worst
+    complexity, degree = classify(curve, timed_out)
+    return FuzzReport(str(node), results, curve, complexity, degree)
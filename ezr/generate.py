@@ -0,0 +1,187 @@
+"""Generate strings matched by a pattern, and near misses that are not.
+
+The tree is turned into a plan once: an atom becomes the string of the
+characters it matches, and a group becomes its alternatives, each a sequence
+of ``(plan, lower, upper)`` repetitions. Raw escapes, repeats, classes and
+groups of string patterns are planned the way ``re`` reads them. A sample is
+built by expanding the plan with an explicit stack, so deep trees do not
+recurse, and repeated atoms are drawn in a single call.
+"""
+from __future__ import annotations
+
+import random
+from itertools import islice
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from ezr.analysis import _chars
+from ezr.analysis import _matched
+from ezr.analysis import _tokens_or_units
+from ezr.analysis import _units
+from ezr.analysis import CHARACTERS
+from ezr.analysis import Token
+from ezr.analysis import Unit
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.walk import fold
+
+DEFAULT_MAX_REPEAT = 8
+# Consecutive rejected samples before giving up on a pattern
+MAX_ATTEMPTS = 1000
+
+Plan = Union[str, List[List[Tuple["Plan", int, int]]]]
+
+
+def _plan(node: Pattern, max_repeat: int) -> Plan:
+    units_of: dict[int, list[Unit]] = {}
+
+    def group_units(n: Pattern) -> list[Pattern]:
+        if not isinstance(n, Group):
+            return []
+        if id(n) not in units_of:
+            units_of[id(n)] = _units(n._patterns)
+        return [u for u, _ in units_of[id(n)]]
+
+    def sequences(alternatives: list[list[Token]]) -> Plan:
+        plans = []
+        for tokens in alternatives:
+            sequence = []
+            for kind, value, repeat in tokens:
+                if kind is None:
+                    plan = value
+                elif kind == "(":
+                    plan = sequences(value)
+                elif kind.startswith("("):
+                    # Lookarounds match no text, samples are checked instead
+                    plan = ""
+                else:
+                    plan = _matched(kind)
+                low, upp = (1, 1) if repeat is None else repeat
+                sequence.append((plan, low, low + max_repeat if upp is None else upp))
+            plans.append(sequence)
+        return plans
+
+    def read(units: list[Unit], results: list[Plan]) -> Plan:
+        items = [(u, q, p) for (u, q), p in zip(units, results)]
+        return sequences(_tokens_or_units(items))
+
+    def visit(n: Pattern, results: list[Plan]) -> Plan:
+        if not isinstance(n, Group):
+            return _chars(n)
+        return read(units_of[id(n)], results)
+
+    memo: dict[int, Plan] = {}
+    units = _units([node])
+    return read(units, [fold(u, visit, group_units, memo) for u, _ in units])
+
+
+def _mutate(text: str, rng: random.Random) -> str:
+    """Insert, delete, replace or swap a single character."""
+    c = rng.choice(CHARACTERS)
+    if not text:
+        return c
+    i = rng.randrange(len(text))
+    op = rng.randrange(4)
+    if op == 0:
+        return text[:i] + c + text[i:]
+    if op == 1:
+        return text[:i] + text[i + 1 :]
+    if op == 2:
+        return text[:i] + c + text[i + 1 :]
+    return text[:i] + text[i + 1 : i + 2] + text[i] + text[i + 2 :]
+
+
+class Generator:
+    """Generator of sample strings for a pattern.
+
+    Args:
+        node (Pattern): Root of the tree to generate strings for.
+        max_repeat (int): Maximum number of repetitions added to the lower
+            bound of unbounded quantifiers.
+    """
+
+    def __init__(self, node: Pattern, max_repeat: int = DEFAULT_MAX_REPEAT):
+        self.compiled = node.compile()
+        self._plan = _plan(node, max_repeat)
+
+    def _sample(self, rng: random.Random) -> str:
+        choice, choices, randint = rng.choice, rng.choices, rng.randint
+        out = []
+        stack: list[Plan] = [self._plan]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                out.append(item)
+                continue
+            for plan, low, upp in reversed(choice(item)):
+                k = low if low == upp else randint(low, upp)
+                if not isinstance(plan, str):
+                    stack.extend([plan] * k)
+                elif plan and k:
+                    stack.append("".join(choices(plan, k=k)))
+        return "".join(out)
+
+    def samples(self, rng: random.Random, matching: bool = True) -> Iterator[str]:
+        """Yield samples forever, checking each one against the pattern.
+
+        Raises:
+            ValueError: If no acceptable sample is found after many attempts.
+        """
+        fullmatch = self.compiled.fullmatch
+        sample = self._sample
+        failures = 0
+        while True:
+            text = sample(rng) if matching else _mutate(sample(rng), rng)
+            if (fullmatch(text) is not None) is matching:
+                failures = 0
+                yield text
+                continue
+            failures += 1
+            if failures >= MAX_ATTEMPTS:
+                kind = "matching" if matching else "non-matching"
+                pattern = self.compiled.pattern
+                raise ValueError(f"Could not generate {kind} strings for {pattern!r}")
+
+    def generate(
+        self,
+        n: int,
+        seed: int | None = None,
+        matching: bool = True,
+    ) -> list[str]:
+        """Generate ``n`` samples, the same ones for the same seed."""
+        return list(islice(self.samples(random.Random(seed), matching), n))
+
+
+def generate(
+    node: Pattern,
+    n: int,
+    seed: int | None = None,
+    max_repeat: int = DEFAULT_MAX_REPEAT,
+    matching: bool = True,
+) -> list[str]:
+    """Generate strings matched by a pattern, or near misses.
+
+    Args:
+        node (Pattern): Root of the tree.
+        n (int): Number of strings.
+        seed (int | None): Seed of the random generator, for reproducible
+            samples.
+        max_repeat (int): Maximum number of repetitions added to the lower
+            bound of unbounded quantifiers.
+        matching (bool): Generate strings the pattern fully matches. If
+            ``False``, generate strings one edit away from a sample that the
+            pattern does not fully match.
+
+    Example:
+        >>> generate(Pattern(r"\\d").exactly(3), 2, seed=0)
+        ['742', '473']
+
+    Raises:
+        ValueError: If the pattern rejects too many samples in a row.
+
+    Returns:
+        list[str]: The generated strings.
+    """
+    return Generator(node, max_repeat).generate(n, seed, matching)
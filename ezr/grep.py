@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import mmap
+import os
+import time
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+
+from ezr.ezregex import Pattern
+from ezr.vectorize import match_flags
+
+MMAP_THRESHOLD = 1 << 20
+BLOCK_SIZE = 1 << 22
+
+
+class FileResult:
+    """Matching lines of a single file."""
+
+    def __init__(
+        self,
+        path: str,
+        size: int = 0,
+        lines: list[tuple[int, str, str]] | None = None,
+        error: str | None = None,
+    ):
+        self.path = path
+        self.size = size
+        self.lines = lines or []
+        self.error = error
+
+
+class GrepStats:
+    """Throughput statistics of a grep run."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.lines = 0
+        self.errors = 0
+        self._start = time.perf_counter()
+        self._end: float | None = None
+
+    def add(self, result: FileResult):
+        self.files += 1
+        self.bytes += result.size
+        self.lines += len(result.lines)
+        self.errors += result.error is not None
+
+    def stop(self):
+        self._end = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        end = time.perf_counter() if self._end is None else self._end
+        return end - self._start
+
+    def __str__(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"{self.files} files, {self.bytes / 1e6:.1f} MB, "
+            f"{self.lines} matching lines, {self.errors} errors "
+            f"in {self.elapsed:.3f}s "
+            f"({self.bytes / 1e6 / elapsed:.1f} MB/s, "
+            f"{self.files / elapsed:.1f} files/s)"
+        )
+
+
+def iter_files(paths: Iterable[str]) -> Iterator[str]:
+    """Expand directories into the files they contain, in a stable order."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name)
+
+
+def _read_blocks(path: str, size: int) -> Iterator[bytes]:
+    """Read a file in blocks of whole lines, memory-mapping large files."""
+    with open(path, "rb") as f:
+        if size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = mm.find(b"\n", start + BLOCK_SIZE)
+                end = size if end == -1 else end + 1
+                yield mm[start:end]
+                start = end
+
+
+def grep_file(
+    path: str,
+    rules: Mapping[str, Pattern],
+    encoding: str = "utf-8",
+) -> FileResult:
+    """Find the lines of a file that match any of the rules.
+
+    Returns:
+        FileResult: Matching lines as ``(line number, rule name, line)``.
+    """
+    try:
+        size = os.path.getsize(path)
+        lines: list[tuple[int, str, str]] = []
+        offset = 1
+        for block in _read_blocks(path, size):
+            text = block.decode(encoding, errors="replace")
+            block_lines = text.split("\n")
+            if text.endswith("\n"):
+                block_lines.pop()
+            flags = {name: match_flags(r, block_lines) for name, r in rules.items()}
+            for i, line in enumerate(block_lines):
+                for name, rule_flags in flags.items():
+                    if rule_flags[i]:
+                        lines.append((offset + i, name, line))
+            offset += len(block_lines)
+    except OSError as e:
+        return FileResult(path, error=str(e))
+    return FileResult(path, size, lines)
+
+
+def grep(
+    paths: Iterable[str],
+    rules: Mapping[str, Pattern],
+    jobs: int | None = None,
+    ordered: bool = True,
+    encoding: str = "utf-8",
+) -> Iterator[FileResult]:
+    """Search files and directories with a process pool.
+
+    Args:
+        paths (Iterable[str]): Files and directories to search.
+        rules (Mapping[str, Pattern]): Patterns by name.
+        jobs (int | None): Number of worker processes. Defaults to the number
+            of CPUs, ``1`` searches in the current process.
+        ordered (bool): Yield results in the order of the files, instead of
+            as soon as they are available.
+        encoding (str): Encoding of the files.
+
+    Returns:
+        Iterator[FileResult]: One result per file.
+    """
+    files = iter_files(paths)
+    if jobs == 1:
+        for path in files:
+            yield grep_file(path, rules, encoding)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(grep_file, p, rules, encoding) for p in files]
+        if ordered:
+            for future in futures:
+                yield future.result()
+        else:
+            for future in as_completed(futures):
+                yield future.result()
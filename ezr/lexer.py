@@ -0,0 +1,149 @@
+"""Tokenizer built from named rules, scanning the input in a single pass.
+
+All rules are combined into one alternation with a named group per token
+type, followed by a catch-all group for unmatched characters. As the
+catch-all matches anywhere, ``finditer`` reports a match at every position
+and the token type is read from ``Match.lastindex``, the outermost group
+closing last.
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import NamedTuple
+from typing import Tuple
+
+from ezr.analysis import _known_bounds
+from ezr.ezregex import CharacterSet
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.stream import DEFAULT_CHUNK_SIZE
+from ezr.stream import DEFAULT_OVERLAP
+from ezr.stream import finditer_chunks
+from ezr.stream import iter_chunks
+from ezr.stream import Stream
+
+
+class Token(NamedTuple):
+    type: str
+    text: str
+    span: Tuple[int, int]
+
+
+class LexError(ValueError):
+    """Input that no rule matches."""
+
+    def __init__(self, text: str, position: int):
+        super().__init__(f"Unexpected {text!r} at position {position}")
+        self.text = text
+        self.position = position
+
+
+class Lexer:
+    """Tokenizer for the token types given by named patterns.
+
+    At every position the first rule that matches wins, so keywords go before
+    identifiers, and longer operators before their prefixes.
+
+    Args:
+        rules (Mapping[str, str | Pattern]): Pattern of every token type, in
+            priority order. Names follow the rules of group names.
+        skip (Iterable[str]): Token types that are matched but not yielded,
+            such as whitespace and comments.
+        error (str | None): Type of the tokens yielded for unmatched text. By
+            default unmatched text raises a ``LexError``.
+        flags (int): Flags the combined pattern is compiled with.
+
+    Example:
+        >>> number, name = Pattern(r"\\d") >= 1, Pattern(r"\\w") >= 1
+        >>> lexer = Lexer({"NUMBER": number, "NAME": name, "SPACE": " "}, ["SPACE"])
+        >>> [(t.type, t.text) for t in lexer.tokenize("x 42")]
+        [('NAME', 'x'), ('NUMBER', '42')]
+
+    Raises:
+        ValueError: If a rule can match the empty string. Verbose rules and
+            rules with raw parentheses, such as ``"(ab)+"``, are not checked.
+    """
+
+    def __init__(
+        self,
+        rules: Mapping[str, str | Pattern],
+        skip: Iterable[str] = (),
+        error: str | None = None,
+        flags: int = 0,
+    ):
+        alternatives: list[str | Pattern] = []
+        uppers: list[int | None] = []
+        for name, rule in rules.items():
+            if not isinstance(rule, Pattern):
+                rule = EzRegex(rule) if len(rule) != 1 else Pattern(rule)
+            # Verbose rules and rules with raw parentheses have unknown bounds
+            bounds = None if flags & re.VERBOSE else _known_bounds(rule)
+            if bounds is not None and bounds[0] == 0:
+                raise ValueError(f"Rule {name!r} can match the empty string")
+            alternatives += [Group(rule, name=name), "|"]
+            uppers.append(None if bounds is None else bounds[1])
+        unmatched = Group(CharacterSet(Pattern(r"\s"), Pattern(r"\S")))
+        self.pattern = EzRegex(*alternatives, unmatched)
+        self.compiled = self.pattern.compile(flags)
+        self.skip = frozenset(skip)
+        self.error = error
+        self._types = {self.compiled.groupindex[name]: name for name in rules}
+        finite = [upp for upp in uppers if upp is not None]
+        self._window = max(finite, default=1) if len(finite) == len(uppers) else None
+
+    def _tokens(self, matches: Iterable) -> Iterator[Token]:
+        types, skip, error = self._types, self.skip, self.error
+        # Skips the keyword handling of Token.__new__ in the hot loop
+        token = tuple.__new__
+        unmatched: list[str] = []
+        start = end = 0
+        for m in matches:
+            type = types.get(m.lastindex)
+            if type is None:
+                if error is None:
+                    raise LexError(m.group(), m.start())
+                if unmatched and m.start() != end:
+                    yield Token(error, "".join(unmatched), (start, end))
+                    unmatched = []
+                if not unmatched:
+                    start = m.start()
+                unmatched.append(m.group())
+                end = m.end()
+                continue
+            # Unmatched text is only kept when there is an error type
+            if unmatched and error is not None:
+                yield Token(error, "".join(unmatched), (start, end))
+                unmatched = []
+            if type not in skip:
+                yield token(Token, (type, m.group(), m.span()))
+        if unmatched and error is not None:
+            yield Token(error, "".join(unmatched), (start, end))
+
+    def tokenize(self, text: str) -> Iterator[Token]:
+        """Yield the ``(type, text, span)`` tokens of a string.
+
+        Raises:
+            LexError: If no rule matches at some position and ``error`` is not
+                set. The tokens before it have been yielded.
+        """
+        return self._tokens(self.compiled.finditer(text))
+
+    def tokenize_stream(
+        self,
+        stream: Stream,
+        overlap: int = DEFAULT_OVERLAP,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Token]:
+        """Yield the tokens of a file-like object or an iterable of strings.
+
+        Spans are relative to the start of the stream. If all rules have a
+        finite maximum length, the longest is used as the overlap between
+        chunks and ``overlap`` is ignored.
+        """
+        chunks = iter_chunks(stream, chunk_size)
+        window = overlap if self._window is None else self._window
+        return self._tokens(finditer_chunks(self.compiled, chunks, window))
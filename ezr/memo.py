@@ -0,0 +1,128 @@
+"""Cache of match results keyed by the input string.
+
+Traffic such as user agents or URL paths repeats the same strings many times.
+A ``CachedPattern`` keeps the results of the last distinct inputs, so a
+repeated string costs a dict lookup instead of a scan. ``re.Match`` objects
+are immutable and hold their groups, so they are cached as they are.
+
+Entries are evicted least recently used first. Inputs longer than
+``max_length`` are rarely repeated and would hold on to large strings, so
+they are matched without being cached.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Hashable
+
+from ezr.ezregex import Pattern
+
+DEFAULT_MAXSIZE = 1 << 12
+DEFAULT_MAX_LENGTH = 1 << 10
+
+_MISSING = object()
+
+
+class CachedPattern:
+    """Pattern whose match results are cached per input string.
+
+    The methods are safe to call from several threads. A miss is matched
+    outside of the lock, so two threads missing the same input at once both
+    match it.
+
+    Args:
+        node (Pattern): The pattern. If it is edited, the cache is cleared
+            on the next lookup.
+        maxsize (int | None): Number of cached results, unbounded if
+            ``None``.
+        max_length (int): Length of the longest input that is cached.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups of cacheable inputs that were matched.
+        skipped (int): Lookups of inputs too long to be cached.
+
+    Example:
+        >>> from ezr.helper import any_of
+        >>> browser = any_of("Firefox", "Chrome").cached()
+        >>> [browser.search(ua).group() for ua in ["Chrome/120", "Chrome/120"]]
+        ['Chrome', 'Chrome']
+        >>> browser.hits, browser.misses
+        (1, 1)
+    """
+
+    def __init__(
+        self,
+        node: Pattern,
+        maxsize: int | None = DEFAULT_MAXSIZE,
+        max_length: int = DEFAULT_MAX_LENGTH,
+    ):
+        self.node = node
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._pattern = str(node)
+        self._results: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, method: str, string: str, timeout: float | None) -> Any:
+        if len(string) > self.max_length or self.maxsize == 0:
+            with self._lock:
+                self.skipped += 1
+            return getattr(self.node, method)(string, timeout)
+        key = (method, string)
+        with self._lock:
+            pattern = str(self.node)
+            if pattern != self._pattern:
+                self._results.clear()
+                self._pattern = pattern
+            result = self._results.get(key, _MISSING)
+            if result is not _MISSING:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return result
+            self.misses += 1
+        result = getattr(self.node, method)(string, timeout)
+        with self._lock:
+            if self._pattern == pattern:
+                self._results[key] = result
+                if self.maxsize is not None and len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+        return result
+
+    def search(self, string: str, timeout: float | None = None):
+        return self._lookup("search", string, timeout)
+
+    def match(self, string: str, timeout: float | None = None):
+        return self._lookup("match", string, timeout)
+
+    def fullmatch(self, string: str, timeout: float | None = None):
+        return self._lookup("fullmatch", string, timeout)
+
+    def findall(self, string: str, timeout: float | None = None) -> list:
+        # Callers may modify the list, the cached one is never handed out
+        return list(self._lookup("findall", string, timeout))
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the lookups answered from the cache."""
+        total = self.hits + self.misses + self.skipped
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Drop the cached results and reset the statistics."""
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self._pattern!r}, size={len(self)}, "
+            f"hit_rate={self.hit_rate:.2f})"
+        )
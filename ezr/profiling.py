@@ -0,0 +1,247 @@
+"""Reorder alternatives by how often they match on sample traffic.
+
+The engine tries the alternatives of a group from left to right, so a branch
+that rarely matches costs time on every input when it is listed first. A
+profile compiles an instrumented copy of the pattern, with every alternative
+wrapped in a named group, and counts which alternative took part in each
+match. ``optimize`` then moves the most frequent alternatives to the front of
+the groups where the order cannot change what is matched.
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ezr.analysis import _units
+from ezr.analysis import literal_prefix
+from ezr.ezregex import CharacterSet
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.walk import children
+from ezr.walk import fold
+from ezr.walk import walk
+
+# Group names of the user start with a letter, so these cannot collide
+MARKER = "_ezr_alt"
+
+Branches = Tuple[EzRegex, List[List[Pattern]]]
+
+
+def _is_separator(node: Pattern) -> bool:
+    return not isinstance(node, EzRegex) and node.pattern == "|"
+
+
+def _branches(group: Group) -> Optional[Branches]:
+    """Split the children of an alternation group into its alternatives.
+
+    Returns:
+        tuple[EzRegex, list[list[Pattern]]] | None: The node holding the
+            separators and the children of every alternative, or ``None`` if
+            the group has no alternation, or separators nested in spliced
+            expressions that a reordering would have to restructure.
+    """
+    host: EzRegex = group
+    while (
+        len(host._patterns) == 1
+        and type(host._patterns[0]) is EzRegex
+        and host._patterns[0].quantifier is None
+    ):
+        host = host._patterns[0]
+    branches: list[list[Pattern]] = [[]]
+    for child in host._patterns:
+        if _is_separator(child):
+            branches.append([])
+        else:
+            branches[-1].append(child)
+    if len(branches) < 2:
+        return None
+    if any(_is_separator(u) for b in branches for u, _ in _units(b)):
+        return None
+    return host, branches
+
+
+def _prefix(branch: list[Pattern]) -> str:
+    """Literal text every match of an alternative starts with, case-folded."""
+    return literal_prefix(branch, verbose=True)[0].casefold()
+
+
+def _exclusive(branches: list[list[Pattern]]) -> bool:
+    """Whether at most one alternative can match at any position.
+
+    Two alternatives cannot both match at the same position if their literal
+    prefixes differ before one of them ends. Sorted, a prefix of another
+    string is immediately followed by a string it is a prefix of.
+    """
+    prefixes = sorted(_prefix(b) for b in branches)
+    return all(not b.startswith(a) for a, b in zip(prefixes, prefixes[1:]))
+
+
+class AlternationProfile:
+    """Match counts of the alternatives of every alternation group of a tree.
+
+    Args:
+        node (Pattern): Root of the tree to profile.
+        flags (int): Flags the pattern is compiled with.
+
+    Attributes:
+        samples (int): Number of strings recorded.
+        matches (int): Number of matches found in them.
+    """
+
+    def __init__(self, node: Pattern, flags: int = 0):
+        self.node = node
+        self.samples = 0
+        self.matches = 0
+        self._groups: list[Group] = []
+        self._counts: list[list[int]] = []
+        seen: dict[int, int] = {}
+        for n in walk(node):
+            seen[id(n)] = seen.get(id(n), 0) + 1
+        hosts: dict[int, int] = {}
+        for n in walk(node):
+            # A group rendered twice would define its marker names twice
+            branches = _branches(n) if isinstance(n, Group) else None
+            if branches is None or seen[id(n)] > 1 or id(branches[0]) in hosts:
+                continue
+            hosts[id(branches[0])] = len(self._groups)
+            self._groups.append(n)
+            self._counts.append([0] * len(branches[1]))
+
+        def visit(n: Pattern, results: list[str]) -> str:
+            if not isinstance(n, EzRegex) or isinstance(n, CharacterSet):
+                return str(n)
+            inner = "".join(results)
+            if id(n) in hosts:
+                alternatives: list[list[str]] = [[]]
+                for child, rendered in zip(n._patterns, results):
+                    if _is_separator(child):
+                        alternatives.append([])
+                    else:
+                        alternatives[-1].append(rendered)
+                g = hosts[id(n)]
+                inner = "|".join(
+                    f"(?P<{MARKER}{g}_{j}>{''.join(a)})"
+                    for j, a in enumerate(alternatives)
+                )
+            return f"{n._enclose(inner)}{n.quantifier_as_str}"
+
+        def fold_children(n: Pattern) -> list[Pattern]:
+            return [] if isinstance(n, CharacterSet) else list(children(n))
+
+        self.compiled = re.compile(fold(node, visit, fold_children), flags)
+        self._markers = [
+            (index, *map(int, name[len(MARKER) :].split("_")))
+            for name, index in self.compiled.groupindex.items()
+            if name.startswith(MARKER)
+        ]
+
+    def record(self, strings: Iterable[str]) -> AlternationProfile:
+        """Count the alternatives taking part in every match of the strings."""
+        finditer = self.compiled.finditer
+        markers, counts = self._markers, self._counts
+        for text in strings:
+            self.samples += 1
+            for m in finditer(text):
+                self.matches += 1
+                regs = m.regs
+                for index, g, j in markers:
+                    if regs[index][0] != -1:
+                        counts[g][j] += 1
+        return self
+
+    def counts(self, group: Group) -> list[int]:
+        """Match counts of the alternatives of a group, in their order.
+
+        Raises:
+            KeyError: If the group is not an alternation of the profiled tree.
+        """
+        for g, profiled in enumerate(self._groups):
+            if profiled is group:
+                return list(self._counts[g])
+        raise KeyError(group)
+
+    def groups(self) -> list[Group]:
+        """Alternation groups of the profiled tree, in pre-order."""
+        return list(self._groups)
+
+
+def profile(
+    node: Pattern,
+    strings: Iterable[str] = (),
+    flags: int = 0,
+) -> AlternationProfile:
+    """Profile the alternatives of a pattern on sample strings.
+
+    Args:
+        node (Pattern): Root of the tree to profile.
+        strings (Iterable[str]): Sample traffic, more can be added with
+            ``AlternationProfile.record``.
+        flags (int): Flags the pattern is compiled with.
+
+    Example:
+        >>> from ezr.helper import any_of
+        >>> regex = any_of("GET", "POST", "DELETE")
+        >>> p = profile(regex, ["DELETE /a", "DELETE /b", "POST /c"])
+        >>> p.counts(regex)
+        [0, 1, 2]
+
+    Returns:
+        AlternationProfile: The match counts.
+    """
+    return AlternationProfile(node, flags).record(strings)
+
+
+def _captures(branches: list[list[Pattern]]) -> bool:
+    """Whether an alternative holds a capturing group, or a raw parenthesis."""
+    for branch in branches:
+        for child in branch:
+            for n in walk(child):
+                if isinstance(n, Group) and n.capture:
+                    return True
+                if not isinstance(n, EzRegex) and n.pattern == "(":
+                    return True
+    return False
+
+
+def optimize(node: Pattern, profile: AlternationProfile) -> Pattern:
+    """Reorder the alternatives of the profiled groups, most frequent first.
+
+    Only groups whose alternatives all start with literal text that tells
+    them apart are reordered, as at most one alternative can then match at
+    any position. Groups are numbered in the order they are opened, so
+    alternatives holding capturing groups are kept in place. The tree is
+    edited in place.
+
+    Example:
+        >>> from ezr.helper import any_of
+        >>> regex = any_of("GET", "POST", "DELETE")
+        >>> traffic = ["DELETE /a", "DELETE /b", "POST /c"]
+        >>> str(optimize(regex, profile(regex, traffic)))
+        '(DELETE|POST|GET)'
+
+    Returns:
+        Pattern: The root of the tree.
+    """
+    for group, counts in zip(profile._groups, profile._counts):
+        branches = _branches(group)
+        if branches is None:
+            continue
+        host, alternatives = branches
+        if len(alternatives) != len(counts) or not _exclusive(alternatives):
+            continue
+        if _captures(alternatives):
+            continue
+        order = sorted(range(len(counts)), key=lambda j: -counts[j])
+        if order == sorted(order):
+            continue
+        separators = [c for c in host._patterns if _is_separator(c)]
+        patterns = list(alternatives[order[0]])
+        for separator, j in zip(separators, order[1:]):
+            patterns += [separator, *alternatives[j]]
+        host._patterns = patterns
+        host._invalidate()
+    return node
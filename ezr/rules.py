@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import os
+from types import ModuleType
+
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Pattern
+
+EXPRESSION_RULE = "expr"
+
+
+def load_module(source: str) -> ModuleType:
+    """Import a module of rules from a dotted name or a path to a Python file."""
+    if not source.endswith(".py"):
+        return importlib.import_module(source)
+    name = os.path.splitext(os.path.basename(source))[0]
+    spec = importlib.util.spec_from_file_location(name, source)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load rules from {source!r}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def collect_patterns(module: ModuleType) -> dict[str, Pattern]:
+    """Collect the public patterns defined at the top level of a module.
+
+    Patterns imported from ``ezr`` itself, such as ``ezr.digit``, are skipped.
+    """
+    import ezr
+
+    builtins = {id(v) for v in vars(ezr).values() if isinstance(v, Pattern)}
+    return {
+        name: value
+        for name, value in vars(module).items()
+        if not name.startswith("_")
+        and isinstance(value, Pattern)
+        and id(value) not in builtins
+    }
+
+
+def load_rules(source: str) -> dict[str, Pattern]:
+    """Load rules from a Python file or evaluate a single ezr expression.
+
+    Expressions are evaluated with everything exported by ``ezr`` in scope,
+    e.g. ``digit * 3 + "-" + digit * 4``.
+    """
+    if source.endswith(".py") and os.path.isfile(source):
+        rules = collect_patterns(load_module(source))
+        if not rules:
+            raise ValueError(f"No patterns defined in {source!r}")
+        return rules
+
+    import ezr
+
+    namespace = {k: v for k, v in vars(ezr).items() if not k.startswith("_")}
+    value = eval(source, namespace)
+    if isinstance(value, str):
+        value = EzRegex(value)
+    if not isinstance(value, Pattern):
+        raise ValueError(f"Expression must evaluate to a pattern, not {type(value)}")
+    return {EXPRESSION_RULE: value}
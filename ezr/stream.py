@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import re
+from itertools import chain
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import Union
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_OVERLAP = 1 << 12
+
+Stream = Union[Iterable[str], Any]
+
+
+class StreamMatch:
+    """A match found in a stream, with offsets relative to the stream start."""
+
+    def __init__(self, match: re.Match, offset: int):
+        self._match = match
+        self._offset = offset
+
+    @property
+    def re(self) -> re.Pattern:
+        return self._match.re
+
+    @property
+    def lastindex(self) -> int | None:
+        return self._match.lastindex
+
+    @property
+    def lastgroup(self) -> str | None:
+        return self._match.lastgroup
+
+    def start(self, group: int | str = 0) -> int:
+        start = self._match.start(group)
+        return start if start == -1 else start + self._offset
+
+    def end(self, group: int | str = 0) -> int:
+        end = self._match.end(group)
+        return end if end == -1 else end + self._offset
+
+    def span(self, group: int | str = 0) -> tuple[int, int]:
+        return self.start(group), self.end(group)
+
+    def group(self, *groups: int | str) -> Any:
+        return self._match.group(*groups)
+
+    def groups(self, default: Any = None) -> tuple[Any, ...]:
+        return self._match.groups(default)
+
+    def groupdict(self, default: Any = None) -> dict[str, Any]:
+        return self._match.groupdict(default)
+
+    def __getitem__(self, group: int | str) -> Any:
+        return self._match[group]
+
+    def expand(self, template: str) -> str:
+        return self._match.expand(template)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} object; "
+            f"span={self.span()}, match={self.group()!r}>"
+        )
+
+
+def iter_chunks(stream: Stream, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Iterate over a file-like object or an iterable of strings in chunks."""
+    if isinstance(stream, str):
+        yield stream
+    elif hasattr(stream, "read"):
+        yield from iter(lambda: stream.read(chunk_size), "")
+    else:
+        yield from stream
+
+
+class ChunkScanner:
+    """Incremental ``finditer`` over text arriving in chunks.
+
+    A match starting at ``p`` can only depend on the text up to
+    ``p + window``, plus one character of lookahead for ``$`` and ``\\b``.
+    Matches are therefore only reported once enough text has arrived behind
+    their start, which makes the result identical to scanning the whole text
+    at once whenever ``window`` is the maximum match length of the pattern.
+    """
+
+    def __init__(self, compiled: re.Pattern, window: int, keep_text: bool = False):
+        self._compiled = compiled
+        self._margin = window + 2
+        self._buffer = ""
+        self._offset = 0
+        self._pos = 0
+        # Stream offset of the last empty match, finditer may find it again
+        self._empty = -1
+        # Stream offset of the first character ``text`` can still return
+        self._kept: int | None = 0 if keep_text else None
+
+    @property
+    def position(self) -> int:
+        """Stream offset before which no further match can start."""
+        return self._offset + min(self._pos, len(self._buffer))
+
+    @property
+    def end(self) -> int:
+        """Stream offset of the end of the text received so far."""
+        return self._offset + len(self._buffer)
+
+    def text(self, start: int, end: int) -> str:
+        """Return the text between two stream offsets.
+
+        Only available with ``keep_text``, for offsets after the last call to
+        ``release``.
+        """
+        return self._buffer[start - self._offset : end - self._offset]
+
+    def release(self, offset: int):
+        """Allow the text before a stream offset to be dropped."""
+        self._kept = offset
+
+    def feed(self, chunk: str) -> Iterator[StreamMatch]:
+        """Add text to the buffer and yield the matches that are now final."""
+        matches, offset = self.matches(chunk)
+        for m in matches:
+            yield StreamMatch(m, offset)
+
+    def close(self) -> Iterator[StreamMatch]:
+        """Yield the matches remaining at the end of the stream."""
+        matches, offset = self.matches(None)
+        for m in matches:
+            yield StreamMatch(m, offset)
+
+    def matches(self, chunk: str | None) -> tuple[list[re.Match], int]:
+        """Add a chunk, or ``None`` at the end of the stream, and find matches.
+
+        Returns:
+            tuple[list[re.Match], int]: The matches that are now final, and
+                the stream offset of the string they were found in.
+        """
+        eof = chunk is None
+        if chunk:
+            self._buffer += chunk
+        buffer, pos, offset = self._buffer, self._pos, self._offset
+        margin, n = self._margin, len(buffer)
+        matches = []
+        for m in self._compiled.finditer(buffer, pos):
+            start, end = m.span()
+            if start == end and start + offset == self._empty:
+                # Found again after a restart at the position of the last match
+                continue
+            if not eof and start + margin > n:
+                pos = min(start, max(pos, n - margin + 1))
+                break
+            matches.append(m)
+            pos = end
+            if start == end:
+                self._empty = end + offset
+        else:
+            pos = max(pos, n - margin + 1)
+
+        # Keep one character before the search position for lookbehinds
+        cut = max(0, min(pos, len(buffer)) - 1)
+        if self._kept is not None:
+            cut = min(cut, self._kept - offset)
+        self._buffer = buffer[cut:]
+        self._offset = offset + cut
+        self._pos = pos - cut
+        return matches, offset
+
+
+def finditer_chunks(
+    compiled: re.Pattern,
+    chunks: Iterable[str],
+    window: int,
+) -> Iterator[StreamMatch]:
+    """Find all matches of ``compiled`` in a sequence of text chunks.
+
+    Args:
+        compiled (re.Pattern): Compiled pattern to search for.
+        chunks (Iterable[str]): Consecutive pieces of the text.
+        window (int): Maximum match length, used as the overlap between chunks.
+
+    Returns:
+        Iterator[StreamMatch]: Matches with offsets relative to the stream.
+    """
+    scanner = ChunkScanner(compiled, window)
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.close()
+
+
+Segments = Tuple[List[str], List[re.Match], int]
+
+
+def _segments(
+    compiled: re.Pattern,
+    chunks: Iterable[str],
+    window: int,
+) -> Iterator[Segments]:
+    """Cut a sequence of text chunks into matches and the text between them.
+
+    Yields ``(texts, matches, offset)`` for every chunk. ``texts[i]`` is the
+    text before ``matches[i]``, and ``texts[-1]`` the text after the last
+    match that no later match can include. Matches are relative to ``offset``
+    in the stream. Text is only kept in memory until it is yielded.
+    """
+    scanner = ChunkScanner(compiled, window, keep_text=True)
+    done = 0
+    for chunk in chain(chunks, [None]):
+        matches, offset = scanner.matches(chunk)
+        texts = []
+        for m in matches:
+            texts.append(m.string[done - offset : m.start()])
+            done = m.end() + offset
+        scanner.release(done)
+        end = scanner.end if chunk is None else scanner.position
+        texts.append(scanner.text(done, end))
+        done = max(done, end)
+        scanner.release(done)
+        yield texts, matches, offset
+
+
+def split_chunks(
+    compiled: re.Pattern,
+    chunks: Iterable[str],
+    window: int,
+    maxsplit: int = 0,
+) -> Iterator[str | None]:
+    """Split a sequence of text chunks lazily, like ``re.split``.
+
+    Pieces are yielded as soon as the match ending them is found, but every
+    piece is held in memory until then.
+    """
+    piece: list[str] = []
+    splits = 0
+    for texts, matches, _ in _segments(compiled, chunks, window):
+        for text, m in zip(texts, matches):
+            piece.append(text)
+            if maxsplit and splits >= maxsplit:
+                piece.append(m.group())
+                continue
+            yield "".join(piece)
+            yield from m.groups()
+            piece = []
+            splits += 1
+        piece.append(texts[-1])
+    yield "".join(piece)
+
+
+def sub_chunks(
+    compiled: re.Pattern,
+    chunks: Iterable[str],
+    window: int,
+    repl: str | Callable[[StreamMatch], str],
+    out: Any,
+    count: int = 0,
+) -> int:
+    """Replace the matches in a sequence of text chunks, like ``re.subn``.
+
+    The result of every chunk is written to ``out`` once it is final, so only
+    about a chunk of text is in memory.
+
+    Args:
+        compiled (re.Pattern): Compiled pattern to search for.
+        chunks (Iterable[str]): Consecutive pieces of the text.
+        window (int): Maximum match length, used as the overlap between chunks.
+        repl (str | Callable[[StreamMatch], str]): Replacement template, or
+            function called with every match.
+        out: File-like object the result is written to.
+        count (int): Maximum number of replacements, all if zero.
+
+    Returns:
+        int: Number of replacements.
+    """
+    literal = isinstance(repl, str) and "\\" not in repl
+    n = 0
+    for texts, matches, offset in _segments(compiled, chunks, window):
+        parts = []
+        for text, m in zip(texts, matches):
+            parts.append(text)
+            if count and n >= count:
+                parts.append(m.group())
+                continue
+            n += 1
+            if callable(repl):
+                parts.append(repl(StreamMatch(m, offset)))
+            else:
+                parts.append(repl if literal else m.expand(repl))
+        parts.append(texts[-1])
+        out.write("".join(parts))
+    return n
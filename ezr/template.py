@@ -0,0 +1,173 @@
+"""Pattern trees with named slots, bound to different values many times.
+
+Binding copies only the nodes on the paths from the root to the placeholders.
+Every other subtree is shared with the template tree and keeps its cached
+rendering, so rendering a binding only joins the rendered fragments along
+those paths. Bound trees are cached per binding, together with their compiled
+patterns.
+"""
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from typing import Hashable
+
+from ezr.analysis import _units
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.ezregex import Quantifier
+from ezr.walk import children
+from ezr.walk import postorder
+from ezr.walk import walk
+
+DEFAULT_MAXSIZE = 1 << 10
+
+
+class Placeholder(Pattern):
+    """Slot of a ``Template``, replaced by a pattern when it is bound."""
+
+    _annotation: str = "Placeholder"
+
+    def __init__(self, name: str):
+        self._name = name
+        self._validate()
+        self._pattern = f"{{{name}}}"
+
+    def _validate(self):
+        # Placeholders are named like the groups they often stand for
+        Group._check_name(self._name)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def explanation(self) -> str:
+        return f"{self._annotation}. Replaced by the pattern bound to '{self._name}'"
+
+    def _quantify(self, quantifier: Quantifier):
+        raise ValueError("Placeholders cannot be quantified, quantify a group instead")
+
+    def _render(self) -> str:
+        raise ValueError(f"Placeholder {self._name!r} is not bound")
+
+    def _state(self) -> tuple:
+        return (self._name,)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._name!r})"
+
+
+def _as_value(value: str | Pattern) -> Pattern:
+    """Turn a bound value into a node that can stand anywhere in a sequence."""
+    if not isinstance(value, Pattern):
+        value = EzRegex(value) if len(value) != 1 else Pattern(value)
+    if type(value) is EzRegex:
+        separators = (u for u, _ in _units([value]) if not isinstance(u, EzRegex))
+        if any(u.pattern == "|" for u in separators):
+            # A bare alternation would swallow the rest of the sequence
+            return Group(value, capture=False)
+    return value
+
+
+def _clone(node: EzRegex, patterns: list[Pattern]) -> EzRegex:
+    """Copy a node with new children, without its caches."""
+    clone = object.__new__(type(node))
+    clone.__dict__.update(node.__dict__)
+    for cache in ("_parents", "_rendered", "_compiled", "_bounds", "_groups"):
+        clone.__dict__.pop(cache, None)
+    clone._patterns = patterns
+    for child in clone._children():
+        child._add_parent(clone)
+    return clone
+
+
+class Template:
+    """Pattern tree with ``Placeholder`` nodes.
+
+    Args:
+        tree (Pattern): Root of the tree, containing at least one placeholder.
+        maxsize (int): Number of bindings whose trees are cached.
+
+    Example:
+        >>> template = Template(EzRegex("id-") + Placeholder("tenant"))
+        >>> str(template.bind(tenant="acme"))
+        'id-acme'
+    """
+
+    def __init__(self, tree: Pattern, maxsize: int = DEFAULT_MAXSIZE):
+        placeholders = [n for n in walk(tree) if isinstance(n, Placeholder)]
+        if not placeholders:
+            raise ValueError("Template does not contain a placeholder")
+        self.tree = tree
+        self.names = frozenset(p.name for p in placeholders)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._bound: OrderedDict[Hashable, Pattern] = OrderedDict()
+
+        # Nodes with a placeholder below them, in post-order
+        marked = {id(p) for p in placeholders}
+        self._path: list[EzRegex] = []
+        for node in postorder(tree):
+            if any(id(c) in marked for c in children(node)):
+                marked.add(id(node))
+                self._path.append(node)
+        # Render the shared subtrees once, bindings reuse their fragments
+        for node in self._path:
+            for child in node._patterns:
+                if id(child) not in marked:
+                    str(child)
+
+    def bind(self, **values: str | Pattern) -> Pattern:
+        """Return the tree with every placeholder replaced by its value.
+
+        Raises:
+            ValueError: If a placeholder has no value or a value does not
+                belong to a placeholder.
+        """
+        if set(values) != self.names:
+            missing = ", ".join(sorted(self.names - set(values)))
+            unknown = ", ".join(sorted(set(values) - self.names))
+            raise ValueError(f"Missing values: {missing!r}, unknown: {unknown!r}")
+        # Strings are keyed as is, to skip building their nodes on a hit
+        key = tuple(
+            sorted(
+                (name, isinstance(value, Pattern), str(value))
+                for name, value in values.items()
+            ),
+        )
+        bound = self._bound.get(key)
+        if bound is not None:
+            self.hits += 1
+            self._bound.move_to_end(key)
+            return bound
+
+        self.misses += 1
+        nodes = {name: _as_value(value) for name, value in values.items()}
+        copies: dict[int, Pattern] = {}
+        for node in self._path:
+            patterns = []
+            for child in node._patterns:
+                if isinstance(child, Placeholder):
+                    child = nodes[child.name]
+                patterns.append(copies.get(id(child), child))
+            copies[id(node)] = _clone(node, patterns)
+        if isinstance(self.tree, Placeholder):
+            bound = nodes[self.tree.name]
+        else:
+            bound = copies[id(self.tree)]
+
+        self._bound[key] = bound
+        if len(self._bound) > self.maxsize:
+            self._bound.popitem(last=False)
+        return bound
+
+    def render(self, **values: str | Pattern) -> str:
+        """Render a binding, see ``bind``."""
+        return str(self.bind(**values))
+
+    def compile(self, flags: int = 0, **values: str | Pattern) -> re.Pattern:
+        """Compile a binding, reusing the compiled pattern of earlier calls."""
+        return self.bind(**values).compile(flags)
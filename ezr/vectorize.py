@@ -0,0 +1,465 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import re
+from array import array
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Sequence
+
+from ezr.analysis import _tokens
+from ezr.analysis import _units
+from ezr.analysis import length_bounds
+from ezr.analysis import ZERO_WIDTH
+from ezr.ezregex import CharacterSet
+from ezr.ezregex import EzRegex
+from ezr.ezregex import Group
+from ezr.ezregex import Pattern
+from ezr.walk import walk
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+else:
+    HAS_NUMPY = True
+
+SENTINELS = ("\x00", "\x1e", "\x1f", "\n", "\uffff")
+# Inputs of an iterable joined at once by the early-exit helpers
+BATCH_SIZE = 1 << 10
+# filter_lines searches line by line once this many matches cover more than
+# one line in DENSE_RATIO
+DENSE_MATCHES = 1 << 8
+DENSE_RATIO = 4
+BOUNDARY_ASSERTIONS = {r"\b", r"\B"}
+# Assertions that hold at the same positions of a line alone and of a buffer
+# scanned with re.MULTILINE
+LINE_ASSERTIONS = {"^", "$", *BOUNDARY_ASSERTIONS}
+
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        err = "Array matching requires numpy. Install it with `pip install ezr[numpy]`"
+        raise ImportError(err)
+
+
+def _atoms(node: Pattern) -> Iterator[Pattern | str | None]:
+    """Iterate over the atoms of a tree, treating character sets as atoms.
+
+    The raw escapes and character classes of split strings are yielded as
+    their text. ``None`` stands for a sequence that cannot be read: one with
+    a raw parenthesis, which can hold inline flags or a group around anything
+    after it, or with a numeric escape such as a back reference.
+    """
+    stack = [_units([node])]
+    seen = set()
+    while stack:
+        tokens = _tokens([(u, q, u) for u, q in stack.pop()])
+        if tokens is None:
+            yield None
+            continue
+        for text, unit, _ in itertools.chain.from_iterable(tokens):
+            if text is not None:
+                yield text
+            elif not isinstance(unit, Group):
+                yield unit
+            elif id(unit) not in seen:
+                seen.add(id(unit))
+                stack.append(_units(unit._patterns))
+
+
+def _can_match_sentinel(
+    node: Pattern,
+    sentinel: str,
+    assertions: set[str] = BOUNDARY_ASSERTIONS,
+) -> bool:
+    """Check whether a match could touch the separator between joined inputs.
+
+    Zero-width atoms other than ``assertions`` count as touching it, and so
+    do the atoms that cannot be told apart from it.
+    """
+    flags = 0
+    for n in walk(node):
+        if isinstance(n, Group):
+            flags |= n.flags & (re.DOTALL | re.IGNORECASE)
+    for atom in _atoms(node):
+        if atom is None:
+            return True
+        if isinstance(atom, CharacterSet):
+            rendered = f"[{atom.patterns_as_str}]"
+        else:
+            rendered = atom if isinstance(atom, str) else atom.pattern
+            if rendered == "|" or rendered in assertions:
+                continue
+            if rendered in ZERO_WIDTH:
+                return True
+        try:
+            if re.fullmatch(rendered, sentinel, flags):
+                return True
+        except re.error:
+            return True
+    return False
+
+
+def _sentinels(node: Pattern) -> list[str]:
+    """List the sentinels that no match of a pattern can touch."""
+    if length_bounds(node)[0] == 0:
+        return []
+    return [s for s in SENTINELS if not _can_match_sentinel(node, s)]
+
+
+class Batch:
+    """Inputs joined by a sentinel, so they can be scanned in one call.
+
+    A batch is only built if no match can contain or border on the sentinel.
+    Every match then lies within a single input and is the same match a
+    separate scan of that input would find.
+    """
+
+    _starts: list[int] | None = None
+
+    def __init__(self, joined: str, sentinel: str, texts: Sequence[str]):
+        self.joined = joined
+        self.sentinel = sentinel
+        self.texts = texts
+
+    @classmethod
+    def build(
+        cls,
+        node: Pattern,
+        texts: Sequence[str],
+        sentinels: Sequence[str] | None = None,
+    ) -> Batch | None:
+        """Join the inputs with the first sentinel none of them contains.
+
+        Args:
+            node (Pattern): Pattern the batch is scanned with.
+            texts (Sequence[str]): Inputs to join.
+            sentinels (Sequence[str] | None): Result of ``_sentinels(node)``,
+                to skip the analysis when building many batches.
+        """
+        if not texts:
+            return None
+        for sentinel in _sentinels(node) if sentinels is None else sentinels:
+            joined = sentinel.join(texts)
+            if joined.count(sentinel) == len(texts) - 1:
+                return cls(joined, sentinel, texts)
+        return None
+
+    @property
+    def starts(self) -> list[int]:
+        """Offsets of the inputs in the joined string, and of its end + 1."""
+        if self._starts is None:
+            lengths = itertools.accumulate(len(t) + 1 for t in self.texts)
+            self._starts = [0, *lengths]
+        return self._starts
+
+    def index(self, offset: int) -> int:
+        return bisect.bisect_right(self.starts, offset) - 1
+
+    def first_matches(self, compiled: re.Pattern) -> Iterator[tuple[int, re.Match]]:
+        """Yield the index and the first match of every input that has one."""
+        # The start after the last input is past the end, where re would clamp
+        # it and find an empty match at the end again and again
+        end = len(self.joined)
+        pos = 0
+        while pos <= end and (m := compiled.search(self.joined, pos)) is not None:
+            i = self.index(m.start())
+            yield i, m
+            pos = self.starts[i + 1]
+
+
+def match_flags(node: Pattern, texts: Sequence[str]) -> list[bool]:
+    compiled = node.compile()
+    batch = Batch.build(node, texts)
+    if batch is None:
+        return [compiled.search(t) is not None for t in texts]
+
+    flags = [False] * len(texts)
+    for i, _ in batch.first_matches(compiled):
+        flags[i] = True
+    return flags
+
+
+def match_counts(node: Pattern, texts: Sequence[str]) -> list[int]:
+    compiled = node.compile()
+    batch = Batch.build(node, texts)
+    if batch is None:
+        return [sum(1 for _ in compiled.finditer(t)) for t in texts]
+
+    counts = [0] * len(texts)
+    for m in compiled.finditer(batch.joined):
+        counts[batch.index(m.start())] += 1
+    return counts
+
+
+def first_match(node: Pattern, texts: Iterable[str]) -> re.Match | None:
+    """Find the first input of an iterable that contains a match.
+
+    Inputs are consumed ``BATCH_SIZE`` at a time and each batch is scanned in
+    a single call, so the iterable is read at most one batch past the match.
+
+    Returns:
+        re.Match | None: Match of the first matching input, its ``string`` is
+            that input.
+    """
+    compiled = node.compile()
+    low = node.length_bounds()[0]
+    sentinels = _sentinels(node)
+    texts = iter(texts)
+    while chunk := list(itertools.islice(texts, BATCH_SIZE)):
+        batch = Batch.build(node, chunk, sentinels)
+        if batch is None:
+            for t in chunk:
+                if len(t) >= low and (m := compiled.search(t)) is not None:
+                    return m
+            continue
+        m = compiled.search(batch.joined)
+        if m is not None:
+            # Counting sentinels is cheaper than the offsets of the whole batch
+            i = batch.joined.count(batch.sentinel, 0, m.start())
+            return compiled.search(chunk[i])
+    return None
+
+
+def any_match(node: Pattern, texts: Iterable[str]) -> bool:
+    return first_match(node, texts) is not None
+
+
+def all_match(node: Pattern, texts: Iterable[str]) -> bool:
+    """Check that every input contains a match, stopping at the first miss."""
+    search = node.compile().search
+    low = node.length_bounds()[0]
+    return all(len(t) >= low and search(t) is not None for t in texts)
+
+
+def _filter_split(
+    compiled: re.Pattern,
+    buffer: str,
+    numbers: bool,
+    first: int = 1,
+) -> list:
+    lines = buffer.split("\n")
+    if buffer.endswith("\n"):
+        lines.pop()
+    search = compiled.search
+    if numbers:
+        return [i for i, line in enumerate(lines, first) if search(line)]
+    return [line for line in lines if search(line)]
+
+
+def filter_lines(
+    node: Pattern,
+    buffer: str,
+    numbers: bool = False,
+) -> list[str] | list[int]:
+    """Find the lines of a buffer that contain a match, scanning it as a whole.
+
+    If no match can span a newline, the pattern is compiled with
+    ``re.MULTILINE``, so that ``^`` and ``$`` hold at line boundaries, and the
+    buffer is searched directly. Each match is mapped to its line and the
+    search resumes at the next line, so lines without a match cost no Python
+    call at all. Otherwise, and once most lines turn out to match, the lines
+    are searched one by one.
+
+    Args:
+        node (Pattern): Pattern to search for.
+        buffer (str): Lines separated by ``"\\n"``, a final newline does not
+            start another line.
+        numbers (bool): Return line numbers, starting at 1, instead of lines.
+
+    Returns:
+        list[str] | list[int]: Matching lines or their numbers.
+    """
+    compiled = node.compile()
+    units = _units([node])
+    first = units[0][0] if units else None
+    anchored = not isinstance(first, EzRegex) and str(first) == "^"
+    if anchored or _can_match_sentinel(node, "\n", LINE_ASSERTIONS):
+        # A search anchored at the start of each line is cheapest per line
+        return _filter_split(compiled, buffer, numbers)
+
+    search = re.compile(compiled.pattern, compiled.flags | re.MULTILINE).search
+    end = len(buffer) - 1 if buffer.endswith("\n") else len(buffer)
+    result: list = []
+    line, pos = 1, 0
+    while pos <= end and (m := search(buffer, pos, end)) is not None:
+        start = buffer.rfind("\n", pos, m.start()) + 1 or pos
+        stop = buffer.find("\n", m.end(), end)
+        stop = end if stop == -1 else stop
+        line += buffer.count("\n", pos, start)
+        result.append(line if numbers else buffer[start:stop])
+        line += 1
+        pos = stop + 1
+        if len(result) >= DENSE_MATCHES and len(result) * DENSE_RATIO > line:
+            rest = _filter_split(compiled, buffer[pos:], numbers, line)
+            return result + rest
+    return result
+
+
+def extract(node: Pattern, texts: Sequence[str], group: int | str = 0) -> list[Any]:
+    compiled = node.compile()
+    batch = Batch.build(node, texts)
+    if batch is None:
+        return [
+            None if (m := compiled.search(t)) is None else m.group(group)
+            for t in texts
+        ]
+
+    values: list[Any] = [None] * len(texts)
+    for i, m in batch.first_matches(compiled):
+        values[i] = m.group(group)
+    return values
+
+
+def extract_columns(
+    node: Pattern,
+    lines: Iterable[str],
+    as_arrays: bool = False,
+) -> dict[str, Any]:
+    """Extract all named groups of the first match in each line, by column.
+
+    Args:
+        node (Pattern): Pattern with named groups.
+        lines (Iterable[str]): Lines to search.
+        as_arrays (bool): Return NumPy object arrays instead of lists.
+
+    Returns:
+        dict[str, list | numpy.ndarray]: One column per named group, holding
+            ``None`` for lines without a match or where the group did not
+            participate in the match.
+    """
+    texts = list(lines)
+    index = node.group_index()
+    names, numbers = list(index), list(index.values())
+    columns: dict[str, list[Any]] = {name: [None] * len(texts) for name in names}
+    if not names:
+        return _columns_as_arrays(columns) if as_arrays else columns
+
+    compiled = node.compile()
+    column_list = [columns[name] for name in names]
+
+    def store(i: int, m: re.Match):
+        values = m.group(*numbers)
+        if len(numbers) == 1:
+            values = (values,)
+        for column, value in zip(column_list, values):
+            column[i] = value
+
+    batch = Batch.build(node, texts)
+    if batch is None:
+        for i, text in enumerate(texts):
+            if (m := compiled.search(text)) is not None:
+                store(i, m)
+    else:
+        for i, m in batch.first_matches(compiled):
+            store(i, m)
+    return _columns_as_arrays(columns) if as_arrays else columns
+
+
+def _columns_as_arrays(columns: dict[str, list[Any]]) -> dict[str, Any]:
+    _require_numpy()
+    arrays = {}
+    for name, values in columns.items():
+        arrays[name] = np.empty(len(values), dtype=object)
+        arrays[name][:] = values
+    return arrays
+
+
+def spans(node: Pattern, text: str, groups: bool = False) -> array:
+    """Find the offsets of all non-overlapping matches in a text.
+
+    Without ``groups``, the pattern is wrapped in a capturing group and the
+    text is split on it. The offsets then follow from the lengths of the
+    pieces, so no ``Match`` object is created. The raw syntax of string
+    patterns can hold back references or global inline flags, which the
+    wrapper would break, so such patterns are matched with ``finditer``.
+
+    Args:
+        node (Pattern): Pattern to search for.
+        text (str): Text to search.
+        groups (bool): Also return the spans of all capture groups.
+
+    Returns:
+        array: Flat ``array("q")`` of ``start, end`` pairs. With ``groups``,
+            every match contributes one pair for the whole match followed by
+            one pair per group, ``-1, -1`` for groups that did not participate.
+    """
+    compiled = node.compile()
+    if groups:
+        regs = (m.regs for m in compiled.finditer(text))
+        return array("q", itertools.chain.from_iterable(itertools.chain(*regs)))
+    if None in _atoms(node):
+        spans = (m.span() for m in compiled.finditer(text))
+        return array("q", itertools.chain.from_iterable(spans))
+
+    wrapped = re.compile(f"({compiled.pattern})", compiled.flags)
+    pieces = wrapped.split(text)
+    if wrapped.groups > 1:
+        # Drop the pieces captured by the groups of the pattern itself
+        stride = wrapped.groups + 1
+        kept: list[str] = [""] * (2 * (len(pieces) // stride) + 1)
+        kept[0::2] = pieces[0::stride]
+        kept[1::2] = pieces[1::stride]
+        pieces = kept
+    offsets = array("q", itertools.accumulate(map(len, pieces)))
+    offsets.pop()
+    return offsets
+
+
+def _as_texts(array: Iterable[str]) -> tuple[list[str], tuple[int, ...]]:
+    if isinstance(array, np.ndarray):
+        return array.ravel().tolist(), array.shape
+    texts = list(array)
+    return texts, (len(texts),)
+
+
+def match_mask(node: Pattern, array: Iterable[str]):
+    """Check which strings of an array contain a match.
+
+    Args:
+        node (Pattern): Pattern to search for.
+        array (Iterable[str]): NumPy array or iterable of strings.
+
+    Returns:
+        numpy.ndarray: Boolean array with the shape of the input.
+    """
+    _require_numpy()
+    texts, shape = _as_texts(array)
+    return np.array(match_flags(node, texts), dtype=bool).reshape(shape)
+
+
+def count_array(node: Pattern, array: Iterable[str]):
+    """Count the non-overlapping matches in each string of an array.
+
+    Args:
+        node (Pattern): Pattern to search for.
+        array (Iterable[str]): NumPy array or iterable of strings.
+
+    Returns:
+        numpy.ndarray: Integer array with the shape of the input.
+    """
+    _require_numpy()
+    texts, shape = _as_texts(array)
+    return np.array(match_counts(node, texts), dtype=np.int64).reshape(shape)
+
+
+def extract_array(node: Pattern, array: Iterable[str], group: int | str = 0):
+    """Extract a group of the first match in each string of an array.
+
+    Args:
+        node (Pattern): Pattern to search for.
+        array (Iterable[str]): NumPy array or iterable of strings.
+        group (int | str): Index or name of the group to extract.
+
+    Returns:
+        numpy.ndarray: Object array with the shape of the input, containing
+            ``None`` where there is no match.
+    """
+    _require_numpy()
+    texts, shape = _as_texts(array)
+    values = np.empty(len(texts), dtype=object)
+    values[:] = extract(node, texts, group)
+    return values.reshape(shape)
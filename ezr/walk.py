@@ -0,0 +1,107 @@
+"""Traversal of pattern trees with an explicit stack.
+
+Trees built from generated rules can be nested far deeper than the Python
+recursion limit, so none of the functions here recurse.
+"""
+from __future__ import annotations
+
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import Sequence
+from typing import Tuple
+from typing import TypeVar
+
+T = TypeVar("T")
+
+ENTER = "enter"
+EXIT = "exit"
+
+Children = Callable[[Any], Sequence[Any]]
+Event = Tuple[str, Any, int]
+
+
+def children(node: Any) -> Sequence[Any]:
+    """Return the child patterns of a node, the quantifier is not a child."""
+    return getattr(node, "_patterns", ())
+
+
+def walk(node: Any, children: Children = children) -> Iterator[Any]:
+    """Iterate over all nodes of a tree in depth-first pre-order."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(children(node)))
+
+
+def iter_events(node: Any, children: Children = children) -> Iterator[Event]:
+    """Iterate over a tree, yielding ``(ENTER | EXIT, node, depth)`` events.
+
+    Every node is entered before and exited after all of its children.
+    """
+    stack: list[Event] = [(ENTER, node, 0)]
+    while stack:
+        event, node, depth = stack.pop()
+        yield event, node, depth
+        if event is ENTER:
+            stack.append((EXIT, node, depth))
+            stack.extend((ENTER, c, depth + 1) for c in reversed(children(node)))
+
+
+def postorder(node: Any, children: Children = children) -> Iterator[Any]:
+    """Iterate over a tree, yielding every node after all of its children.
+
+    Nodes shared between several parents are only yielded once.
+    """
+    seen = set()
+    stack = [(node, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.append((node, True))
+        stack.extend((c, False) for c in reversed(children(node)))
+
+
+def fold(
+    node: Any,
+    visit: Callable[[Any, list[T]], T],
+    children: Children = children,
+    memo: dict[int, T] | None = None,
+) -> T:
+    """Combine the results of the children of every node, bottom-up.
+
+    Args:
+        node (Any): Root of the tree.
+        visit (Callable): Called with a node and the results of its children.
+        children (Children): Function returning the children of a node.
+        memo (dict[int, T] | None): Results by node id, shared between calls.
+
+    Returns:
+        T: The result for the root.
+    """
+    memo = {} if memo is None else memo
+    for n in postorder(node, lambda n: [c for c in children(n) if id(c) not in memo]):
+        memo[id(n)] = visit(n, [memo[id(c)] for c in children(n)])
+    return memo[id(node)]
+
+
+def equal(a: Any, b: Any, children: Children = children) -> bool:
+    """Compare two trees node by node."""
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        if x is y:
+            continue
+        if type(x) is not type(y) or x._state() != y._state():
+            return False
+        xs, ys = children(x), children(y)
+        if len(xs) != len(ys):
+            return False
+        stack.extend(zip(xs, ys))
+    return True
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr import ahocorasick
+from ezr.ahocorasick import Automaton
+from ezr.ahocorasick import literal_words
+from ezr.ahocorasick import LiteralPattern
+
+
+def regex_for(words):
+    return re.compile("|".join(map(re.escape, words)))
+
+
+def random_words(rng, n, alphabet="abc", max_length=4):
+    return [
+        "".join(rng.choices(alphabet, k=rng.randint(1, max_length)))
+        for _ in range(n)
+    ]
+
+
+@pytest.fixture
+def min_words(monkeypatch):
+    monkeypatch.setattr(ahocorasick, "MIN_WORDS", 2)
+
+
+class TestAutomaton:
+    @pytest.mark.parametrize("seed", range(30))
+    def test_same_as_re(self, seed):
+        rng = random.Random(seed)
+        words = random_words(rng, rng.randint(1, 12))
+        text = "".join(rng.choices("abcd", k=60))
+        automaton = Automaton(words)
+        compiled = regex_for(words)
+        assert list(automaton.finditer(text)) == [
+            m.span() for m in compiled.finditer(text)
+        ]
+        for pos in range(0, len(text), 7):
+            m = compiled.match(text, pos)
+            assert automaton.match(text, pos) == (m and m.span())
+
+    @pytest.mark.parametrize(
+        "words, text, span",
+        [
+            # Leftmost start wins over the earlier word
+            (["bc", "abcd"], "abcd", (0, 4)),
+            # Among the words at the leftmost start, the first one
+            (["ab", "abcd"], "abcd", (0, 2)),
+            (["abcd", "ab"], "abcd", (0, 4)),
+            (["abcx", "bc"], "abcd", (1, 3)),
+            (["he", "she", "hers"], "ushers", (1, 4)),
+        ],
+    )
+    def test_leftmost_first(self, words, text, span):
+        assert Automaton(words).search(text) == span
+        assert regex_for(words).search(text).span() == span
+
+    def test_fullmatch(self):
+        automaton = Automaton(["ab", "abc"])
+        assert automaton.fullmatch("abc") == (0, 3)
+        assert automaton.fullmatch("abcd") is None
+
+    def test_unicode(self):
+        automaton = Automaton(["café", "naïve"])
+        assert list(automaton.finditer("un café naïve")) == [(3, 7), (8, 13)]
+
+    def test_transition_cache_limit(self, monkeypatch):
+        monkeypatch.setattr(ahocorasick, "MAX_TRANSITIONS", 0)
+        automaton = Automaton(["abab", "bb"])
+        edges = len(automaton._delta)
+        assert list(automaton.finditer("abababb")) == [(0, 4), (5, 7)]
+        assert len(automaton._delta) == edges
+
+    def test_empty_word(self):
+        with pytest.raises(ValueError):
+            Automaton(["a", ""])
+
+
+class TestLiteralWords:
+    @pytest.mark.parametrize(
+        "regex, expected",
+        [
+            (any_of("foo", "bar"), ["foo", "bar"]),
+            (any_of("a.b", "c"), None),
+            (any_of(r"a\.b", "cd"), ["a.b", "cd"]),
+            (EzRegex("foo") | "bar", ["foo", "bar"]),
+            (Group(EzRegex("foo"), "|", "bar", capture=False), ["foo", "bar"]),
+            (any_of("foo", "bar").one_or_more(), None),
+            (Group(EzRegex("foo"), "|", "bar", flags=re.IGNORECASE), None),
+            (Group(EzRegex("foo"), "|", Pattern("b").one_or_more()), None),
+            (Group(EzRegex("foo"), "|", Group("bar")), None),
+            (Pattern("a"), None),
+        ],
+    )
+    def test_literal_words(self, regex, expected):
+        assert literal_words(regex) == expected
+
+
+class TestEzRegex:
+    WORDS = ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD"]
+    TEXT = "HEAD / PATCH /x PUTS GETTER DELETE"
+
+    def test_uses_automaton(self, min_words):
+        regex = any_of(*self.WORDS)
+        assert isinstance(regex._literal_pattern(), LiteralPattern)
+        assert regex.search(self.TEXT).span() == (0, 4)
+        assert regex.search(self.TEXT).group(1) == "HEAD"
+
+    def test_small_sets_use_re(self):
+        assert any_of(*self.WORDS)._literal_pattern() is None
+
+    @pytest.mark.parametrize("capture", [True, False])
+    def test_same_results(self, min_words, capture):
+        regex = Group(*any_of(*self.WORDS)._patterns, capture=capture)
+        compiled = regex.compile()
+        assert regex.findall(self.TEXT) == compiled.findall(self.TEXT)
+        assert regex.count(self.TEXT) == len(compiled.findall(self.TEXT))
+        assert [m.span() for m in regex.finditer(self.TEXT)] == [
+            m.span() for m in compiled.finditer(self.TEXT)
+        ]
+        assert [m.groups() for m in regex.finditer(self.TEXT)] == [
+            m.groups() for m in compiled.finditer(self.TEXT)
+        ]
+        assert regex.match("PATCHES").group() == "PATCH"
+        assert regex.match("x GET") is None
+        assert regex.fullmatch("DELETE").span() == (0, 6)
+        assert regex.fullmatch("DELETED") is None
+
+    def test_named_group(self, min_words):
+        regex = Group(*any_of(*self.WORDS)._patterns, name="method")
+        assert regex.search("a PUT")["method"] == "PUT"
+        assert regex.search("a PUT").groupdict() == {"method": "PUT"}
+
+    def test_edit_invalidates(self, min_words):
+        regex = any_of("foo", "bar")
+        assert regex.search("xbar").span() == (1, 4)
+        regex.set_pattern(6, Pattern("z"))
+        assert str(regex) == "(foo|baz)"
+        assert regex.search("xbar") is None
+        regex.set_pattern(6, Pattern(r"\d"))
+        assert regex._literal_pattern() is None
+        assert regex.search("xba1").span() == (1, 4)
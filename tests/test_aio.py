@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ezr import aio
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Pattern
+
+TEXT = "foo 12 bär 345\nfoobar 6789\nbaz\nqux 1 foo\n"
+
+
+def make_reader(data, size):
+    reader = asyncio.StreamReader()
+    for i in range(0, len(data), size):
+        reader.feed_data(data[i : i + size])
+    reader.feed_eof()
+    return reader
+
+
+async def collect(aiterator):
+    return [item async for item in aiterator]
+
+
+class TestAio:
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            Pattern(r"\d") * (1, 3),
+            any_of("foo", "bär", "foobar"),
+            Pattern(r"\w").one_or_more(),
+        ],
+    )
+    @pytest.mark.parametrize("size", [1, 3, 100])
+    def test_afinditer(self, regex, size):
+        expected = [(m.span(), m.group()) for m in regex.finditer(TEXT)]
+
+        async def main():
+            reader = make_reader(TEXT.encode(), size)
+            matches = await collect(regex.afinditer(reader, chunk_size=size))
+            return [(m.span(), m.group()) for m in matches]
+
+        assert asyncio.run(main()) == expected
+
+    def test_afinditer_offloaded(self, monkeypatch):
+        monkeypatch.setattr(aio, "OFFLOAD_SIZE", 1)
+        regex = Pattern(r"\d").one_or_more()
+
+        async def main():
+            reader = make_reader(TEXT.encode(), 4)
+            return await collect(regex.afinditer(reader, chunk_size=4))
+
+        assert [m.group() for m in asyncio.run(main())] == [
+            "12",
+            "345",
+            "6789",
+            "1",
+        ]
+
+    def test_afilter_lines(self):
+        regex = EzRegex("foo")
+
+        async def main():
+            reader = make_reader(TEXT.encode(), 5)
+            return await collect(regex.afilter_lines(reader))
+
+        assert asyncio.run(main()) == [
+            "foo 12 bär 345\n",
+            "foobar 6789\n",
+            "qux 1 foo\n",
+        ]
+
+    @pytest.mark.parametrize("offload", [1, aio.OFFLOAD_SIZE])
+    def test_afilter_long_lines(self, monkeypatch, offload):
+        monkeypatch.setattr(aio, "OFFLOAD_SIZE", offload)
+        regex = EzRegex("foo")
+        # Longer than the 64 KiB default limit of a StreamReader
+        long = "x" * 100_000
+        text = f"{long}foo\n{long}\nfoo\n{long}foo"
+
+        async def main():
+            reader = make_reader(text.encode(), 1 << 12)
+            return await collect(regex.afilter_lines(reader))
+
+        assert asyncio.run(main()) == [f"{long}foo\n", "foo\n", f"{long}foo"]
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import math
+import re
+import sys
+
+import pytest
+
+from ezr import any_of
+from ezr import CharacterSet
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr import start_of_string
+from ezr.analysis import length_bounds
+
+
+class TestLengthBounds:
+    @pytest.mark.parametrize(
+        "regex, expected",
+        [
+            (Pattern("a"), (1, 1)),
+            (EzRegex("foo"), (3, 3)),
+            (CharacterSet("abc"), (1, 1)),
+            (Group("abc"), (3, 3)),
+            (Group(), (0, 0)),
+            (start_of_string + "a", (1, 1)),
+            (Pattern(r"\d") * 3, (3, 3)),
+            (Pattern(r"\d") * (2, 4), (2, 4)),
+            (Pattern(r"\d").optional(), (0, 1)),
+            (Pattern("a").at_most(3), (0, 3)),
+            (Pattern("a").one_or_more(), (1, None)),
+            (Group("ab").zero_or_more(), (0, None)),
+            (Group("ab") * 3, (6, 6)),
+            (Group("ab") | "c", (1, 2)),
+            (any_of("foo", "ba", "bazz"), (2, 4)),
+            (Group(Group("ab").optional(), "c") * (1, 2), (1, 6)),
+            (Group(start_of_string).one_or_more(), (0, 0)),
+            (EzRegex(Pattern("a"), Pattern(".").one_or_more(), "|", "b"), (1, None)),
+        ],
+    )
+    def test_length_bounds(self, regex, expected):
+        assert length_bounds(regex) == expected
+        assert regex.length_bounds() == expected
+
+    def test_nested_plain_regex(self):
+        # Renders as "xa|by", the inner alternation is not enclosed
+        regex = EzRegex("x", EzRegex("a", "|", "b"), "y")
+        assert regex.length_bounds() == (2, 2)
+        regex = EzRegex("x", EzRegex("abc", lower=2, upper=2))
+        assert str(regex) == "xabc{2}"
+        assert regex.length_bounds() == (5, 5)
+
+    @pytest.mark.parametrize(
+        "string, expected",
+        [
+            (r"a\.b", (3, 3)),
+            (r"\d", (1, 1)),
+            (r"\d+", (1, None)),
+            (r"\bfoo\b", (3, 3)),
+            (r"a\|b", (3, 3)),
+            ("a*", (0, None)),
+            ("ab?", (1, 2)),
+            ("a+?b", (2, None)),
+            ("a{2,4}", (2, 4)),
+            ("a{,3}", (0, 3)),
+            ("a{3,}", (3, None)),
+            ("a{}", (3, 3)),
+            ("a{2", (3, 3)),
+            ("[]a]+", (1, None)),
+            (r"[^\]a]{2}", (2, 2)),
+            ("(a)", (0, None)),
+            (r"\x41", (0, None)),
+        ],
+    )
+    def test_string_syntax(self, string, expected):
+        # Strings are split into one leaf per character
+        assert EzRegex(string).length_bounds() == expected
+
+    def test_string_syntax_in_tree(self):
+        assert (Group(EzRegex(r"\d*")) + "b").length_bounds() == (1, None)
+        # A raw parenthesis can open a group around the other nodes
+        regex = EzRegex("a") + Group("b", "|", EzRegex("(c)"))
+        assert regex.length_bounds() == (0, None)
+
+    def test_verbose_group(self):
+        # The space is ignored, the group matches "ab"
+        regex = Group("a b", flags=re.VERBOSE)
+        assert regex.length_bounds() == (0, None)
+        assert regex.search("ab").group() == "ab"
+
+    def test_stacked_quantifiers(self):
+        # Renders as "a?+", a possessive "?" on Python 3.11 and an error before
+        regex = EzRegex(Pattern("a").optional()).one_or_more()
+        assert regex.length_bounds() == (0, None)
+        regex = EzRegex("x", EzRegex(Pattern("a").optional()).optional())
+        assert str(regex) == "xa??"
+        assert regex.length_bounds() == (0, None)
+
+
+class TestMatching:
+    def test_search_too_short(self):
+        regex = Pattern(r"\d") * 3
+        assert regex.search("12") is None
+        assert regex.search("a123").group() == "123"
+
+    def test_match(self):
+        regex = EzRegex("foo")
+        assert regex.match("fo") is None
+        assert regex.match("foobar") is not None
+        assert regex.match("barfoo") is None
+
+    def test_fullmatch(self):
+        regex = Pattern(r"\d") * (2, 3)
+        assert regex.fullmatch("1") is None
+        assert regex.fullmatch("1234") is None
+        assert regex.fullmatch("123") is not None
+
+    def test_findall(self):
+        regex = Pattern(r"\d") * 2
+        assert regex.findall("1") == []
+        assert regex.findall("12a34") == ["12", "34"]
+
+    def test_finditer(self):
+        regex = Pattern(r"\d") * 2
+        assert list(regex.finditer("1")) == []
+        assert [m.span() for m in regex.finditer("12a34")] == [(0, 2), (3, 5)]
+
+    def test_string_syntax(self):
+        assert EzRegex(r"a\.b").search("a.b").group() == "a.b"
+        assert EzRegex(r"\d").findall("5") == ["5"]
+        assert EzRegex(r"\d").count("5") == 1
+        assert EzRegex("a*").fullmatch("") is not None
+        assert EzRegex("ab?").fullmatch("a") is not None
+
+    @pytest.mark.skipif(sys.version_info < (3, 11), reason="possessive repeat")
+    def test_stacked_quantifiers(self):
+        regex = EzRegex(Pattern("a").optional()).one_or_more()
+        assert regex.search("").span() == re.search(str(regex), "").span()
+
+
+class TestMetrics:
+    def test_sizes(self):
+        # (\d{4}|[_.+-])+@(gmail|yahoo)
+        regex = (
+            Group(Pattern(r"\d").exactly(4), "|", any_of("_.+-")).one_or_more()
+            + "@"
+            + Group(EzRegex("gmail"), "|", EzRegex("yahoo"), capture=False)
+        )
+        m = regex.metrics()
+        assert m.node_counts == {
+            "EzRegex": 3,
+            "Group": 2,
+            "Pattern": 18,
+            "Quantifier": 2,
+            "CharacterSet": 1,
+        }
+        assert m.depth == 4
+        assert m.rendered_length == len(str(regex))
+        assert m.capture_groups == 1
+        assert m.max_fanout == 2
+        assert m.quantifier_product == math.inf
+        assert m.as_dict()["capture_groups"] == 1
+
+    def test_top_level_alternation(self):
+        m = (EzRegex("a") | "b" | "c").metrics()
+        assert m.max_fanout == 3
+        assert m.quantifier_product == 1
+
+    def test_quantifier_product(self):
+        regex = Group(Pattern("a").between(1, 3), "b").exactly(4)
+        assert regex.metrics().quantifier_product == 12
+        assert Pattern("a").exactly(0).metrics().quantifier_product == 0
+
+    @pytest.mark.parametrize(
+        "regex, expected",
+        [
+            (EzRegex("abc"), 1),
+            (Pattern(r"\d").exactly(3), 3),
+            (Pattern(r"\d").one_or_more(), 100),
+            (Pattern(r"\d").one_or_more() + Pattern(r"\d").one_or_more(), 100**2),
+            (Group(Pattern("a"), "|", Pattern("b")).zero_or_more(), 200),
+            (Group(Pattern(r"\w").one_or_more(), Pattern(r"\s")).zero_or_more(), 5000),
+            (Group(Pattern("a"), "|", Pattern("a")).between(1, 10), 2**10),
+            (Group(Pattern("a").one_or_more()).one_or_more() + "$", 100.0**100),
+            (Group(Pattern("a").one_or_more(), "b").one_or_more(), 100 * 50),
+        ],
+    )
+    def test_backtracking(self, regex, expected):
+        assert regex.metrics(input_length=100).backtracking == expected
+
+    @pytest.mark.parametrize(
+        "regex, expected, fanout",
+        [
+            (EzRegex(r"\d+"), 100, 1),
+            (EzRegex("[ab]+c"), 100, 1),
+            (EzRegex("(?:ab|cd)*"), 100, 2),
+            (EzRegex("(a+)+b"), 100.0**100, 1),
+            (EzRegex("(?P<n>a|a){1,10}"), 2**10, 2),
+            (EzRegex("a(?=b+)c"), 100, 1),
+            (EzRegex("(?i)a+"), 100, 1),
+            (EzRegex("x|(a|b|c)"), 4, 3),
+        ],
+    )
+    def test_raw_syntax(self, regex, expected, fanout):
+        m = regex.metrics(input_length=100)
+        assert m.backtracking == expected
+        assert m.max_fanout == fanout
+
+    @pytest.mark.parametrize("pattern", [r"(a)\1", "(?x)a b", "(a|b"])
+    def test_unknown_backtracking(self, pattern):
+        assert math.isnan(EzRegex(pattern).metrics().backtracking)
+
+    def test_raw_captures(self):
+        assert EzRegex("(a)(?:b)").metrics().capture_groups == 1
+
+    def test_exponential(self):
+        regex = Group(Pattern("a"), "|", Pattern("a")).zero_or_more()
+        assert regex.metrics().backtracking > 1e100
+        regex = Group(Pattern("a").one_or_more()).one_or_more()
+        assert regex.metrics().backtracking == math.inf
+
+    def test_deep_tree(self):
+        regex = Pattern("a")
+        for _ in range(5000):
+            regex = Group(regex)
+        m = regex.metrics()
+        assert m.depth == 5001
+        assert m.node_counts == {"Group": 5000, "Pattern": 1}
+        assert m.backtracking == 1
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+from importlib import metadata
+
+import pytest
+
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.cache import RuleCache
+from ezr.cache import structural_key
+
+
+def rule(i: int = 0) -> EzRegex:
+    # (?P<user>\w+)@host<i>
+    return Group(Pattern(r"\w").one_or_more(), name="user") + f"@host{i}"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "rules.cache"
+
+
+class TestStructuralKey:
+    def test_equal_trees(self):
+        assert structural_key(rule()) == structural_key(rule())
+
+    @pytest.mark.parametrize(
+        "other",
+        [
+            rule(1),
+            Group(Pattern(r"\w").one_or_more(lazy=True), name="user") + "@host0",
+            Group(Pattern(r"\w").one_or_more(), name="name") + "@host0",
+            Group(Pattern(r"\w").one_or_more(), flags=re.I) + "@host0",
+            Group(Pattern(r"\w").zero_or_more(), name="user") + "@host0",
+            EzRegex(
+                Group(Pattern(r"\w").one_or_more(), name="user"),
+                EzRegex("@host0"),
+            ),
+        ],
+    )
+    def test_different_trees(self, other):
+        assert structural_key(rule()) != structural_key(other)
+
+    def test_does_not_render(self):
+        regex = rule()
+        structural_key(regex)
+        assert regex._rendered is None
+
+    def test_version_looked_up_once(self, monkeypatch):
+        key = structural_key(rule())
+        monkeypatch.setattr(metadata, "version", pytest.fail)
+        assert structural_key(rule()) == key
+
+
+class TestRuleCache:
+    def test_load(self, path):
+        with RuleCache(path) as cache:
+            assert cache.load([rule(0), rule(1), rule(0)]) == 0
+            assert (cache.hits, cache.misses) == (0, 3)
+            assert len(cache) == 2
+
+        regex = rule(1)
+        with RuleCache(path) as cache:
+            assert cache.load([regex]) == 1
+            assert cache.get(regex)["pattern"] == r"(?P<user>\w+)@host1"
+        # The entry was loaded, nothing below the root was rendered
+        assert regex._rendered == r"(?P<user>\w+)@host1"
+        assert all(p._rendered is None for p in regex.patterns)
+        assert regex.group_index() == {"user": 1}
+        assert regex.length_bounds() == (7, None)
+        assert regex.search("me@host1").group("user") == "me"
+
+    def test_edit_after_load(self, path):
+        with RuleCache(path) as cache:
+            cache.load([rule()])
+            regex = rule()
+            cache.load([regex])
+        regex.set_pattern(-1, "1")
+        assert str(regex) == r"(?P<user>\w+)@host1"
+
+    def test_eviction(self, path):
+        with RuleCache(path, max_bytes=2000) as cache:
+            for i in range(100):
+                cache.load([rule(i)])
+            assert 0 < cache.size <= 2000
+            # The most recently stored entries survive
+            assert cache.get(rule(99)) is not None
+            assert cache.get(rule(0)) is None
+
+    def test_shared_file(self, path):
+        with RuleCache(path) as a, RuleCache(path) as b:
+            a.load([rule(0)])
+            b.load([rule(1)])
+            assert a.load([rule(1)]) == 1
+            assert b.load([rule(0)]) == 1
+
+    def test_clear(self, path):
+        with RuleCache(path) as cache:
+            cache.load([rule()])
+            cache.clear()
+            assert len(cache) == 0
+            assert cache.get(rule()) is None
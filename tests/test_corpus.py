@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import CharacterSet
+from ezr import CorpusIndex
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.corpus import ANY
+from ezr.corpus import trigram_query
+
+DOCUMENTS = [
+    "error: disk full on /dev/sda1",
+    "warning: disk almost full",
+    "error: connection timeout after 30s",
+    "info: started in 1.5s",
+    "ERROR: Disk failure",
+    "𝕦𝕟𝕚𝕔𝕠𝕕𝕖 café naïve",
+    "",
+]
+
+
+def random_pattern(rng: random.Random, depth: int = 0) -> Pattern:
+    """Random tree of literals, alternations, sets, classes and quantifiers."""
+    parts = []
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.choice(
+            ["literal", "literal", "set", "class", "escape", "string", "group"],
+        )
+        if kind == "literal":
+            part = EzRegex("".join(rng.choices("abcd", k=rng.randint(1, 4))))
+        elif kind == "set":
+            part = CharacterSet(*rng.sample("abcd", rng.randint(1, 3)))
+        elif kind == "class":
+            part = Pattern(rng.choice([r"\w", r"\d", "."]))
+        elif kind == "escape":
+            part = EzRegex(r"\.")
+        elif kind == "string":
+            part = EzRegex(rng.choice(["ab?c", "a*b", "[ab]c", "a{1,2}b", r"\d+"]))
+        elif depth < 2:
+            n = rng.randint(1, 3)
+            branches = [random_pattern(rng, depth + 1) for _ in range(n)]
+            alternatives: list = [branches[0]]
+            for branch in branches[1:]:
+                alternatives += ["|", branch]
+            part = Group(*alternatives, capture=rng.random() < 0.5)
+        else:
+            continue
+        quantifier = rng.choice([None, None, (0, 1), (0, None), (1, None), (2, 3)])
+        if quantifier is not None:
+            part = part.between(*quantifier)
+        parts.append(part)
+    return EzRegex(*parts)
+
+
+@pytest.fixture(params=["memory", "file"])
+def index(request, tmp_path):
+    built = CorpusIndex(DOCUMENTS)
+    if request.param == "memory":
+        yield built
+        return
+    path = tmp_path / "corpus.idx"
+    built.save(path)
+    with CorpusIndex.open(path) as opened:
+        yield opened
+
+
+class TestTrigramQuery:
+    @pytest.mark.parametrize(
+        "regex, query",
+        [
+            (EzRegex("ab"), ANY),
+            (EzRegex("abcd"), ("and", ("abc", "bcd"))),
+            (EzRegex(r"a\.b"), "a.b"),
+            (any_of("abc", "xyz"), ("or", ("abc", "xyz"))),
+            (EzRegex("ab") + Pattern(r"\d") + "cd", ANY),
+            (EzRegex("abc") + Pattern(r"\d") + "xyz", ("and", ("abc", "xyz"))),
+            (EzRegex("ab") + CharacterSet("xy"), ("or", ("abx", "aby"))),
+            (EzRegex("abc") + Pattern("d").zero_or_more(), "abc"),
+            (Group(EzRegex("abc")).one_or_more(), "abc"),
+            (Group(EzRegex("abc")).zero_or_more(), ANY),
+            (EzRegex("ab") + Pattern("c").optional(), ANY),
+            (EzRegex("ab") + ~CharacterSet("c"), ANY),
+            (Group(EzRegex("abc"), flags=re.IGNORECASE), ANY),
+            (Pattern(r"^") + "abc" + Pattern(r"$"), "abc"),
+            (EzRegex("abcx*yz"), "abc"),
+            (EzRegex("abc{2}"), "abc"),
+            (
+                EzRegex("abcd?e"),
+                ("or", (("and", ("abc", "bcd", "cde")), ("and", ("abc", "bce")))),
+            ),
+            (EzRegex("[abc]de"), ANY),
+            (EzRegex("x(abc)?"), ANY),
+            (EzRegex(r"\x41bcd"), ANY),
+        ],
+    )
+    def test_query(self, regex, query):
+        assert trigram_query(regex) == query
+
+    def test_flags(self):
+        assert trigram_query(EzRegex("abc"), re.IGNORECASE) == ANY
+
+    def test_long_alternation(self):
+        words = [f"word{i:03}" for i in range(200)]
+        query = trigram_query(any_of(*words) + Pattern(r"\d"))
+        assert query[0] == "or" and len(query[1]) == 200
+
+
+class TestCorpusIndex:
+    @pytest.mark.parametrize("seed", range(100))
+    def test_same_as_scan(self, seed):
+        rng = random.Random(seed)
+        documents = [
+            "".join(rng.choices("abcd .1", k=rng.randint(0, 30))) for _ in range(40)
+        ]
+        index = CorpusIndex(documents)
+        regex = random_pattern(rng)
+        compiled = regex.compile()
+        expected = [i for i, d in enumerate(documents) if compiled.search(d)]
+        assert set(expected) <= set(index.candidates(regex))
+        assert [i for i, _ in index.search(regex)] == expected
+
+    def test_search(self, index):
+        found = list(index.search(EzRegex("disk") + Pattern(r"\s") + "full"))
+        assert [(i, m.group()) for i, m in found] == [(0, "disk full")]
+        assert index.candidates(EzRegex("disk")) == [0, 1]
+
+    def test_finditer(self, index):
+        regex = Pattern(r"\d").one_or_more() + "s"
+        found = [(i, m.group()) for i, m in index.finditer(regex)]
+        assert found == [(2, "30s"), (3, "5s")]
+
+    def test_flags(self, index):
+        found = [i for i, _ in index.search(EzRegex("disk"), re.IGNORECASE)]
+        assert found == [0, 1, 4]
+
+    def test_unicode(self, index):
+        assert [i for i, _ in index.search(EzRegex("𝕚𝕔𝕠"))] == [5]
+        assert [i for i, _ in index.search(EzRegex("naïve"))] == [5]
+
+    def test_string_pattern(self, index):
+        assert index.candidates("timeout") == [2]
+
+    def test_string_repeats(self):
+        index = CorpusIndex(["abce", "abcde", "abcyz", "color", "colour"])
+        assert [i for i, _ in index.search(EzRegex("abcd?e"))] == [0, 1]
+        assert [i for i, _ in index.search(EzRegex("abcx*yz"))] == [2]
+        assert [i for i, _ in index.search("colou?r")] == [3, 4]
+
+    def test_documents(self, index):
+        assert len(index) == len(DOCUMENTS)
+        assert [index[i] for i in range(len(index))] == DOCUMENTS
+        with pytest.raises(IndexError):
+            index[len(DOCUMENTS)]
+
+    def test_add(self):
+        index = CorpusIndex()
+        assert index.add("abcd") == 0
+        assert index.add("bcde") == 1
+        assert index.candidates(EzRegex("bcd")) == [0, 1]
+        assert index.candidates(EzRegex("cde")) == [1]
+
+    def test_file_is_read_only(self, tmp_path):
+        path = tmp_path / "corpus.idx"
+        CorpusIndex(DOCUMENTS).save(path)
+        with CorpusIndex.open(path) as index:
+            with pytest.raises(ValueError):
+                index.add("abc")
+            with pytest.raises(ValueError):
+                index.save(tmp_path / "copy.idx")
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "corpus.idx"
+        path.write_bytes(b"not an index" * 10)
+        with pytest.raises(ValueError):
+            CorpusIndex.open(path)
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / "corpus.idx"
+        CorpusIndex().save(path)
+        with CorpusIndex.open(path) as index:
+            assert len(index) == 0
+            assert list(index.search(EzRegex("abc"))) == []
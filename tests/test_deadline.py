@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+import time
+
+import pytest
+
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.deadline import DeadlinePool
+from ezr.deadline import MatchResult
+from ezr.deadline import MatchTimeout
+
+
+def nested_quantifiers():
+    # (a+)+b, exponential on a run of "a" without "b"
+    return Group(Pattern("a").one_or_more()).one_or_more() + "b"
+
+
+def overlapping_alternatives():
+    # (a|a)*c, exponential as well
+    return Group(Pattern("a"), "|", Pattern("a")).zero_or_more() + "c"
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = DeadlinePool(size=2)
+    yield pool
+    pool.close()
+
+
+class TestDeadline:
+    @pytest.mark.parametrize(
+        "regex",
+        [nested_quantifiers(), overlapping_alternatives()],
+    )
+    def test_pathological_timeout(self, pool, regex):
+        start = time.monotonic()
+        with pytest.raises(MatchTimeout):
+            pool.run(regex.compile(), "search", "a" * 40, timeout=0.2)
+        assert time.monotonic() - start < 5
+
+    def test_worker_replaced_after_timeout(self, pool):
+        with pytest.raises(MatchTimeout):
+            pool.run(nested_quantifiers().compile(), "search", "a" * 40, timeout=0.1)
+        match = pool.run(nested_quantifiers().compile(), "search", "aab", timeout=5)
+        assert match.group() == "aab"
+
+    def test_call_after_timeout(self):
+        pool = DeadlinePool(size=1)
+        try:
+            start = time.monotonic()
+            with pytest.raises(MatchTimeout):
+                pool.run(nested_quantifiers().compile(), "search", "a" * 40, 0.2)
+            assert time.monotonic() - start < 1
+            # The killed worker is replaced in the background
+            for _ in range(100):
+                if pool._idle:
+                    break
+                time.sleep(0.05)
+            assert len(pool._idle) == 1
+            start = time.monotonic()
+            match = pool.run(re.compile("b"), "search", "ab", timeout=1)
+            assert match.span() == (1, 2)
+            assert time.monotonic() - start < 1
+        finally:
+            pool.close()
+
+    def test_checkout_counts(self, monkeypatch):
+        pool = DeadlinePool(size=1)
+        checkout = pool._checkout
+
+        def slow_checkout():
+            time.sleep(0.3)
+            return checkout()
+
+        monkeypatch.setattr(pool, "_checkout", slow_checkout)
+        try:
+            with pytest.raises(MatchTimeout):
+                pool.run(re.compile("a"), "search", "a", timeout=0.1)
+        finally:
+            pool.close()
+
+    def test_search(self, pool):
+        regex = Group(Pattern(r"\d").one_or_more(), name="num") + Group("x").optional()
+        match = pool.run(regex.compile(), "search", "ab12cd", timeout=5)
+        assert isinstance(match, MatchResult)
+        assert match.span() == (2, 4)
+        assert match.group() == match[0] == "12"
+        assert match.group("num", 2) == ("12", None)
+        assert match.groups() == ("12", None)
+        assert match.groups("-") == ("12", "-")
+        assert match.groupdict() == {"num": "12"}
+        assert match.start("num") == 2
+        assert match.end(1) == 4
+        assert repr(match) == "<MatchResult object; span=(2, 4), match='12'>"
+        with pytest.raises(IndexError):
+            match.group(3)
+
+    @pytest.mark.parametrize(
+        "method, expected",
+        [
+            ("match", None),
+            ("fullmatch", None),
+            ("findall", ["1", "2"]),
+        ],
+    )
+    def test_methods(self, pool, method, expected):
+        compiled = re.compile(r"\d")
+        assert pool.run(compiled, method, "a1b2", timeout=5) == expected
+
+    def test_finditer(self, pool):
+        matches = pool.run(re.compile(r"\d"), "finditer", "a1b2", timeout=5)
+        assert [m.span() for m in matches] == [(1, 2), (3, 4)]
+
+    def test_unknown_method(self, pool):
+        with pytest.raises(ValueError, match=r"Unknown method"):
+            pool.run(re.compile("a"), "sub", "a", timeout=5)
+
+    def test_time(self, pool):
+        elapsed = pool.time(re.compile(r"\d"), "search", "a1", timeout=5)
+        assert isinstance(elapsed, float)
+        assert 0 <= elapsed < 5
+        with pytest.raises(MatchTimeout):
+            pool.time(nested_quantifiers().compile(), "search", "a" * 40, 0.2)
+        with pytest.raises(ValueError, match=r"Unknown method"):
+            pool.time(re.compile("a"), "sub", "a", timeout=5)
+
+    def test_pattern_timeout(self):
+        regex = nested_quantifiers()
+        with pytest.raises(MatchTimeout):
+            regex.search("a" * 40, timeout=0.2)
+        assert regex.search("aab", timeout=5).group() == "aab"
+        assert regex.findall("ab aab", timeout=5) == ["a", "aa"]
+        assert [m.group() for m in EzRegex("ab").finditer("abab", timeout=5)] == [
+            "ab",
+            "ab",
+        ]
+        assert EzRegex("ab").fullmatch("ab", timeout=5) is not None
+        assert EzRegex("ab").match("ba", timeout=5) is None
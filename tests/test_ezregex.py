@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import itertools
+import pickle
 import re
 
 import pytest
 
+from ezr import any_of
 from ezr import CharacterSet
 from ezr import digit
 from ezr import EzRegex
+from ezr import Group
 from ezr import Pattern
 from ezr import Quantifier
+from ezr.ezregex import RENDER_CACHE_LIMIT
+from ezr.walk import walk
 
 
 class TestEzRegex:
@@ -131,3 +136,203 @@ class TestEzRegex:
         regex = regex.as_charset()
         assert isinstance(regex, CharacterSet)
         assert str(regex) == rf"[{expected}]"
+
+
+class TestIncremental:
+    def test_render_cached(self):
+        inner = Group("abc")
+        regex = EzRegex("x", inner, "y")
+        assert str(regex) == "x(abc)y"
+        assert regex._rendered == "x(abc)y"
+        assert inner._rendered == "(abc)"
+
+    def test_large_siblings_kept(self):
+        words = [f"word{i}" for i in range(4000)]
+        siblings = [any_of(*words[i::4]) for i in range(4)]
+        regex = Group(*siblings, Pattern("x"))
+        rendered = [str(s) for s in siblings]
+        assert all(len(r) > RENDER_CACHE_LIMIT for r in rendered)
+        str(regex)
+        regex.set_pattern(4, Pattern("y"))
+        assert str(regex).endswith("y)")
+        # Editing the leaf only renders the root again
+        assert all(s._rendered is r for s, r in zip(siblings, rendered))
+
+    def test_chain_not_kept(self):
+        regex = Group(EzRegex("a" * 2 * RENDER_CACHE_LIMIT))
+        for _ in range(100):
+            regex = Group(regex)
+        str(regex)
+        cached = sum(len(n._rendered or "") for n in walk(regex))
+        assert cached < 3 * len(str(regex))
+
+    def test_quantifier_edit(self):
+        inner = Group("abc", name="foo")
+        regex = EzRegex("x", inner, "y")
+        assert str(regex) == "x(?P<foo>abc)y"
+        assert inner.one_or_more() is inner
+        assert str(regex) == "x(?P<foo>abc)+y"
+        inner.quantifier.lazy()
+        assert str(regex) == "x(?P<foo>abc)+?y"
+
+    def test_group_edit(self):
+        inner = Group("abc")
+        regex = Group("x", inner)
+        assert str(regex) == "(x(abc))"
+        inner.capture = False
+        assert str(regex) == "(x(?:abc))"
+        inner.capture = True
+        inner.name = "foo"
+        assert str(regex) == "(x(?P<foo>abc))"
+        inner.name = None
+        assert str(regex) == "(x(abc))"
+
+    def test_set_pattern(self):
+        group = Group("foo", "|", "bar")
+        regex = EzRegex(Group(group), "!")
+        sibling = regex.patterns[1]
+        assert str(regex) == "((foo|bar))!"
+        group.set_pattern(0, "b")
+        assert str(regex) == "((boo|bar))!"
+        group.set_pattern(4, Group("baz"))
+        assert str(regex) == "((boo|(baz)ar))!"
+        assert sibling._rendered == "!"
+
+    def test_set_pattern_detaches_child(self):
+        child = Pattern("a")
+        regex = EzRegex(child, "b")
+        regex.set_pattern(0, "c")
+        str(regex)
+        child.one_or_more()
+        assert regex._rendered == "cb"
+
+    def test_shared_node(self):
+        shared = Pattern("a")
+        first = EzRegex(shared, "b")
+        second = Group("c", shared)
+        assert (str(first), str(second)) == ("ab", "(ca)")
+        shared.optional()
+        assert (str(first), str(second)) == ("a?b", "(ca?)")
+
+    def test_compile_reused(self):
+        inner = Group("abc")
+        regex = EzRegex("x", inner)
+        compiled = regex.compile()
+        assert regex.compile() is compiled
+        regex.set_pattern(1, Group("abc"))
+        assert regex.compile() is compiled
+        inner.optional()
+        regex.set_pattern(1, inner)
+        assert regex.compile() is not compiled
+        assert regex.compile().pattern == "x(abc)?"
+
+    def test_length_bounds_invalidated(self):
+        inner = Group("abc")
+        regex = EzRegex("x", inner)
+        assert regex.length_bounds() == (4, 4)
+        inner.optional()
+        assert regex.length_bounds() == (1, 4)
+
+    def test_pickle(self):
+        inner = Group("abc")
+        regex = pickle.loads(pickle.dumps(EzRegex("x", inner)))
+        assert str(regex) == "x(abc)"
+        regex.patterns[1].optional()
+        assert str(regex) == "x(abc)?"
+
+    def test_dead_parents_pruned(self):
+        shared = Pattern("a")
+        keep = EzRegex(shared, "c")
+        for _ in range(100):
+            EzRegex(shared, "b")
+        assert len(shared._parents) < 16
+        assert str(keep) == "ac"
+        shared.optional()
+        assert str(keep) == "a?c"
+
+
+class TestBuildUnchecked:
+    def build(self, checked: bool):
+        if checked:
+            digits = Pattern(r"\d", 1, None)
+            group = Group("ab", "|", digits, name="x", flags=re.IGNORECASE)
+            return EzRegex(group, CharacterSet(Pattern("a-z"), "_"), "!")
+        digits = Pattern.build_unchecked(r"\d", Quantifier(1, None))
+        group = Group.build_unchecked(
+            "ab",
+            "|",
+            digits,
+            name="x",
+            flags=re.IGNORECASE,
+        )
+        chars = CharacterSet.build_unchecked(Pattern.build_unchecked("a-z"), "_")
+        return EzRegex.build_unchecked(group, chars, "!")
+
+    def test_same_tree(self):
+        regex = self.build(checked=False)
+        assert regex == self.build(checked=True)
+        assert str(regex) == str(self.build(checked=True))
+        assert regex.search("x AB_!")["x"] == "AB"
+
+    def test_edits_invalidate(self):
+        leaf = Pattern.build_unchecked("a")
+        regex = EzRegex.build_unchecked(Group.build_unchecked(leaf, "b"), "c")
+        assert str(regex) == "(ab)c"
+        leaf.one_or_more()
+        assert str(regex) == "(a+b)c"
+
+    def test_validate(self):
+        regex = self.build(checked=False)
+        assert regex.validate() is regex
+        leaves = [n for n in walk(regex) if not isinstance(n, EzRegex)]
+        ranges = [n for n in leaves if n.pattern == "a-z"]
+        assert ranges[0].annotation.startswith("Range")
+
+    @pytest.mark.parametrize(
+        "build, error",
+        [
+            (lambda: Pattern.build_unchecked("abc"), "single character"),
+            (lambda: Pattern.build_unchecked("z-a"), "ascending order"),
+            (lambda: Group.build_unchecked("a", name="1x"), "Invalid group name"),
+            (
+                lambda: Group.build_unchecked("a", name="x", capture=False),
+                "non-capturing",
+            ),
+            (lambda: Group.build_unchecked("a", flags=re.LOCALE), "Unsupported"),
+        ],
+    )
+    def test_validate_invalid(self, build, error):
+        regex = EzRegex.build_unchecked("x", Group.build_unchecked(build()))
+        with pytest.raises(ValueError, match=error):
+            regex.validate()
+
+    def test_validate_type(self):
+        with pytest.raises(TypeError):
+            EzRegex.build_unchecked(Pattern.build_unchecked(1)).validate()
+
+
+class TestFlags:
+    def test_compile_flags(self):
+        regex = EzRegex("abc")
+        compiled = regex.compile(re.IGNORECASE)
+        assert compiled.match("ABC") is not None
+        assert regex.compile().match("ABC") is None
+        assert regex.compile(re.IGNORECASE) is compiled
+
+    @pytest.mark.parametrize(
+        "regex, expected",
+        [
+            (EzRegex("abc"), True),
+            (Pattern(r"\w").one_or_more(), True),
+            (EzRegex("äbc"), False),
+        ],
+    )
+    def test_is_ascii(self, regex, expected):
+        assert regex.is_ascii() is expected
+
+    def test_ascii_auto_detection(self):
+        regex = Pattern(r"\w").one_or_more()
+        assert regex.search("abc").re.flags & re.ASCII
+        assert regex.search("äbc").group() == "äbc"
+        assert not regex.search("äbc").re.flags & re.ASCII
+        assert regex.findall("ab cd") == ["ab", "cd"]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from ezr.__main__ import main
+from ezr.freeze import check_frozen
+from ezr.freeze import freeze_patterns
+from ezr.rules import collect_patterns
+from ezr.rules import load_module
+
+RULES = """\
+from ezr import any_of
+from ezr import digit
+from ezr import Group
+from ezr import Pattern
+
+year = Group(Pattern(r"\\d") * 4, name="year")
+domain = any_of("gmail", "yahoo") + "." + any_of("com", "net")
+_private = Pattern("a")
+"""
+
+
+@pytest.fixture
+def rules_path(tmp_path):
+    path = tmp_path / "rules.py"
+    path.write_text(RULES)
+    return str(path)
+
+
+class TestFreeze:
+    def test_collect_patterns(self, rules_path):
+        patterns = collect_patterns(load_module(rules_path))
+        assert sorted(patterns) == ["domain", "year"]
+
+    def test_freeze_patterns(self, rules_path):
+        patterns = collect_patterns(load_module(rules_path))
+        namespace = {}
+        exec(freeze_patterns(patterns), namespace)
+        assert namespace["PATTERNS"] == {
+            "year": r"(?P<year>\d{4})",
+            "domain": r"(gmail|yahoo).(com|net)",
+        }
+        assert namespace["GROUPS"] == {"year": {"year": 1}, "domain": {}}
+        assert namespace["FLAGS"]["year"] == re.UNICODE
+        assert namespace["year"].match("2024").group("year") == "2024"
+
+    @pytest.mark.parametrize("name", ["1abc", "re", "PATTERNS"])
+    def test_freeze_invalid_name(self, name):
+        from ezr import Pattern
+
+        with pytest.raises(ValueError, match=r"Invalid pattern name"):
+            freeze_patterns({name: Pattern("a")})
+
+    def test_check_frozen_out_of_date(self, rules_path):
+        patterns = collect_patterns(load_module(rules_path))
+        namespace = {}
+        exec(freeze_patterns(patterns), namespace)
+        check_frozen(namespace, patterns)
+
+        del namespace["domain"]
+        with pytest.raises(ValueError, match=r"'domain' is missing"):
+            check_frozen(namespace, patterns)
+        patterns["year"] = patterns["year"].optional()
+        with pytest.raises(ValueError, match=r"'year' is out of date"):
+            check_frozen(namespace, {"year": patterns["year"]})
+
+    def test_cli(self, rules_path, tmp_path, capsys):
+        output = str(tmp_path / "frozen.py")
+        assert main(["freeze", rules_path, "-o", output]) == 0
+        assert main(["freeze", rules_path, "-o", output, "--check"]) == 0
+        frozen = load_module(output)
+        assert frozen.domain.pattern == "(gmail|yahoo).(com|net)"
+
+        with open(output, "a") as f:
+            f.write("year = re.compile('x')\n")
+        assert main(["freeze", rules_path, "-o", output, "--check"]) == 1
+        assert "out of date" in capsys.readouterr().err
+
+    def test_cli_stdout(self, rules_path, capsys):
+        assert main(["freeze", rules_path]) == 0
+        assert "PATTERNS = {" in capsys.readouterr().out
+
+    def test_cli_check_requires_output(self, rules_path):
+        assert main(["freeze", rules_path, "--check"]) == 2
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.deadline import DeadlinePool
+from ezr.fuzz import classify
+from ezr.fuzz import EXPONENTIAL
+from ezr.fuzz import fuzz
+from ezr.fuzz import inputs
+from ezr.fuzz import LINEAR
+from ezr.fuzz import POLYNOMIAL
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = DeadlinePool(size=1)
+    yield pool
+    pool.close()
+
+
+class TestInputs:
+    def test_pump_and_killer(self):
+        # (a+)+$
+        regex = Group(Pattern("a").one_or_more()).one_or_more() + "$"
+        assert inputs(regex) == [("", "a", "b")]
+
+    def test_prefix(self):
+        regex = EzRegex("ab", Pattern("c").one_or_more())
+        assert ("ab", "c", "d") in inputs(regex)
+
+    def test_alternatives(self):
+        # (a|bc)*d
+        regex = Group(Pattern("a"), "|", EzRegex("bc")).zero_or_more() + "d"
+        pumps = {pump for _, pump, _ in inputs(regex)}
+        assert {"a", "bc"} <= pumps
+
+    def test_samples_match(self):
+        regex = Group(Pattern(r"\d").one_or_more(), ~EzRegex("xy")).one_or_more()
+        for prefix, pump, _ in inputs(regex):
+            assert regex.fullmatch(prefix + pump * 3)
+
+    def test_raw_syntax(self):
+        tree = Group(Pattern("a").one_or_more()).one_or_more() + "b"
+        assert inputs(EzRegex("(a+)+b")) == inputs(tree)
+        assert ("x", "ab", "c") in inputs(EzRegex("x(?:ab|a)*y"))
+        # The killer character is not matched by raw escapes either
+        assert {suffix for _, _, suffix in inputs(EzRegex(r"\w+\d"))} == {"!"}
+
+    def test_no_repetition(self):
+        assert inputs(EzRegex("abc")) == [("", "abc", "d")]
+
+
+class TestClassify:
+    @pytest.mark.parametrize(
+        ("curve", "timed_out", "expected"),
+        [
+            ([(100, 1e-3), (200, 2e-3), (400, 4e-3)], False, (LINEAR, 1.0)),
+            ([(100, 1e-3), (200, 4e-3), (400, 16e-3)], False, (POLYNOMIAL, 2.0)),
+            ([(100, 1e-3), (200, 8e-3), (400, 64e-3)], False, (POLYNOMIAL, 3.0)),
+            ([(10, 1e-4), (20, 1e-1), (40, 1.0)], True, (EXPONENTIAL, None)),
+            ([(10, 1e-4), (20, 1e-2), (40, 1.0)], False, (EXPONENTIAL, None)),
+            # Below the noise floor nothing can be measured
+            ([(100, 1e-7), (200, 1e-6)], False, (LINEAR, 1.0)),
+            ([], False, (LINEAR, 1.0)),
+        ],
+    )
+    def test_classify(self, curve, timed_out, expected):
+        complexity, degree = classify(curve, timed_out)
+        assert complexity == expected[0]
+        if expected[1] is not None:
+            assert degree == pytest.approx(expected[1])
+
+    def test_timeout_is_lower_bound(self):
+        curve = [(100, 1e-3), (200, 8e-3), (400, 1e-2)]
+        assert classify(curve, timed_out=True) == (POLYNOMIAL, 3.0)
+
+
+class TestFuzz:
+    def test_linear(self, pool):
+        report = fuzz(EzRegex("ab", Pattern("c").one_or_more()), 512, pool=pool)
+        assert report.complexity == LINEAR
+        assert report.pattern == "abc+"
+        assert all(not r.timed_out for r in report.results)
+        assert max(length for length, _ in report.curve) <= 512
+
+    def test_exponential(self, pool):
+        regex = Group(Pattern("a").one_or_more()).one_or_more() + "$"
+        report = fuzz(regex, max_length=256, timeout=0.2, pool=pool)
+        assert report.complexity == EXPONENTIAL
+        slowest = report.slowest(1)[0]
+        assert slowest.timed_out
+        assert slowest.text.startswith("aaaa")
+        assert str(report).startswith("(a+)+$: exponential")
+
+    def test_raw_exponential(self, pool):
+        report = fuzz(EzRegex("(a+)+b"), max_length=256, timeout=0.2, pool=pool)
+        assert report.complexity == EXPONENTIAL
+
+    def test_slowest(self, pool):
+        report = fuzz(EzRegex("ab", Pattern("c").one_or_more()), 64, pool=pool)
+        slowest = report.slowest(3)
+        assert len(slowest) == 3
+        assert slowest[0].time >= slowest[1].time >= slowest[2].time
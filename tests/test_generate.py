@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.generate import generate
+from ezr.generate import Generator
+
+
+def card_number():
+    # \d{4}[- ]?\d{4}
+    digits = Pattern(r"\d").exactly(4)
+    return digits + any_of("- ").optional() + Pattern(r"\d").exactly(4)
+
+
+def email():
+    # (\w|[_.+-])+@(gmail|yahoo)-(com|net)
+    user = Group(Pattern(r"\w"), "|", any_of("_.+-")).one_or_more()
+    domain = Group(EzRegex("gmail"), "|", EzRegex("yahoo"))
+    return user + "@" + domain + "-" + Group(EzRegex("com"), "|", "net")
+
+
+class TestGenerate:
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            card_number(),
+            email(),
+            Group(Pattern("a").one_or_more()).one_or_more() + "$",
+            Group(EzRegex("ab"), flags=re.IGNORECASE).between(2, 3),
+            Pattern("^") + Pattern(r"\w").one_or_more() + Pattern(r"\b"),
+            ~EzRegex("abc"),
+            Pattern("x").at_most(2),
+            EzRegex(r"\d+"),
+            EzRegex(r"[a-c]{2,3}(x|yz)+"),
+            EzRegex(r"(?:ab)?[^a-z]\.(?=\w)\w*"),
+        ],
+    )
+    def test_matching(self, regex):
+        compiled = regex.compile()
+        samples = regex.generate(200, seed=1)
+        assert len(samples) == 200
+        assert all(compiled.fullmatch(s) for s in samples)
+
+    @pytest.mark.parametrize("regex", [card_number(), email()])
+    def test_non_matching(self, regex):
+        compiled = regex.compile()
+        samples = regex.generate(200, seed=1, matching=False)
+        assert len(samples) == 200
+        assert not any(compiled.fullmatch(s) for s in samples)
+
+    def test_reproducible(self):
+        assert email().generate(50, seed=3) == email().generate(50, seed=3)
+        assert email().generate(50, seed=3) != email().generate(50, seed=4)
+
+    def test_alternatives_covered(self):
+        domains = {s.split("@")[1].split("-")[0] for s in email().generate(100, seed=0)}
+        assert domains == {"gmail", "yahoo"}
+
+    def test_max_repeat(self):
+        regex = EzRegex("a", Pattern("b").one_or_more())
+        lengths = {len(s) for s in regex.generate(500, seed=0, max_repeat=3)}
+        assert lengths == {2, 3, 4, 5}
+        assert {len(s) for s in Pattern("b").at_least(2).generate(100, seed=0)} == set(
+            range(2, 11),
+        )
+
+    def test_impossible(self):
+        with pytest.raises(ValueError, match=r"Could not generate matching"):
+            generate(EzRegex("a", Pattern("^"), "b"), 1)
+
+    def test_generator_reuse(self):
+        generator = Generator(card_number())
+        assert generator.generate(10, seed=5) == generator.generate(10, seed=5)
+
+    def test_deep_tree(self):
+        regex = Pattern("a")
+        for _ in range(100):
+            regex = Group(regex)
+        assert generate(regex, 3) == ["a", "a", "a"]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pytest
+
+from ezr import grep as grep_module
+from ezr import Pattern
+from ezr.__main__ import main
+from ezr.grep import grep
+from ezr.grep import grep_file
+from ezr.grep import GrepStats
+from ezr.grep import iter_files
+from ezr.rules import load_rules
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a.txt").write_text("foo 123\nbar\nbaz 45\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.txt").write_text("no digits\n7 at start")
+    (tmp_path / "rules.py").write_text(
+        "from ezr import EzRegex, Pattern\n"
+        "number = Pattern(r'\\d').one_or_more()\n"
+        "bar = EzRegex('bar')\n",
+    )
+    return tmp_path
+
+
+class TestGrep:
+    def test_iter_files(self, tree):
+        files = [p[len(str(tree)) + 1 :] for p in iter_files([str(tree)])]
+        assert files == ["a.txt", "rules.py", "sub/b.txt"]
+
+    def test_grep_file(self, tree):
+        result = grep_file(str(tree / "a.txt"), {"n": Pattern(r"\d")})
+        assert result.lines == [(1, "n", "foo 123"), (3, "n", "baz 45")]
+        assert result.size == 19
+        assert result.error is None
+
+    def test_grep_file_missing(self, tree):
+        result = grep_file(str(tree / "missing.txt"), {"n": Pattern(r"\d")})
+        assert result.error is not None
+
+    def test_grep_file_mmap(self, tree, monkeypatch):
+        monkeypatch.setattr(grep_module, "MMAP_THRESHOLD", 0)
+        monkeypatch.setattr(grep_module, "BLOCK_SIZE", 4)
+        result = grep_file(str(tree / "a.txt"), {"n": Pattern(r"\d")})
+        assert result.lines == [(1, "n", "foo 123"), (3, "n", "baz 45")]
+        result = grep_file(str(tree / "sub" / "b.txt"), {"n": Pattern(r"\d")})
+        assert result.lines == [(2, "n", "7 at start")]
+
+    @pytest.mark.parametrize("jobs, ordered", [(1, True), (2, True), (2, False)])
+    def test_grep(self, tree, jobs, ordered):
+        paths = [str(tree / "a.txt"), str(tree / "sub")]
+        results = list(grep(paths, {"n": Pattern(r"\d")}, jobs=jobs, ordered=ordered))
+        assert sorted(r.path for r in results) == [paths[0], f"{paths[1]}/b.txt"]
+        lines = sorted(line for r in results for line in r.lines)
+        assert lines == [
+            (1, "n", "foo 123"),
+            (2, "n", "7 at start"),
+            (3, "n", "baz 45"),
+        ]
+
+    def test_stats(self, tree):
+        stats = GrepStats()
+        for result in grep([str(tree / "a.txt")], {"n": Pattern(r"\d")}, jobs=1):
+            stats.add(result)
+        stats.stop()
+        assert (stats.files, stats.bytes, stats.lines) == (1, 19, 2)
+        assert str(stats).startswith("1 files, 0.0 MB, 2 matching lines, 0 errors")
+
+    def test_load_rules(self, tree):
+        assert sorted(load_rules(str(tree / "rules.py"))) == ["bar", "number"]
+        assert str(load_rules('"ab" + any_of("cd")')["expr"]) == "ab[cd]"
+        assert str(load_rules('"ab"')["expr"]) == "ab"
+        with pytest.raises(ValueError, match=r"must evaluate to a pattern"):
+            load_rules("1")
+
+    def test_cli(self, tree, capsys):
+        assert main(["grep", "-j", "1", "EzRegex('ba')", str(tree / "a.txt")]) == 0
+        path = tree / "a.txt"
+        assert capsys.readouterr().out == f"{path}:2:bar\n{path}:3:baz 45\n"
+
+    def test_cli_rules_file(self, tree, capsys):
+        rules = str(tree / "rules.py")
+        assert main(["grep", "-j", "1", "--stats", rules, str(tree / "a.txt")]) == 0
+        out, err = capsys.readouterr()
+        path = tree / "a.txt"
+        assert out == (
+            f"{path}:1:number:foo 123\n{path}:2:bar:bar\n{path}:3:number:baz 45\n"
+        )
+        assert "1 files" in err
+
+    def test_cli_no_match(self, tree):
+        assert main(["grep", "-j", "1", "EzRegex('xyz')", str(tree / "a.txt")]) == 1
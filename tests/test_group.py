@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import re
+
 import pytest
 
+from ezr import EzRegex
 from ezr import Group
 from ezr import Pattern
 
@@ -80,3 +83,41 @@ class TestGroup:
         assert str(group) == "(?P<foo>abc)"
         with pytest.raises(ValueError, match=r"cannot be non-capturing"):
             group.capture = False
+
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            ({"flags": re.IGNORECASE}, "((?i:abc))"),
+            ({"flags": re.I | re.M | re.S}, "((?ims:abc))"),
+            ({"flags": re.ASCII, "capture": False}, "(?a:abc)"),
+            ({"flags": re.IGNORECASE, "name": "foo"}, "(?P<foo>(?i:abc))"),
+            ({"flags": 0, "capture": False}, "(?:abc)"),
+        ],
+    )
+    def test_group_flags(self, kwargs, expected):
+        group = Group("abc", **kwargs)
+        assert str(group) == expected
+        assert re.compile(str(group)).groups == int(group.capture)
+
+    def test_group_flags_quantified(self):
+        group = Group("ab", flags=re.IGNORECASE, capture=False).one_or_more()
+        assert str(group) == "(?i:ab)+"
+        assert group.fullmatch("aBAb") is not None
+
+    def test_group_flags_scoped(self):
+        regex = Group("a", flags=re.IGNORECASE) + "b"
+        assert regex.match("Ab") is not None
+        assert regex.match("AB") is None
+
+    def test_group_flags_edit(self):
+        group = Group("abc")
+        regex = EzRegex("x", group)
+        assert str(regex) == "x(abc)"
+        group.flags = re.DOTALL
+        assert str(regex) == "x((?s:abc))"
+        assert group != Group("abc")
+
+    @pytest.mark.parametrize("flags", [re.LOCALE, re.DEBUG, re.ASCII | re.UNICODE])
+    def test_group_flags_invalid(self, flags):
+        with pytest.raises(ValueError):
+            Group("abc", flags=flags)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import io
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import CharacterSet
+from ezr import EzRegex
+from ezr import Group
+from ezr import Lexer
+from ezr import Pattern
+from ezr.lexer import LexError
+from ezr.lexer import Token
+
+SOURCE = 'let x = 42 + foo(7, "a b")\nif x >= 10 { y = x }\n'
+
+
+def lexer(**kwargs):
+    return Lexer(
+        {
+            "KEYWORD": Group(any_of("let", "if")) + Pattern(r"\b"),
+            "NUMBER": Pattern(r"\d").one_or_more(),
+            "NAME": Pattern(r"\w").one_or_more(),
+            "STRING": EzRegex('"') + (~EzRegex('"')).zero_or_more() + '"',
+            "OP": any_of(">=", "=", r"\+", r"\(", r"\)", ",", r"\{", r"\}"),
+            "SPACE": CharacterSet(Pattern(r"\s")).one_or_more(),
+        },
+        skip=["SPACE"],
+        **kwargs,
+    )
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestLexer:
+    def test_tokenize(self):
+        tokens = list(lexer().tokenize(SOURCE))
+        assert tokens[:4] == [
+            ("KEYWORD", "let", (0, 3)),
+            ("NAME", "x", (4, 5)),
+            ("OP", "=", (6, 7)),
+            ("NUMBER", "42", (8, 10)),
+        ]
+        assert ("STRING", '"a b"', (20, 25)) in tokens
+        assert [t.type for t in tokens[-5:]] == ["OP", "NAME", "OP", "NAME", "OP"]
+        assert all(SOURCE[slice(*t.span)] == t.text for t in tokens)
+        assert isinstance(tokens[0], Token)
+
+    def test_priority(self):
+        # KEYWORD comes first, but only matches whole words
+        tokens = list(lexer().tokenize("iffy if"))
+        assert [t.type for t in tokens] == ["NAME", "KEYWORD"]
+
+    def test_error(self):
+        tokens = lexer().tokenize("x = 1 $ 2")
+        assert next(tokens) == ("NAME", "x", (0, 1))
+        with pytest.raises(LexError) as info:
+            list(tokens)
+        assert info.value.position == 6
+        assert info.value.text == "$"
+
+    def test_error_tokens(self):
+        tokens = list(lexer(error="ERROR").tokenize("x $$ 1 @"))
+        assert tokens == [
+            ("NAME", "x", (0, 1)),
+            ("ERROR", "$$", (2, 4)),
+            ("NUMBER", "1", (5, 6)),
+            ("ERROR", "@", (7, 8)),
+        ]
+
+    def test_string_rules(self):
+        ops = Lexer({"ARROW": "->", "DASH": "-", "GT": ">"})
+        assert [t.type for t in ops.tokenize("->->-")] == ["ARROW", "ARROW", "DASH"]
+
+    @pytest.mark.parametrize("rule", [Pattern(r"\d").zero_or_more(), r"\d*", "a?"])
+    def test_empty_rule(self, rule):
+        with pytest.raises(ValueError, match="empty string"):
+            Lexer({"DIGITS": rule})
+
+    def test_inner_groups(self):
+        pair = Group(Pattern(r"\w"), name="key") + "=" + Group(Pattern(r"\w"))
+        tokens = list(Lexer({"PAIR": pair, "SPACE": " "}).tokenize("a=1 b=2"))
+        assert [t.type for t in tokens] == ["PAIR", "SPACE", "PAIR"]
+
+    def test_flags(self):
+        keywords = Lexer({"SELECT": "select", "SPACE": " "}, flags=re.IGNORECASE)
+        assert [t.text for t in keywords.tokenize("SELECT select")][::2] == [
+            "SELECT",
+            "select",
+        ]
+
+
+class TestLexerStream:
+    @pytest.mark.parametrize("size", [1, 2, 5, 100])
+    def test_matches_tokenize(self, size):
+        lex = lexer(error="ERROR")
+        text = SOURCE * 3 + "$ 1"
+        expected = list(lex.tokenize(text))
+        assert list(lex.tokenize_stream(chunked(text, size))) == expected
+        stream = io.StringIO(text)
+        assert list(lex.tokenize_stream(stream, chunk_size=size)) == expected
+
+    def test_bounded_rules(self):
+        ops = Lexer({"ARROW": "->", "DASH": "-"})
+        assert ops._window == 2
+        tokens = list(ops.tokenize_stream(chunked("-->" * 4, 1)))
+        assert [t.type for t in tokens] == ["DASH", "ARROW"] * 4
+
+    def test_string_rules(self):
+        lex = Lexer({"NUM": r"\d+", "SP": " "})
+        assert lex._window is None
+        tokens = list(lex.tokenize_stream(io.StringIO("12345678901234"), chunk_size=4))
+        assert tokens == [("NUM", "12345678901234", (0, 14))]
+
+    def test_verbose_rules(self):
+        lex = Lexer({"WORD": "a b", "SEMI": ";"}, flags=re.VERBOSE)
+        assert lex._window is None
+        tokens = list(lex.tokenize_stream(chunked("ab;ab", 1)))
+        assert [t.text for t in tokens] == ["ab", ";", "ab"]
+
+    def test_unknown_bounds(self):
+        lex = Lexer({"PAIRS": "(ab)+", "SP": " "})
+        assert lex._window is None
+        tokens = list(lex.tokenize_stream(chunked("ababab ab", 2)))
+        assert [t.text for t in tokens] == ["ababab", " ", "ab"]
+
+    def test_error(self):
+        with pytest.raises(LexError) as info:
+            list(lexer().tokenize_stream(chunked("a b c $", 2)))
+        assert info.value.position == 6
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.memo import CachedPattern
+
+AGENTS = [
+    "Mozilla/5.0 Firefox/121.0",
+    "Mozilla/5.0 Chrome/120.0 Safari/537.36",
+    "curl/8.4.0",
+]
+
+
+def browser() -> EzRegex:
+    name = Group(any_of("Firefox", "Chrome", "curl"), name="name")
+    return name + "/" + Group(Pattern(r"\d").one_or_more(), name="major")
+
+
+def outcome(m):
+    return None if m is None else (m.span(), m.groups())
+
+
+class TestCachedPattern:
+    def test_results(self):
+        regex = browser()
+        cached = regex.cached()
+        for agent in AGENTS * 3:
+            for method in ("search", "match", "fullmatch"):
+                assert outcome(getattr(cached, method)(agent)) == outcome(
+                    getattr(regex, method)(agent),
+                )
+            assert cached.findall(agent) == regex.findall(agent)
+        assert cached.misses == len(AGENTS) * 4
+        assert cached.hits == len(AGENTS) * 4 * 2
+        assert cached.hit_rate == pytest.approx(2 / 3)
+        assert cached.search(AGENTS[1])["major"] == "120"
+
+    def test_returns_cached_match(self):
+        cached = browser().cached()
+        assert cached.search(AGENTS[0]) is cached.search(AGENTS[0])
+
+    def test_findall_copy(self):
+        cached = browser().cached()
+        cached.findall(AGENTS[0]).append("x")
+        assert cached.findall(AGENTS[0]) == [("Firefox", "Firefox", "121")]
+
+    def test_none_is_cached(self):
+        cached = browser().cached()
+        assert cached.search("wget") is None
+        assert cached.search("wget") is None
+        assert (cached.hits, cached.misses) == (1, 1)
+
+    def test_maxsize(self):
+        cached = browser().cached(maxsize=2)
+        for agent in AGENTS:
+            cached.search(agent)
+        assert len(cached) == 2
+        # The least recently used input was evicted
+        cached.search(AGENTS[0])
+        assert cached.misses == 4
+        cached.search(AGENTS[2])
+        assert cached.hits == 1
+
+    def test_maxsize_zero(self):
+        cached = browser().cached(maxsize=0)
+        assert cached.search(AGENTS[0]).group() == "Firefox/121"
+        assert len(cached) == 0
+        assert cached.skipped == 1
+
+    def test_max_length(self):
+        cached = browser().cached(max_length=16)
+        cached.search(AGENTS[0])
+        cached.search(AGENTS[2])
+        assert len(cached) == 1
+        assert (cached.hits, cached.misses, cached.skipped) == (0, 1, 1)
+
+    def test_edit_clears(self):
+        regex = any_of("foo", "bar")
+        cached = regex.cached()
+        assert cached.search("xbar").group() == "bar"
+        regex.set_pattern(6, Pattern("z"))
+        assert cached.search("xbar") is None
+        assert len(cached) == 1
+
+    def test_clear(self):
+        cached = browser().cached()
+        cached.search(AGENTS[0])
+        cached.search(AGENTS[0])
+        cached.clear()
+        assert len(cached) == 0
+        assert (cached.hits, cached.misses, cached.hit_rate) == (0, 0, 0.0)
+
+    def test_threads(self):
+        regex = browser()
+        cached = CachedPattern(regex, maxsize=2)
+        inputs = [f"{a} #{i % 5}" for i, a in enumerate(AGENTS * 200)]
+        errors = []
+
+        def work():
+            for text in inputs:
+                if cached.search(text).group() != regex.search(text).group():
+                    errors.append(text)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert len(cached) <= 2
+        assert cached.hits + cached.misses == len(inputs) * 8
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.profiling import _exclusive
+from ezr.profiling import _prefix
+from ezr.profiling import optimize
+from ezr.profiling import profile
+
+TRAFFIC = ["DELETE /a", "DELETE /b", "POST /c", "PUT /d", "DELETE /e"]
+
+
+def methods():
+    return any_of("GET", "POST", "PUT", "DELETE")
+
+
+class TestProfile:
+    def test_counts(self):
+        regex = methods()
+        p = profile(regex, TRAFFIC)
+        assert p.counts(regex) == [0, 1, 1, 3]
+        assert (p.samples, p.matches) == (5, 5)
+        assert p.groups() == [regex]
+
+    def test_record(self):
+        regex = methods()
+        p = regex.profile()
+        p.record(["GET /", "GET /x"]).record(["PUT /"])
+        assert p.counts(regex) == [2, 0, 1, 0]
+
+    def test_nested_groups(self):
+        inner = Group(EzRegex("v1"), "|", EzRegex("v2"))
+        outer = Group(EzRegex("api/") + inner, "|", EzRegex("static"))
+        regex = outer + "/"
+        p = profile(regex, ["api/v2/", "api/v2/", "static/", "api/v1/"])
+        assert p.counts(outer) == [3, 1]
+        assert p.counts(inner) == [1, 2]
+
+    def test_or_operator(self):
+        regex = Group(EzRegex("cat") | "dog")
+        assert profile(regex, ["dog", "dog"]).counts(regex) == [0, 2]
+
+    def test_keeps_groups(self):
+        path = Group(Pattern(r"\S") * (1, 9))
+        regex = Group(methods(), name="method") + " " + path
+        p = profile(regex, TRAFFIC)
+        assert p.counts(regex._patterns[0]._patterns[0]) == [0, 1, 1, 3]
+        assert p.compiled.groupindex["method"] == 1
+
+    def test_flags(self):
+        regex = methods()
+        assert profile(regex, ["get", "put"], re.IGNORECASE).counts(regex)[0] == 1
+
+    def test_unknown_group(self):
+        with pytest.raises(KeyError):
+            profile(methods()).counts(Group("a"))
+
+    def test_shared_group_skipped(self):
+        shared = Group(EzRegex("a"), "|", EzRegex("b"))
+        regex = EzRegex(shared, "-", shared)
+        p = profile(regex, ["a-b"])
+        assert p.groups() == []
+        assert p.matches == 1
+
+
+class TestOptimize:
+    def test_reorder(self):
+        regex = methods()
+        assert str(regex.optimize(regex.profile(TRAFFIC))) == "(DELETE|POST|PUT|GET)"
+
+    def test_same_matches(self):
+        regex = Group(methods(), name="m") + " /" + Pattern(r"\w").one_or_more()
+        before = [m.group() for m in regex.compile().finditer(" ".join(TRAFFIC))]
+        optimize(regex, profile(regex, TRAFFIC))
+        assert str(regex).startswith("(?P<m>(DELETE|")
+        after = [m.group() for m in regex.compile().finditer(" ".join(TRAFFIC))]
+        assert after == before
+
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            # "DELETE" is a prefix of "DELETED", the order decides the match
+            any_of("GET", "DELETE", "DELETED"),
+            # Case-insensitive matching would make both branches match
+            any_of("get", "GET"),
+            any_of(Pattern(r"\w").one_or_more(), "DELETE"),
+            Group(EzRegex("GET"), "|", EzRegex("")),
+            # The raw "?" makes "b" and "c" optional, both can match "ac"
+            any_of("ab?c", "ac?x"),
+        ],
+    )
+    def test_not_exclusive(self, regex):
+        rendered = str(regex)
+        optimize(regex, profile(regex, ["DELETE DELETED", "GET"]))
+        assert str(regex) == rendered
+        optimize(regex, profile(regex, ["ax"] * 5 + ["acx"]))
+        assert str(regex) == rendered
+
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            Group(EzRegex("a"), Group("x"), "|", EzRegex("b"), Group("y")),
+            Group(EzRegex("a"), Group("x", name="x"), "|", EzRegex("b")),
+            Group(EzRegex("a(x)"), "|", EzRegex("b")),
+        ],
+    )
+    def test_captures_kept(self, regex):
+        rendered = str(regex)
+        groups = regex.search("by").groups()
+        optimize(regex, profile(regex, ["by"] * 3))
+        assert str(regex) == rendered
+        assert regex.search("by").groups() == groups
+
+    def test_escaped_prefix(self):
+        branches = [EzRegex(r"\.a").patterns, EzRegex(r"\.b").patterns]
+        assert _prefix(list(branches[0])) == ".a"
+        assert _exclusive([list(b) for b in branches])
+        assert _prefix([Pattern(r"\d"), Pattern("a")]) == ""
+        assert _prefix(list(EzRegex("ab?c").patterns)) == "a"
+        assert _prefix(list(EzRegex(r"a\.*b").patterns)) == "a"
+
+    def test_stale_profile(self):
+        regex = methods()
+        p = profile(regex, TRAFFIC)
+        regex.set_pattern(0, Pattern(r"\w").one_or_more())
+        rendered = str(regex)
+        optimize(regex, p)
+        assert str(regex) == rendered
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import io
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import end_of_string
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr import start_of_string
+from ezr import start_of_word
+from ezr.stream import ChunkScanner
+from ezr.stream import finditer_chunks
+from ezr.stream import iter_chunks
+from ezr.stream import sub_chunks
+
+TEXT = "foo 12 bar 345 foobar 6789 baz\nqux 1 foo\n"
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestStream:
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            Pattern(r"\d") * (1, 3),
+            any_of("foo", "bar", "foobar"),
+            start_of_word + Pattern(r"\w") * 3,
+            Group("o", "|", "oo") + "b",
+            start_of_string + "foo",
+            EzRegex("foo") + end_of_string,
+            Pattern(r"\d").optional(),
+        ],
+    )
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 100])
+    def test_matches_whole_text(self, regex, size):
+        expected = [(m.span(), m.group()) for m in regex.finditer(TEXT)]
+        window = regex.length_bounds()[1]
+        matches = finditer_chunks(regex.compile(), chunked(TEXT, size), window)
+        assert [(m.span(), m.group()) for m in matches] == expected
+
+    def test_finditer_stream_file(self):
+        regex = Pattern(r"\d").one_or_more()
+        stream = io.StringIO(TEXT)
+        matches = regex.finditer_stream(stream, chunk_size=4)
+        assert [m.group() for m in matches] == ["12", "345", "6789", "1"]
+
+    def test_finditer_stream_bounded_window(self):
+        regex = Pattern(r"\d") * 4
+        matches = list(regex.finditer_stream(chunked(TEXT, 1), overlap=0))
+        assert [m.span() for m in matches] == [(22, 26)]
+
+    def test_finditer_stream_string_syntax(self):
+        stream = io.StringIO("b" + "a" * 50 + "b")
+        matches = EzRegex("a+").finditer_stream(stream, chunk_size=8)
+        assert [m.span() for m in matches] == [(1, 51)]
+
+    def test_scanner_trims_buffer(self):
+        scanner = ChunkScanner(re.compile("ab"), window=2)
+        for chunk in ["xxxx"] * 100:
+            assert list(scanner.feed(chunk)) == []
+        assert len(scanner._buffer) <= 4
+
+    def test_stream_match(self):
+        regex = Group(Pattern(r"\d").one_or_more(), name="num")
+        match = next(iter(finditer_chunks(regex.compile(), ["a", "b1", "2c"], 10)))
+        assert match.span() == (2, 4)
+        assert match.span("num") == (2, 4)
+        assert match["num"] == "12"
+        assert match.groupdict() == {"num": "12"}
+        assert match.groups() == ("12",)
+        assert repr(match) == "<StreamMatch object; span=(2, 4), match='12'>"
+
+    def test_iter_chunks(self):
+        assert list(iter_chunks("abc")) == ["abc"]
+        assert list(iter_chunks(["a", "b"])) == ["a", "b"]
+        assert list(iter_chunks(io.StringIO("abcde"), chunk_size=2)) == [
+            "ab",
+            "cd",
+            "e",
+        ]
+
+
+SPLIT_CASES = [
+    Pattern(r"\d") * (1, 3),
+    Pattern(r"\s").one_or_more(),
+    Group(Pattern(r"\d").one_or_more()),
+    Group("o", "|", Group("a")) + "r",
+    start_of_word + Pattern(r"\w") * 3,
+    Pattern(r"\d").zero_or_more(),
+    EzRegex("foo") + end_of_string,
+]
+
+
+class TestSplitSub:
+    @pytest.mark.parametrize("regex", SPLIT_CASES)
+    @pytest.mark.parametrize("size", [1, 3, 7, 100])
+    def test_isplit(self, regex, size):
+        expected = regex.compile().split(TEXT)
+        assert list(regex.isplit(chunked(TEXT, size))) == expected
+        assert list(regex.isplit(io.StringIO(TEXT), chunk_size=size)) == expected
+
+    @pytest.mark.parametrize("regex", SPLIT_CASES)
+    @pytest.mark.parametrize("size", [1, 3, 7, 100])
+    @pytest.mark.parametrize("repl", ["<>", r"<\g<0>>"])
+    def test_isub(self, regex, size, repl):
+        expected = regex.compile().subn(repl, TEXT)
+        out = io.StringIO()
+        n = regex.isub(io.StringIO(TEXT), repl, out, chunk_size=size)
+        assert (out.getvalue(), n) == expected
+
+    def test_isplit_string(self):
+        regex = Pattern(",")
+        pieces = regex.isplit("a,b,,c")
+        assert next(pieces) == "a"
+        assert list(pieces) == ["b", "", "c"]
+        assert list(regex.isplit("a,b,c", maxsplit=1)) == ["a", "b,c"]
+
+    def test_isub_callable(self):
+        regex = Pattern(r"\d").one_or_more()
+        out = io.StringIO()
+        n = regex.isub(chunked(TEXT, 5), lambda m: str(m.span()), out, count=2)
+        assert n == 2
+        assert out.getvalue().startswith("foo (4, 6) bar (11, 14) foobar 6789")
+
+    def test_isub_writes_incrementally(self):
+        class Sink:
+            def __init__(self):
+                self.writes = []
+
+            def write(self, text):
+                self.writes.append(text)
+
+        sink = Sink()
+        text = "ab " * 10_000
+        Pattern("a").isub(io.StringIO(text), "x", sink, chunk_size=1000)
+        assert "".join(sink.writes) == text.replace("a", "x")
+        assert max(map(len, sink.writes)) <= 1000
+
+    def test_buffer_stays_bounded(self):
+        sizes = []
+
+        class Sink:
+            def write(self, text):
+                sizes.append(len(text))
+
+        chunks = ["xyz" * 100] * 100
+        assert sub_chunks(re.compile("ab"), chunks, 2, "", Sink()) == 0
+        assert sum(sizes) == 30_000
+        assert max(sizes) <= 302
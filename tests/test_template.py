@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr import Placeholder
+from ezr import Template
+
+
+def log_line():
+    # ^(\d{4})-(?P<level>{level}) \[{service}\]: .*$
+    date = Group(Pattern(r"\d").exactly(4))
+    level = Group(Placeholder("level"), name="level")
+    service = EzRegex(r"\[") + Placeholder("service") + EzRegex(r"\]")
+    body = Pattern(".").zero_or_more()
+    return Pattern("^") + date + "-" + level + " " + service + ": " + body + "$"
+
+
+class TestPlaceholder:
+    def test_render(self):
+        with pytest.raises(ValueError, match="not bound"):
+            str(EzRegex("a") + Placeholder("x"))
+
+    @pytest.mark.parametrize("name", ["1x", "_x", "x-y", "", 1])
+    def test_invalid_name(self, name):
+        with pytest.raises(ValueError) as info:
+            Placeholder(name)
+        with pytest.raises(ValueError) as group_info:
+            Group("a", name=name)
+        assert str(info.value) == str(group_info.value)
+
+    def test_validate(self):
+        tree = EzRegex("id-") + Placeholder("tenant")
+        assert tree.validate() is tree
+
+    def test_quantify(self):
+        with pytest.raises(ValueError):
+            Placeholder("x").one_or_more()
+        quantified = Group(Placeholder("x")).one_or_more()
+        assert Template(quantified).render(x="ab") == "(ab)+"
+
+    def test_equality(self):
+        assert Placeholder("x") == Placeholder("x")
+        assert Placeholder("x") != Placeholder("y")
+        assert repr(Placeholder("x")) == "Placeholder('x')"
+
+
+class TestTemplate:
+    def test_bind(self):
+        template = Template(log_line())
+        assert template.names == {"level", "service"}
+        bound = template.bind(level="WARN", service=any_of("api", "db"))
+        assert str(bound) == r"^(\d{4})-(?P<level>WARN) \[(api|db)\]: .*$"
+        m = bound.compile().match("2024-WARN [db]: disk full")
+        assert m is not None and m["level"] == "WARN"
+
+    def test_shares_unchanged_subtrees(self):
+        tree = log_line()
+        template = Template(tree)
+        bound = template.bind(level="INFO", service="api")
+        assert bound is not tree
+        assert bound._patterns[1] is tree._patterns[1]
+        assert bound._patterns[3] is not tree._patterns[3]
+        assert tree._patterns[1]._rendered is not None
+
+    def test_alternation_value(self):
+        template = Template(EzRegex("x") + Placeholder("v") + EzRegex("y"))
+        assert template.render(v="a|b") == "x(?:a|b)y"
+        assert template.compile(v="a|b").fullmatch("xby")
+
+    def test_cache(self):
+        template = Template(log_line(), maxsize=2)
+        first = template.bind(level="INFO", service="api")
+        assert template.bind(service="api", level="INFO") is first
+        assert template.compile(level="INFO", service="api") is first.compile()
+        template.bind(level="WARN", service="api")
+        template.bind(level="ERROR", service="api")
+        assert template.bind(level="INFO", service="api") is not first
+        assert (template.hits, template.misses) == (2, 4)
+
+    def test_bindings_are_independent(self):
+        template = Template(log_line())
+        info = template.bind(level="INFO", service="api")
+        warn = template.bind(level="WARN", service="api")
+        assert "INFO" in str(info) and "WARN" in str(warn)
+        assert info.compile().pattern == str(info)
+
+    def test_invalidation(self):
+        tree = log_line()
+        template = Template(tree)
+        bound = template.bind(level="INFO", service="api")
+        assert str(bound).startswith(r"^(\d{4})")
+        tree._patterns[1].set_pattern(0, Pattern(r"\d").exactly(2))
+        assert str(bound).startswith(r"^(\d{2})")
+
+    def test_root_placeholder(self):
+        template = Template(Placeholder("x"))
+        assert str(template.bind(x="ab")) == "ab"
+
+    def test_shared_placeholder(self):
+        word = Placeholder("word")
+        template = Template(Group(word) + " " + Group(word))
+        assert template.render(word="hi") == "(hi) (hi)"
+
+    @pytest.mark.parametrize(
+        "values",
+        [{}, {"level": "INFO"}, {"level": "INFO", "service": "a", "other": "b"}],
+    )
+    def test_invalid_values(self, values):
+        with pytest.raises(ValueError):
+            Template(log_line()).bind(**values)
+
+    def test_no_placeholder(self):
+        with pytest.raises(ValueError):
+            Template(EzRegex("abc"))
+
+    def test_flags(self):
+        template = Template(Group(Placeholder("x"), flags=re.IGNORECASE))
+        assert template.compile(x="ab").fullmatch("AB")
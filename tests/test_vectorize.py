@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import itertools
+import re
+
+import pytest
+
+from ezr import any_of
+from ezr import end_of_string
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr import start_of_string
+from ezr import start_of_word
+from ezr.vectorize import Batch
+from ezr.vectorize import BATCH_SIZE
+from ezr.vectorize import count_array
+from ezr.vectorize import extract
+from ezr.vectorize import extract_array
+from ezr.vectorize import match_counts
+from ezr.vectorize import match_flags
+from ezr.vectorize import match_mask
+
+TEXTS = ["foo 12", "", "bar", "1 2 3", "x\x00y", "123456", "a\nb"]
+
+REGEXES = [
+    Pattern(r"\d") * (1, 2),
+    any_of("foo", "bar"),
+    start_of_word + Pattern(r"\d"),
+    Group(Pattern(r"\d").one_or_more(), name="num"),
+    Pattern(".") * 2,
+    Pattern(r"\s"),
+    ~EzRegex("abc"),
+    EzRegex("b") + end_of_string,
+    Pattern("x").optional(),
+    EzRegex(r"\W"),
+    EzRegex(r"\d+ \d"),
+    EzRegex("[^a-z]{2}"),
+    EzRegex("(?s)a.b"),
+]
+
+
+class TestVectorize:
+    @pytest.mark.parametrize("regex", REGEXES)
+    def test_match_flags(self, regex):
+        compiled = regex.compile()
+        expected = [compiled.search(t) is not None for t in TEXTS]
+        assert match_flags(regex, TEXTS) == expected
+
+    @pytest.mark.parametrize("regex", REGEXES)
+    def test_match_counts(self, regex):
+        compiled = regex.compile()
+        expected = [len(compiled.findall(t)) for t in TEXTS]
+        assert match_counts(regex, TEXTS) == expected
+
+    @pytest.mark.parametrize("regex", REGEXES)
+    def test_extract(self, regex):
+        compiled = regex.compile()
+        expected = [m and m.group() for m in map(compiled.search, TEXTS)]
+        assert extract(regex, TEXTS) == expected
+
+    def test_extract_named_group(self):
+        regex = "x" + Group(Pattern(r"\d").one_or_more(), name="num")
+        assert extract(regex, ["x1", "y2", "ax34"], "num") == [
+            "1",
+            None,
+            "34",
+        ]
+
+    @pytest.mark.parametrize(
+        "regex, texts, batched",
+        [
+            (EzRegex("ab"), ["ab", "cab"], True),
+            (EzRegex("ab"), [], False),
+            (Pattern("a").optional(), ["ab"], False),
+            (Pattern(r"\W"), ["ab"], False),
+            (Pattern(".") + "a", ["ab"], True),
+            (Pattern(".") + "a", ["a\nb", "a\x00"], False),
+            (Group(".", flags=re.DOTALL), ["ab"], False),
+            (EzRegex(r"a\.b"), ["a.b"], True),
+            (EzRegex(r"\W"), ["ab"], False),
+            (EzRegex("[^a]"), ["ab"], False),
+            (EzRegex("(a)"), ["ab"], False),
+            (Group("a b", flags=re.VERBOSE), ["ab"], False),
+        ],
+    )
+    def test_batch(self, regex, texts, batched):
+        assert (Batch.build(regex, texts) is not None) is batched
+
+    def test_batch_empty_match_at_end(self):
+        batch = Batch("a\x00b", "\x00", ["a", "b"])
+        matches = list(batch.first_matches(re.compile("x*")))
+        assert [(i, m.span()) for i, m in matches] == [(0, (0, 0)), (1, (2, 2))]
+
+    def test_empty_matches(self):
+        regex = EzRegex(EzRegex(" ").optional()).one_or_more()
+        assert match_flags(regex, ["a", "b"]) == [True, True]
+
+
+class TestVectorizeNumpy:
+    @pytest.fixture(autouse=True)
+    def np(self):
+        return pytest.importorskip("numpy")
+
+    def test_match_mask(self, np):
+        array = np.array(["a1", "b", "c22"], dtype=object)
+        mask = Pattern(r"\d").match_mask(array)
+        assert mask.dtype == bool
+        assert mask.tolist() == [True, False, True]
+
+    def test_match_mask_shape(self, np):
+        array = np.array([["a1", "b"], ["c", "2"]], dtype=object)
+        mask = match_mask(Pattern(r"\d"), array)
+        assert mask.tolist() == [[True, False], [False, True]]
+
+    def test_count_array(self, np):
+        counts = count_array(Pattern(r"\d"), ["a1", "b", "c22"])
+        assert counts.dtype == np.int64
+        assert counts.tolist() == [1, 0, 2]
+
+    def test_extract_array(self, np):
+        values = extract_array(Pattern(r"\d") * 2, ["a12", "b", "c22"])
+        assert values.dtype == object
+        assert values.tolist() == ["12", None, "22"]
+
+
+class TestExtractColumns:
+    regex = (
+        Group(Pattern(r"\w").one_or_more(), name="key")
+        + "="
+        + Group(Pattern(r"\d").one_or_more(), name="value")
+        + Group(EzRegex("!"), name="bang").optional()
+    )
+
+    def test_group_index(self):
+        assert self.regex.group_index() == dict(self.regex.compile().groupindex)
+
+    def test_extract_columns(self):
+        lines = ["a=1", "nothing", "bb=22!", "", "x=y c=3"]
+        columns = self.regex.extract_columns(lines)
+        assert columns == {
+            "key": ["a", None, "bb", None, "c"],
+            "value": ["1", None, "22", None, "3"],
+            "bang": [None, None, "!", None, None],
+        }
+
+    def test_extract_columns_unbatched(self):
+        regex = Group(Pattern(".").one_or_more(), name="any")
+        columns = regex.extract_columns(["a\x00", "", "b"])
+        assert columns == {"any": ["a\x00", None, "b"]}
+
+    def test_extract_columns_single_group(self):
+        regex = "k" + Group(Pattern(r"\d"), name="digit")
+        assert regex.extract_columns(["k1", "k", "xk2"]) == {"digit": ["1", None, "2"]}
+
+    def test_extract_columns_string_groups(self):
+        # The raw parentheses of a string pattern open a group too
+        regex = EzRegex("(a)") + Group("b", name="x")
+        assert regex.group_index() == {"x": 2}
+        assert regex.extract_columns(["ab", "a"]) == {"x": ["b", None]}
+        assert EzRegex(r"\(a\)").group_index() == {}
+
+    def test_extract_columns_no_named_groups(self):
+        assert Group("a").extract_columns(["a"]) == {}
+
+    def test_extract_columns_arrays(self):
+        pytest.importorskip("numpy")
+        columns = self.regex.extract_columns(["a=1", "-"], as_arrays=True)
+        assert columns["key"].dtype == object
+        assert columns["key"].tolist() == ["a", None]
+
+
+class TestSpans:
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            Pattern(r"\d").one_or_more(),
+            Pattern("x").optional(),
+            Group("a", name="n") | Group("b"),
+            any_of("ab", "a", "b"),
+            EzRegex(r"(a)\1"),
+            EzRegex("(?i)ab"),
+            EzRegex(r"[ab]\d+"),
+        ],
+    )
+    @pytest.mark.parametrize("text", ["", "a12b3c", "axbx", "abab ba x", "aaAB"])
+    def test_spans(self, regex, text):
+        expected = [i for m in regex.finditer(text) for i in m.span()]
+        spans = regex.spans(text)
+        assert spans.typecode == "q"
+        assert spans.tolist() == expected
+
+    def test_spans_groups(self):
+        regex = Group("a", name="n") | Group("b")
+        spans = regex.spans("abxb", groups=True)
+        assert spans.tolist() == [
+            *(0, 1, 0, 1, -1, -1),
+            *(1, 2, -1, -1, 1, 2),
+            *(3, 4, -1, -1, 3, 4),
+        ]
+
+
+class TestEarlyExit:
+    @pytest.mark.parametrize("regex", REGEXES)
+    def test_count(self, regex):
+        for text in [*TEXTS, " ".join(TEXTS)]:
+            assert regex.count(text) == len(regex.compile().findall(text))
+
+    @pytest.mark.parametrize("regex", REGEXES)
+    def test_first_match(self, regex):
+        compiled = regex.compile()
+        expected = next(filter(None, map(compiled.search, TEXTS)), None)
+        match = regex.first_match(TEXTS)
+        if expected is None:
+            assert match is None
+        else:
+            assert match.string == expected.string
+            assert match.span() == expected.span()
+
+    @pytest.mark.parametrize("regex", REGEXES)
+    def test_any_all(self, regex):
+        compiled = regex.compile()
+        for texts in [TEXTS, TEXTS[:1], TEXTS[2:3], []]:
+            flags = [compiled.search(t) is not None for t in texts]
+            assert regex.any_match(texts) is any(flags)
+            assert regex.all_match(texts) is all(flags)
+
+    def test_stops_early(self):
+        consumed = []
+
+        def lines():
+            for i in itertools.count():
+                consumed.append(i)
+                yield f"line {i}"
+
+        match = Pattern("7").first_match(lines())
+        assert match.string == "line 7"
+        assert len(consumed) <= BATCH_SIZE
+        assert Pattern("7").any_match(lines())
+        consumed.clear()
+        assert not EzRegex("line 0").all_match(lines())
+        assert consumed == [0, 1]
+
+    def test_large_iterable(self):
+        texts = [f"row {i}" for i in range(3 * BATCH_SIZE)]
+        match = EzRegex("row 2500").first_match(texts)
+        assert match.string == "row 2500"
+        assert EzRegex("row").all_match(texts)
+        assert not EzRegex("x").any_match(texts)
+
+
+class TestFilterLines:
+    BUFFERS = [
+        "",
+        "\n",
+        "foo 12\n\nbar\n1 2 3\nb\n",
+        "\n\nb\nab\nabc\n12",
+        "x\r\nb\r\n",
+    ]
+
+    @staticmethod
+    def lines(buffer):
+        lines = buffer.split("\n")
+        if buffer.endswith("\n"):
+            lines.pop()
+        return lines
+
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            *REGEXES,
+            start_of_string + "b",
+            EzRegex("b") + end_of_string,
+            Pattern(r"\B") + "b",
+            Pattern("a").zero_or_more(),
+            Pattern(r"\A") + "b",
+            Pattern(".") + Group("b", flags=re.DOTALL),
+        ],
+    )
+    @pytest.mark.parametrize("buffer", BUFFERS)
+    def test_filter_lines(self, regex, buffer):
+        compiled = regex.compile()
+        lines = self.lines(buffer)
+        assert regex.filter_lines(buffer) == [
+            line for line in lines if compiled.search(line)
+        ]
+        assert regex.filter_lines(buffer, numbers=True) == [
+            i for i, line in enumerate(lines, 1) if compiled.search(line)
+        ]
+
+    @pytest.mark.parametrize("every", [1, 3, 50])
+    def test_dense_and_sparse(self, every):
+        buffer = "".join(
+            f"{'hit' if i % every == 0 else 'miss'} {i}\n" for i in range(2000)
+        )
+        lines = self.lines(buffer)
+        regex = EzRegex("hit")
+        assert regex.filter_lines(buffer) == [x for x in lines if "hit" in x]
+        assert regex.filter_lines(buffer, numbers=True) == [
+            i for i, x in enumerate(lines, 1) if "hit" in x
+        ]
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from ezr import CharacterSet
+from ezr import EzRegex
+from ezr import Group
+from ezr import Pattern
+from ezr.walk import ENTER
+from ezr.walk import EXIT
+from ezr.walk import fold
+from ezr.walk import iter_events
+from ezr.walk import postorder
+from ezr.walk import walk
+
+
+DEPTH = 10000
+
+
+def deep_tree(depth):
+    regex = Pattern("a")
+    for i in range(depth):
+        regex = Group(regex) if i % 2 else EzRegex(regex, "|", "b")
+    return regex
+
+
+class TestWalk:
+    def test_walk(self):
+        regex = EzRegex("a", Group("bc"), "d")
+        nodes = [str(n) for n in walk(regex)]
+        assert nodes == ["a(bc)d", "a", "(bc)", "b", "c", "d"]
+
+    def test_iter_events(self):
+        regex = Group("a", CharacterSet("b"))
+        events = [(e, str(n), d) for e, n, d in iter_events(regex)]
+        assert events == [
+            (ENTER, "(a[b])", 0),
+            (ENTER, "a", 1),
+            (EXIT, "a", 1),
+            (ENTER, "[b]", 1),
+            (ENTER, "b", 2),
+            (EXIT, "b", 2),
+            (EXIT, "[b]", 1),
+            (EXIT, "(a[b])", 0),
+        ]
+
+    def test_postorder_shared(self):
+        shared = Group("ab")
+        regex = EzRegex(shared, shared)
+        nodes = [str(n) for n in postorder(regex)]
+        assert nodes == ["a", "b", "(ab)", "(ab)(ab)"]
+
+    def test_fold(self):
+        regex = EzRegex("a", Group("bc"), "d")
+        count = fold(regex, lambda node, results: 1 + sum(results))
+        assert count == 6
+
+
+class TestEquality:
+    @pytest.mark.parametrize(
+        "a, b, expected",
+        [
+            (EzRegex("ab"), EzRegex("ab"), True),
+            (EzRegex("ab"), EzRegex("abc"), False),
+            (EzRegex("ab"), Group("ab"), False),
+            (Group("ab", name="x"), Group("ab", name="x"), True),
+            (Group("ab", name="x"), Group("ab", name="y"), False),
+            (Group("ab", capture=False), Group("ab"), False),
+            (Group("ab").optional(), Group("ab").optional(), True),
+            (Group("ab").optional(), Group("ab"), False),
+            (EzRegex("a", Group("b")), EzRegex("a", Group("c")), False),
+            (Pattern("a"), EzRegex("a"), False),
+            (Pattern("a"), "a", False),
+        ],
+    )
+    def test_equal(self, a, b, expected):
+        assert (a == b) is expected
+
+
+@pytest.fixture(scope="module")
+def tree():
+    return deep_tree(DEPTH)
+
+
+class TestDeepTrees:
+    def test_str(self, tree):
+        rendered = str(tree)
+        assert len(rendered) == 2 * DEPTH + 1
+        assert rendered.startswith("((((")
+        assert rendered.endswith("|b)|b)")
+
+    def test_eq(self, tree):
+        assert tree == deep_tree(DEPTH)
+        assert tree != deep_tree(DEPTH - 1)
+
+    def test_length_bounds(self, tree):
+        assert tree.length_bounds() == (1, 1)
+
+    def test_repr_and_explain(self):
+        depth = 2 * sys.getrecursionlimit()
+        tree = deep_tree(depth)
+        assert repr(tree).count("\n") == 3 * depth
+        assert tree.explain.startswith("┌─")